@@ -0,0 +1,163 @@
+"""
+Benchmark suite
+
+    python -m extractor.backend.benchmarks run --scale small --output results.json
+    python -m extractor.backend.benchmarks compare baseline.json results.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from importlib import metadata
+from typing import Dict, Any, List, Optional
+
+from .corpus import SCALES, load_corpus
+from .micro import BENCHMARKS, run_micro_benchmarks
+
+logger = logging.getLogger(__name__)
+
+# Libraries whose upgrades the benchmarks are meant to catch
+TRACKED_PACKAGES = ("PyPDF2", "pandas", "openpyxl", "Pillow", "numpy", "pytesseract", "tesserocr", "pyarrow", "fastapi")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _tesseract_version() -> Optional[str]:
+    try:
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Where and against what a run was made, so results can be compared across commits"""
+    packages = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+        "tesseract": _tesseract_version(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    documents = load_corpus(args.corpus_dir, scale=args.scale, seed=args.seed)
+    results: Dict[str, Any] = {
+        "environment": environment(),
+        "corpus": {"scale": args.scale, "seed": args.seed, "documents": documents},
+    }
+
+    if not args.skip_micro:
+        names = args.benchmarks.split(",") if args.benchmarks else None
+        results["micro"] = run_micro_benchmarks(documents, names=names, repeat=args.repeat, warmup=args.warmup)
+
+    if not args.skip_load:
+        from .load import run_load_test
+
+        types = args.load_types.split(",")
+        results["load"] = run_load_test(
+            [document for document in documents if document["extractor_type"] in types],
+            clients=args.clients,
+            uploads=args.uploads,
+            use_cache=args.cache
+        )
+
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median time ratios (current / baseline) of the micro-benchmarks both runs have"""
+    def key(record):
+        return record["name"], record.get("document"), record.get("chunk_size")
+
+    baseline_records = {key(record): record for record in baseline.get("micro", []) if "median" in record}
+    rows = []
+    for record in current.get("micro", []):
+        previous = baseline_records.get(key(record))
+        if previous is None or "median" not in record:
+            continue
+        rows.append({
+            "name": record["name"],
+            "document": record.get("document"),
+            "baseline": previous["median"],
+            "current": record["median"],
+            "ratio": record["median"] / previous["median"] if previous["median"] else None,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m extractor.backend.benchmarks", description="Extraction benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Generate the corpus (if needed) and run the benchmarks")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="small")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--corpus-dir", default=None, help="Corpus location (default: bench_corpus/<scale>)")
+    run_parser.add_argument("--output", default="-", help="Results file, '-' for stdout")
+    run_parser.add_argument("--benchmarks", default=None, help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--skip-micro", action="store_true")
+    run_parser.add_argument("--skip-load", action="store_true")
+    run_parser.add_argument("--clients", type=int, default=4)
+    run_parser.add_argument("--uploads", type=int, default=20)
+    run_parser.add_argument("--load-types", default="pdf,excel", help="Extractor types uploaded by the load test")
+    run_parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled in the load test")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the micro-benchmark medians of two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=1.1, help="Ratio reported as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        args.corpus_dir = args.corpus_dir or os.path.join("bench_corpus", args.scale)
+        results = run(args)
+        output = json.dumps(results, indent=2, default=str)
+        if args.output == "-":
+            print(output)
+        else:
+            with open(args.output, "w") as f:
+                f.write(output)
+            logger.info(f"Wrote results to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current)
+    regressions = [row for row in rows if row["ratio"] is not None and row["ratio"] > args.threshold]
+    print(json.dumps({"comparisons": rows, "regressions": regressions}, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import csv
+import datetime
+import json
+import logging
+import os
+import random
+from typing import Dict, Any, List
+
+# Import the necessary libraries for the spreadsheet and image documents
+try:
+    import openpyxl
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    logging.warning("openpyxl or PIL not installed. Spreadsheet and image documents can't be generated.")
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Corpus sizes; every document is generated from the seed, so a scale always
+# produces the same content
+SCALES = {
+    "small": {
+        "pdf_pages": [1, 10, 50],
+        "tall_sheet": (5_000, 8),
+        "wide_sheet": (200, 200),
+        "image_sizes": [(850, 1100), (1700, 2200)],
+    },
+    "medium": {
+        "pdf_pages": [10, 100, 500],
+        "tall_sheet": (50_000, 10),
+        "wide_sheet": (1_000, 500),
+        "image_sizes": [(850, 1100), (1700, 2200), (2550, 3300)],
+    },
+    "large": {
+        "pdf_pages": [100, 1_000, 2_000],
+        "tall_sheet": (200_000, 10),
+        "wide_sheet": (5_000, 1_000),
+        "image_sizes": [(1700, 2200), (2550, 3300), (5100, 6600)],
+    },
+}
+
+# Vocabulary for the generated text, so OCR and text extraction see real words
+WORDS = (
+    "the quick brown fox jumps over lazy dog invoice total amount due date account "
+    "customer order number payment received balance report quarter revenue expense "
+    "shipping address product quantity price discount tax summary page section table"
+).split()
+
+_EPOCH = datetime.datetime(2024, 1, 1)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def write_pdf(path: str, pages: int, rng: random.Random, lines_per_page: int = 40) -> None:
+    """Write a text PDF with one Helvetica text stream per page, without a PDF library"""
+    font_id = 3 + 2 * pages
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(pages)), pages
+        ),
+    ]
+    for page in range(pages):
+        lines = [f"(Page {page + 1}) Tj"]
+        lines += [f"0 -16 Td ({_sentence(rng, 10)}) Tj" for _ in range(lines_per_page - 1)]
+        stream = "BT /F1 11 Tf 56 760 Td " + " ".join(lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * page} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def _table_rows(rows: int, columns: int, rng: random.Random):
+    """Header and rows cycling through integer, float, text, date and boolean columns"""
+    kinds = ["id", "amount", "name", "date", "flag"]
+    header = [f"{kinds[i % len(kinds)]}_{i}" for i in range(columns)]
+    yield header
+    for row in range(rows):
+        values = []
+        for column in range(columns):
+            kind = kinds[column % len(kinds)]
+            if kind == "id":
+                values.append(row * columns + column)
+            elif kind == "amount":
+                values.append(round(rng.uniform(0, 10_000), 2))
+            elif kind == "name":
+                values.append(_sentence(rng, 2))
+            elif kind == "date":
+                values.append(_EPOCH + datetime.timedelta(days=rng.randrange(3650)))
+            else:
+                values.append(rng.random() < 0.5)
+        yield values
+
+
+def write_xlsx(path: str, rows: int, columns: int, rng: random.Random) -> None:
+    """Write a single-sheet workbook in openpyxl's streaming (write-only) mode"""
+    workbook = openpyxl.Workbook(write_only=True)
+    workbook.properties.created = workbook.properties.modified = _EPOCH
+    sheet = workbook.create_sheet("Data")
+    for values in _table_rows(rows, columns, rng):
+        sheet.append(values)
+    workbook.save(path)
+
+
+def write_csv(path: str, rows: int, columns: int, rng: random.Random) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        for values in _table_rows(rows, columns, rng):
+            writer.writerow([value.isoformat() if isinstance(value, datetime.datetime) else value for value in values])
+
+
+def _load_font(size: int):
+    """A scalable font when Pillow has one built in (>= 10.1), else the bitmap default"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_text_image(width: int, height: int, rng: random.Random) -> "Image.Image":
+    """Render lines of black text on a white page, sized like a scan at 100-600 DPI"""
+    image = Image.new("L", (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    font_size = max(10, width // 50)
+    font = _load_font(font_size)
+
+    margin = width // 12
+    y = margin
+    while y + font_size < height - margin:
+        draw.text((margin, y), _sentence(rng, 8), fill=0, font=font)
+        y += int(font_size * 1.6)
+    return image
+
+
+def _dpi_for(width: int) -> int:
+    # Page widths are multiples of a letter page at 100 DPI
+    return max(100, round(width / 8.5))
+
+
+def generate_corpus(output_dir: str, scale: str = "small", seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate the benchmark corpus and write its manifest
+
+    Args:
+        output_dir: Directory for the documents (created if missing)
+        scale: One of SCALES
+        seed: Seed for all generated content
+
+    Returns:
+        Manifest entries: file name, path, extractor type, generation parameters and size
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown corpus scale: {scale}")
+    spec = SCALES[scale]
+    os.makedirs(output_dir, exist_ok=True)
+
+    documents: List[Dict[str, Any]] = []
+
+    def add(file_name: str, extractor_type: str, writer, **params):
+        path = os.path.join(output_dir, file_name)
+        # Each document gets its own generator so adding documents doesn't change the others
+        writer(path, rng=random.Random(f"{seed}:{file_name}"))
+        documents.append({
+            "file_name": file_name,
+            "path": path,
+            "extractor_type": extractor_type,
+            "params": params,
+            "size_bytes": os.path.getsize(path),
+        })
+        logger.info(f"Generated {file_name}")
+
+    for pages in spec["pdf_pages"]:
+        add(f"text_{pages}p.pdf", "pdf", lambda path, rng, pages=pages: write_pdf(path, pages, rng), pages=pages)
+
+    for shape, (rows, columns) in (("tall", spec["tall_sheet"]), ("wide", spec["wide_sheet"])):
+        add(
+            f"{shape}_{rows}x{columns}.xlsx", "excel",
+            lambda path, rng, rows=rows, columns=columns: write_xlsx(path, rows, columns, rng),
+            rows=rows, columns=columns
+        )
+        add(
+            f"{shape}_{rows}x{columns}.csv", "excel",
+            lambda path, rng, rows=rows, columns=columns: write_csv(path, rows, columns, rng),
+            rows=rows, columns=columns
+        )
+
+    for width, height in spec["image_sizes"]:
+        dpi = _dpi_for(width)
+        for ext in ("png", "tiff"):
+            add(
+                f"scan_{width}x{height}.{ext}", "image",
+                lambda path, rng, width=width, height=height, dpi=dpi: render_text_image(width, height, rng).save(path, dpi=(dpi, dpi)),
+                width=width, height=height, dpi=dpi
+            )
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"scale": scale, "seed": seed, "documents": documents}, f, indent=2)
+
+    return documents
+
+
+def load_corpus(output_dir: str, scale: str = "small", seed: int = 0) -> List[Dict[str, Any]]:
+    """Load the corpus manifest, generating the corpus if it is missing or was built differently"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if (
+            manifest.get("scale") == scale
+            and manifest.get("seed") == seed
+            and all(os.path.exists(document["path"]) for document in manifest["documents"])
+        ):
+            return manifest["documents"]
+
+    return generate_corpus(output_dir, scale=scale, seed=seed)
@@ -0,0 +1,133 @@
+import importlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from ..core import config
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("completed", "failed", "cancelled", "timed_out")
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"min": None, "median": None, "p95": None, "max": None}
+    values = sorted(values)
+    return {
+        "min": values[0],
+        "median": statistics.median(values),
+        "p95": values[min(len(values) - 1, round(0.95 * (len(values) - 1)))],
+        "max": values[-1],
+    }
+
+
+def _load_app(work_dir: str, use_cache: bool):
+    """Import the API with its uploads, task store, results, search index and cache inside work_dir"""
+    module_name = __package__.rsplit(".", 1)[0] + ".main"
+    if module_name in sys.modules:
+        logger.warning("The API was already imported; the load test reuses its configuration")
+        return sys.modules[module_name]
+
+    config.UPLOAD_DIR = os.path.join(work_dir, "uploads")
+    config.TASK_STORE_PATH = os.path.join(work_dir, "tasks.db")
+    config.RESULT_CACHE_DIR = os.path.join(work_dir, "cache")
+    config.RESULT_DIR = os.path.join(work_dir, "results")
+    config.SEARCH_INDEX_PATH = os.path.join(work_dir, "search.db")
+    if not use_cache:
+        # Repeated documents must be extracted again, not served from the cache
+        config.RESULT_CACHE_MEMORY_MB = 0
+        config.RESULT_CACHE_DISK_MB = 0
+    return importlib.import_module(module_name)
+
+
+def run_load_test(
+    documents: List[Dict[str, Any]],
+    clients: int = 4,
+    uploads: int = 20,
+    poll_interval: float = 0.05,
+    timeout: float = 600.0,
+    use_cache: bool = False,
+    work_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Upload documents through /upload and poll /status until they finish, from concurrent clients
+
+    The app runs in-process behind Starlette's test client with the configured
+    scheduler and executor, so the numbers include request handling, queueing,
+    task store and executor overhead but no network. Uploads rejected with a 429
+    are counted under "http_429".
+
+    Args:
+        documents: Corpus manifest entries, uploaded round-robin
+        clients: Number of concurrent clients
+        uploads: Total number of uploads
+        poll_interval: Seconds between /status polls
+        timeout: Seconds of polling before a task is counted as "poll_timeout"
+        use_cache: Keep the result cache enabled
+        work_dir: Directory for uploads, task store and cache (a temporary one by default)
+
+    Returns:
+        Dict with throughput, latency percentiles (seconds) and per-status counts
+    """
+    from fastapi.testclient import TestClient
+
+    if not documents:
+        raise ValueError("No documents to upload")
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="extractor-bench-")
+    main = _load_app(work_dir, use_cache)
+
+    def run_one(index: int, client: "TestClient") -> Dict[str, Any]:
+        document = documents[index % len(documents)]
+        start = time.perf_counter()
+        with open(document["path"], "rb") as f:
+            response = client.post("/upload", files={"file": (document["file_name"], f)})
+        upload_seconds = time.perf_counter() - start
+        if response.status_code != 200:
+            return {"document": document["file_name"], "status": f"http_{response.status_code}"}
+
+        task_id = response.json()["task_id"]
+        polls = 0
+        status = response.json()["status"]
+        while status not in FINISHED and time.perf_counter() - start < timeout:
+            time.sleep(poll_interval)
+            status = client.get(f"/status/{task_id}").json()["status"]
+            polls += 1
+
+        return {
+            "document": document["file_name"],
+            "status": status if status in FINISHED else "poll_timeout",
+            "upload_seconds": upload_seconds,
+            "total_seconds": time.perf_counter() - start,
+            "polls": polls,
+        }
+
+    with TestClient(main.app) as client:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(lambda index: run_one(index, client), range(uploads)))
+        elapsed = time.perf_counter() - start
+
+    statuses: Dict[str, int] = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    completed = [result for result in results if result["status"] == "completed"]
+
+    return {
+        "clients": clients,
+        "uploads": uploads,
+        "executor": config.EXTRACTION_EXECUTOR,
+        "workers": config.EXTRACTION_WORKERS,
+        "cache": use_cache,
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": len(completed) / elapsed if elapsed else None,
+        "statuses": statuses,
+        "upload_seconds": _percentiles([result["upload_seconds"] for result in completed]),
+        "total_seconds": _percentiles([result["total_seconds"] for result in completed]),
+    }
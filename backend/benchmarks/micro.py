@@ -0,0 +1,168 @@
+import gc
+import logging
+import statistics
+import time
+from typing import Dict, Any, List, Callable, Optional
+
+from ..core import config
+from ..utils.helpers import chunk_text
+
+logger = logging.getLogger(__name__)
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time repeated calls of a function
+
+    Args:
+        fn: The function to time
+        repeat: Number of timed calls
+        warmup: Untimed calls made first (imports, caches, lazily built state)
+
+    Returns:
+        Dict with the timings in seconds and the value returned by the last call
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    value = None
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        "repeat": len(timings),
+        "min": timings[0],
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "p95": timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))],
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "value": value,
+    }
+
+
+def _result_size(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "content_length": len(result.get("content") or ""),
+        "page_count": result.get("page_count", 1),
+    }
+
+
+def _record(name: str, document: Optional[Dict[str, Any]], timing: Dict[str, Any], **extra) -> Dict[str, Any]:
+    value = timing.pop("value")
+    record = {"name": name, "document": document["file_name"] if document else None, **timing, **extra}
+    if isinstance(value, dict):
+        record.update(_result_size(value))
+    return record
+
+
+def bench_pdf(documents: List[Dict[str, Any]], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    from ..extractors.pdf_extractor import PDFExtractor
+
+    # Serial extraction and the parallel page-range path are measured separately
+    serial = PDFExtractor(max_workers=1)
+    parallel = PDFExtractor(max_workers=config.PDF_PAGE_WORKERS)
+    records = []
+    for document in documents:
+        for variant, extractor in (("serial", serial), ("parallel", parallel)):
+            timing = time_call(lambda: extractor.extract(document["path"]), repeat, warmup)
+            records.append(_record(f"pdf.{variant}", document, timing))
+    return records
+
+
+def bench_excel(documents: List[Dict[str, Any]], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    from ..extractors.excel_extractor import ExcelExtractor, STREAMING_EXTENSIONS
+
+    extractor = ExcelExtractor()
+    records = []
+    for document in documents:
+        modes = ["streaming", "pandas"] if document["path"].lower().endswith(STREAMING_EXTENSIONS) else ["pandas"]
+        for mode in modes:
+            timing = time_call(
+                lambda: extractor.extract(document["path"], options={"excel_mode": mode}), repeat, warmup
+            )
+            records.append(_record(f"excel.{mode}", document, timing))
+    return records
+
+
+def bench_image(documents: List[Dict[str, Any]], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    from ..extractors.image_extractor import ImageExtractor
+    from ..extractors.ocr_engine import create_ocr_engine
+
+    engine = create_ocr_engine(config.OCR_ENGINE, config.OCR_POOL_SIZE)
+    if getattr(engine, "version", None) is None:
+        # Without tesseract the numbers would only measure a failing call
+        return [{"name": "image", "document": None, "skipped": "tesseract is not installed"}]
+
+    extractor = ImageExtractor(ocr_engine=engine)
+    records = []
+    for document in documents:
+        for variant, options in (("tiled", {}), ("single", {"ocr": {"tiles": False}})):
+            timing = time_call(lambda: extractor.extract(document["path"], options=options), repeat, warmup)
+            records.append(_record(f"image.{variant}", document, timing, engine=engine.name))
+    engine.close()
+    return records
+
+
+def bench_chunk_text(documents: List[Dict[str, Any]], repeat: int, warmup: int) -> List[Dict[str, Any]]:
+    from ..extractors.pdf_extractor import PDFExtractor
+
+    # Chunk the text of the largest PDF in the corpus
+    pdfs = sorted(documents, key=lambda document: document["params"].get("pages", 0))
+    if not pdfs:
+        return []
+    text = PDFExtractor(max_workers=1).extract(pdfs[-1]["path"])["content"]
+
+    records = []
+    for chunk_size in (500, 1000, 4000):
+        timing = time_call(lambda: chunk_text(text, chunk_size=chunk_size), repeat, warmup)
+        chunks = timing["value"]
+        timing["value"] = None
+        records.append(_record(
+            "chunk_text", pdfs[-1], timing,
+            chunk_size=chunk_size, text_length=len(text), chunk_count=len(chunks)
+        ))
+    return records
+
+
+BENCHMARKS = {
+    "pdf": (bench_pdf, "pdf"),
+    "excel": (bench_excel, "excel"),
+    "image": (bench_image, "image"),
+    "chunk_text": (bench_chunk_text, "pdf"),
+}
+
+
+def run_micro_benchmarks(
+    documents: List[Dict[str, Any]],
+    names: Optional[List[str]] = None,
+    repeat: int = 5,
+    warmup: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Run the extractor and chunking micro-benchmarks over a corpus
+
+    Args:
+        documents: Corpus manifest entries (see corpus.generate_corpus)
+        names: Benchmarks to run (keys of BENCHMARKS); all by default
+        repeat: Timed calls per benchmark
+        warmup: Untimed calls per benchmark
+
+    Returns:
+        One record per benchmark and document with timings in seconds
+    """
+    records = []
+    for name in names or list(BENCHMARKS):
+        bench, extractor_type = BENCHMARKS[name]
+        selected = [document for document in documents if document["extractor_type"] == extractor_type]
+        logger.info(f"Running {name} benchmarks on {len(selected)} documents")
+        try:
+            records.extend(bench(selected, repeat, warmup))
+        except Exception as e:
+            logger.error(f"{name} benchmark failed: {str(e)}")
+            records.append({"name": name, "document": None, "error": str(e)})
+    return records
@@ -0,0 +1 @@
+# Offline bulk extraction package
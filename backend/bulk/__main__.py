@@ -0,0 +1,79 @@
+"""
+Offline bulk extraction
+
+    python -m extractor.backend.bulk /data/inbox /data/extracted --format parquet --workers 8
+
+Extracts every supported file under a directory tree on a process pool, without
+the API, into JSONL or Parquet shards. The manifest in the output directory
+records each file's content hash, so running the same command again resumes an
+interrupted run and skips files already extracted.
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+
+from ..core import config
+from ..core.extractor_registry import parse_extractor_types
+from .manifest import ManifestMismatchError
+from .runner import run_bulk
+from .shards import SHARD_FORMATS, pa
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m extractor.backend.bulk", description="Offline bulk extraction")
+    parser.add_argument("source", help="Directory tree of documents to extract")
+    parser.add_argument("output", help="Directory the shards and the manifest are written to")
+    parser.add_argument("--format", choices=SHARD_FORMATS, default="jsonl")
+    parser.add_argument("--workers", type=int, default=config.EXTRACTION_WORKERS)
+    parser.add_argument("--options", default=None, help='JSON extraction options, e.g. \'{"ocr_mode": "hybrid"}\'')
+    parser.add_argument("--pages", action="store_true", help="Store each document's pages besides its content")
+    parser.add_argument("--retry-failed", action="store_true", help="Extract files that failed in an earlier run again")
+    parser.add_argument("--shard-documents", type=int, default=1000, help="Documents per shard")
+    parser.add_argument("--shard-mb", type=int, default=256, help="Approximate text per shard in megabytes")
+    parser.add_argument("--timeout", type=int, default=config.TASK_TIMEOUT_SECONDS, help="Seconds per file, 0 for no limit")
+    parser.add_argument("--page-timeout", type=int, default=config.PAGE_TIMEOUT_SECONDS, help="Seconds per page, 0 for no limit")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between throughput lines")
+    parser.add_argument("--prewarm", default=",".join(config.PREWARM_EXTRACTORS), help="Extractors loaded when a worker starts")
+    parser.add_argument("--verbose", action="store_true", help="Log every extraction")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.format == "parquet" and pa is None:
+        parser.error("Parquet shards require pyarrow")
+    try:
+        options = json.loads(args.options) if args.options else {}
+    except json.JSONDecodeError as e:
+        parser.error(f"Invalid extraction options: {str(e)}")
+    if not isinstance(options, dict):
+        parser.error("Extraction options must be a JSON object")
+
+    try:
+        summary = run_bulk(
+            args.source,
+            args.output,
+            shard_format=args.format,
+            workers=args.workers,
+            options=options,
+            include_pages=args.pages,
+            retry_failed=args.retry_failed,
+            shard_documents=args.shard_documents,
+            shard_bytes=args.shard_mb * 1024 * 1024,
+            timeout=args.timeout or None,
+            page_timeout=args.page_timeout or None,
+            progress_interval=args.progress_interval,
+            prewarm=parse_extractor_types(args.prewarm.split(","))
+        )
+    except ManifestMismatchError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(json.dumps(summary, indent=2))
+    return 130 if summary["interrupted"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Optional, List
+
+# Document states recorded in the manifest
+DONE = "done"
+FAILED = "failed"
+
+
+class ManifestMismatchError(ValueError):
+    """Raised when a run is resumed with different extraction settings"""
+
+
+class BulkManifest:
+    """
+    Progress of a bulk extraction run, in a SQLite database next to its output
+
+    Documents are keyed by content hash, so a resumed run skips files that are
+    already done (also under another path or name), and a file copied twice
+    into the tree is extracted once. Hashes are remembered per path, size and
+    mtime, so an unchanged tree isn't re-read to be hashed on resume.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    file_hash TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    extractor_type TEXT,
+                    status TEXT NOT NULL,
+                    page_count INTEGER,
+                    file_size INTEGER,
+                    shard TEXT,
+                    error TEXT,
+                    finished_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS paths (
+                    path TEXT PRIMARY KEY,
+                    file_size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    file_hash TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def check_settings(self, settings: Dict[str, Any]) -> None:
+        """
+        Record the run's settings, or make sure a resumed run uses the same ones
+
+        Raises:
+            ManifestMismatchError: The output was written with other settings
+        """
+        value = json.dumps(settings, sort_keys=True)
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'run'").fetchone()
+        if row is None:
+            with self._conn:
+                self._conn.execute("INSERT INTO settings (key, value) VALUES ('run', ?)", (value,))
+        elif row[0] != value:
+            raise ManifestMismatchError(
+                f"{self.db_path} was written with different settings ({row[0]}); use a new output directory"
+            )
+
+    def cached_hash(self, path: str, file_size: int, mtime_ns: int) -> Optional[str]:
+        """The hash recorded for a path, if the file hasn't changed since"""
+        row = self._conn.execute(
+            "SELECT file_hash FROM paths WHERE path = ? AND file_size = ? AND mtime_ns = ?",
+            (path, file_size, mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def remember_hash(self, path: str, file_size: int, mtime_ns: int, file_hash: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO paths (path, file_size, mtime_ns, file_hash) VALUES (?, ?, ?, ?)",
+                (path, file_size, mtime_ns, file_hash)
+            )
+
+    def get_status(self, file_hash: str) -> Optional[str]:
+        row = self._conn.execute("SELECT status FROM documents WHERE file_hash = ?", (file_hash,)).fetchone()
+        return row[0] if row else None
+
+    def mark(self, documents: List[Dict[str, Any]], status: str) -> None:
+        """Record finished documents (dicts with file_hash, path and optional details) in one transaction"""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO documents
+                    (file_hash, path, extractor_type, status, page_count, file_size, shard, error, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        document["file_hash"], document["path"], document.get("extractor_type"), status,
+                        document.get("page_count"), document.get("file_size"), document.get("shard"),
+                        document.get("error"), now
+                    )
+                    for document in documents
+                ]
+            )
+
+    def get_stats(self) -> Dict[str, int]:
+        """Documents by status"""
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM documents GROUP BY status").fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,313 @@
+import glob
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, List, Iterator, Tuple, TextIO, Deque
+
+from ..core.executor import _init_worker, _run_extraction
+from ..core.extractor_registry import create_default_registry
+from ..models.models import ExtractorType
+from ..utils.helpers import get_file_hash
+from ..utils.sniffing import SNIFF_BYTES, UnsupportedContentError
+from ..utils.uploads import CONTENT_HASH_ALGORITHM
+from .manifest import DONE, FAILED, BulkManifest
+from .shards import create_shard_writer
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.db"
+
+
+def _extract_file(
+    file_path: str,
+    extractor_type: ExtractorType,
+    options: Dict[str, Any],
+    timeout: Optional[float],
+    page_timeout: Optional[float]
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run one extraction in a pool worker; the deadline starts when the worker picks the file up"""
+    deadline = time.time() + timeout if timeout else None
+    return _run_extraction(file_path, extractor_type, options, deadline=deadline, page_timeout=page_timeout)
+
+
+class Throughput:
+    """Running totals and rates of a bulk run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.documents = 0
+        self.pages = 0
+        self.bytes = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def add(self, pages: int, file_size: int) -> None:
+        self.documents += 1
+        self.pages += pages
+        self.bytes += file_size
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "documents": self.documents,
+            "pages": self.pages,
+            "megabytes": round(self.bytes / (1024 * 1024), 3),
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "docs_per_second": round(self.documents / elapsed, 3),
+            "pages_per_second": round(self.pages / elapsed, 3),
+            "mb_per_second": round(self.bytes / (1024 * 1024) / elapsed, 3),
+        }
+
+    def format(self) -> str:
+        stats = self.snapshot()
+        return (
+            f"{stats['documents']} docs ({stats['failed']} failed, {stats['skipped']} skipped) in "
+            f"{stats['elapsed_seconds']:.0f}s: {stats['docs_per_second']:.1f} docs/s, "
+            f"{stats['pages_per_second']:.1f} pages/s, {stats['mb_per_second']:.2f} MB/s"
+        )
+
+
+def iter_files(
+    source_dir: str,
+    exclude_dir: Optional[str] = None
+) -> Iterator[Tuple[str, str, Optional[ExtractorType], Optional[str]]]:
+    """
+    Walk a directory tree in a stable order, yielding the files with a supported extension
+
+    Each file is routed by its leading bytes, so a mislabeled document goes to
+    the extractor for its actual format, and one no extractor handles is
+    reported without taking up a worker.
+
+    Returns:
+        Iterator of (path, path relative to source_dir, extractor type, error);
+        the extractor type is None and error says why when the content isn't supported
+    """
+    registry = create_default_registry()
+    exclude = os.path.abspath(exclude_dir) if exclude_dir else None
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude)
+        for name in sorted(files):
+            if registry.extractor_type_for(name) is None:
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+            try:
+                extractor_type, _ = registry.extractor_type_for_content(head, name, complete=len(head) < SNIFF_BYTES)
+                error = None
+            except UnsupportedContentError as e:
+                extractor_type, error = None, f"Unsupported file content: {str(e)}"
+            yield path, os.path.relpath(path, source_dir), extractor_type, error
+
+
+def _create_pool(workers: int, prewarm: Optional[List[ExtractorType]]) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(None, None, prewarm))
+
+
+def _record(document: Dict[str, Any], result: Dict[str, Any], include_pages: bool) -> Dict[str, Any]:
+    record = {
+        "path": document["path"],
+        "file_hash": document["file_hash"],
+        "extractor_type": document["extractor_type"],
+        "page_count": result.get("page_count"),
+        "metadata": result.get("metadata"),
+        "content": result.get("content"),
+    }
+    if include_pages:
+        record["pages"] = result.get("pages")
+    if result.get("structured_data") is not None:
+        record["structured_data"] = result["structured_data"]
+    return record
+
+
+def run_bulk(
+    source_dir: str,
+    output_dir: str,
+    shard_format: str = "jsonl",
+    workers: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+    include_pages: bool = False,
+    retry_failed: bool = False,
+    shard_documents: int = 1000,
+    shard_bytes: int = 256 * 1024 * 1024,
+    timeout: Optional[float] = None,
+    page_timeout: Optional[float] = None,
+    progress_interval: float = 5.0,
+    prewarm: Optional[List[ExtractorType]] = None,
+    out: TextIO = sys.stderr
+) -> Dict[str, Any]:
+    """
+    Extract every supported file under a directory into result shards, resumably
+
+    Files are hashed in this process and skipped when the manifest has their
+    hash as done (or failed, unless retry_failed). The rest are extracted on a
+    process pool of long-lived DataExtractionApp workers, at most two files
+    per worker in flight, so memory doesn't grow with the size of the tree.
+    Files in flight when a worker crashes are retried alone, one at a time,
+    so only the file that crashes a worker again is marked failed.
+
+    Args:
+        source_dir: Directory tree to extract
+        output_dir: Where the shards and the manifest are written
+        shard_format: "jsonl" or "parquet"
+        workers: Extraction processes (defaults to the number of cores)
+        options: Extraction options applied to every file (ExtractionRequest.options)
+        include_pages: Store each document's pages besides its content
+        retry_failed: Extract files that failed in an earlier run again
+        shard_documents: Documents per shard
+        shard_bytes: Approximate text per shard
+        timeout: Seconds allowed per file (None for no limit)
+        page_timeout: Seconds allowed per page, sheet or OCR tile
+        progress_interval: Seconds between throughput lines written to out
+        prewarm: Extractor types loaded when a worker starts
+        out: Stream throughput lines are written to
+
+    Returns:
+        Final throughput totals, manifest counts and the shards written
+    """
+    options = options or {}
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    manifest = BulkManifest(os.path.join(output_dir, MANIFEST_NAME))
+    manifest.check_settings({"options": options, "format": shard_format, "pages": include_pages})
+    # Shards an interrupted run left unfinished; their documents weren't marked done
+    for stale in glob.glob(os.path.join(glob.escape(output_dir), "*.tmp")):
+        os.remove(stale)
+    writer = create_shard_writer(shard_format, output_dir, max_documents=shard_documents, max_bytes=shard_bytes)
+
+    meter = Throughput()
+    # Hashes submitted but not yet durable, so a copy of a file in flight is skipped
+    in_flight: set = set()
+    # Futures in flight with their document and the pool they run on
+    pending: Dict[Future, Tuple[Dict[str, Any], ProcessPoolExecutor]] = {}
+    pools = {
+        "main": _create_pool(workers, prewarm),
+        # Files that were in flight when a worker crashed run here alone, one at a time
+        "isolated": _create_pool(1, prewarm),
+    }
+    suspects: Deque[Dict[str, Any]] = deque()
+    last_report = time.perf_counter()
+    interrupted = False
+
+    def submit(document: Dict[str, Any], pool_name: str = "main") -> None:
+        pool = pools[pool_name]
+        future = pool.submit(
+            _extract_file, document["file_path"], ExtractorType(document["extractor_type"]),
+            options, timeout, page_timeout
+        )
+        pending[future] = (document, pool)
+
+    def replace_pool(pool_name: str, broken: ProcessPoolExecutor) -> None:
+        if pools[pool_name] is broken:
+            # The first failure seen from a broken pool replaces it
+            pools[pool_name] = _create_pool(workers if pool_name == "main" else 1, prewarm)
+            broken.shutdown(wait=False, cancel_futures=True)
+            logger.warning(f"Extraction worker pool restarted ({pool_name})")
+
+    def dispatch_suspect() -> None:
+        isolated = pools["isolated"]
+        if suspects and not any(pool is isolated for _, pool in pending.values()):
+            submit(suspects.popleft(), "isolated")
+
+    def finish(future: Future) -> None:
+        document, submitted_on = pending.pop(future)
+        try:
+            result, _ = future.result()
+        except BrokenProcessPool:
+            if submitted_on is pools["isolated"]:
+                replace_pool("isolated", submitted_on)
+                error = "The extraction worker crashed"
+            else:
+                # A crash breaks the whole pool, so any file in flight may have caused it
+                replace_pool("main", submitted_on)
+                suspects.append(document)
+                return
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        else:
+            entry = {key: document[key] for key in ("file_hash", "path", "extractor_type", "file_size")}
+            entry["page_count"] = result.get("page_count")
+            durable = writer.write(_record(document, result, include_pages), entry)
+            meter.add(result.get("page_count") or 0, document["file_size"])
+            commit(durable)
+            return
+
+        logger.warning(f"Extraction failed for {document['path']}: {error}")
+        meter.failed += 1
+        manifest.mark([{**document, "error": error}], FAILED)
+        in_flight.discard(document["file_hash"])
+
+    def commit(durable: List[Dict[str, Any]]) -> None:
+        if durable:
+            manifest.mark(durable, DONE)
+            for entry in durable:
+                in_flight.discard(entry["file_hash"])
+
+    def collect(limit: int) -> None:
+        nonlocal last_report
+        dispatch_suspect()
+        while len(pending) > limit:
+            done, _ = wait(list(pending), timeout=progress_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(future)
+            dispatch_suspect()
+            if time.perf_counter() - last_report >= progress_interval:
+                last_report = time.perf_counter()
+                print(meter.format(), file=out, flush=True)
+
+    try:
+        for file_path, path, extractor_type, error in iter_files(source_dir, exclude_dir=output_dir):
+            stat = os.stat(file_path)
+            file_hash = manifest.cached_hash(path, stat.st_size, stat.st_mtime_ns)
+            if file_hash is None:
+                file_hash = get_file_hash(file_path, algorithm=CONTENT_HASH_ALGORITHM)
+                manifest.remember_hash(path, stat.st_size, stat.st_mtime_ns, file_hash)
+
+            status = manifest.get_status(file_hash)
+            if file_hash in in_flight or status == DONE or (status == FAILED and not retry_failed):
+                meter.skipped += 1
+                continue
+
+            document = {
+                "file_path": file_path,
+                "path": path,
+                "file_hash": file_hash,
+                "extractor_type": extractor_type.value if extractor_type else None,
+                "file_size": stat.st_size,
+            }
+            if extractor_type is None:
+                logger.warning(f"Skipping {path}: {error}")
+                meter.failed += 1
+                manifest.mark([{**document, "error": error}], FAILED)
+                continue
+
+            in_flight.add(file_hash)
+            submit(document)
+            collect(workers * 2)
+        collect(0)
+    except KeyboardInterrupt:
+        # Files in flight are redone by the next run; what is already extracted is kept
+        interrupted = True
+        for pool in pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        commit(writer.close())
+        for pool in pools.values():
+            pool.shutdown(wait=not interrupted)
+
+    print(meter.format(), file=out, flush=True)
+    summary = {
+        **meter.snapshot(),
+        "interrupted": interrupted,
+        "manifest": manifest.get_stats(),
+        "shards": writer.shards,
+        "output_dir": output_dir,
+    }
+    manifest.close()
+    return summary
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+# pyarrow is optional and only needed for Parquet shards
+try:
+    import pyarrow as pa
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+    logging.info("pyarrow not installed. Parquet shards will not be available.")
+
+logger = logging.getLogger(__name__)
+
+SHARD_FORMATS = ("jsonl", "parquet")
+
+# Documents per Parquet row group
+PARQUET_ROW_GROUP_DOCUMENTS = 64
+
+
+class ShardWriter:
+    """
+    Writes extraction records to numbered shard files
+
+    A shard is written under a temporary name and renamed once it is full or
+    the run ends, so every shard file on disk is complete. write() and close()
+    return the documents whose shard was just renamed; only those are durable
+    and may be marked done in the manifest, so an interrupted run redoes at
+    most one shard's worth of documents.
+    """
+
+    extension = ""
+
+    def __init__(self, output_dir: str, max_documents: int = 1000, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            output_dir: Directory the shards are written to
+            max_documents: Documents per shard
+            max_bytes: Approximate uncompressed text per shard
+        """
+        self.output_dir = output_dir
+        self.max_documents = max(1, max_documents)
+        self.max_bytes = max(1, max_bytes)
+        # Resumed runs start new shards instead of appending to earlier ones; the
+        # suffix keeps a run started within the same second from replacing them
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.shards: List[str] = []
+        self._index = 0
+        self._path: Optional[str] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._bytes = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, record: Dict[str, Any], document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Add a record to the current shard
+
+        Args:
+            record: The extraction record written to the shard
+            document: Manifest entry of the record's document
+
+        Returns:
+            Documents made durable by this write (empty until a shard is full)
+        """
+        if self._path is None:
+            self._path = os.path.join(self.output_dir, f"part-{self.run_id}-{self._index:05d}.{self.extension}")
+            self._open(self._path + ".tmp")
+        self._bytes += self._write(record)
+        self._pending.append(document)
+        if len(self._pending) >= self.max_documents or self._bytes >= self.max_bytes:
+            return self._finish_shard()
+        return []
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Finish the current shard and return its documents"""
+        if self._path is None:
+            return []
+        return self._finish_shard()
+
+    def _finish_shard(self) -> List[Dict[str, Any]]:
+        self._close()
+        os.replace(self._path + ".tmp", self._path)
+        shard = os.path.basename(self._path)
+        self.shards.append(shard)
+        logger.info(f"Wrote {len(self._pending)} documents to {shard}")
+
+        finished = [{**document, "shard": shard} for document in self._pending]
+        self._index += 1
+        self._path = None
+        self._pending = []
+        self._bytes = 0
+        return finished
+
+    def _open(self, path: str) -> None:
+        raise NotImplementedError
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        """Write one record and return its approximate size in bytes"""
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class JsonlShardWriter(ShardWriter):
+    """One JSON object per line"""
+
+    extension = "jsonl"
+
+    def _open(self, path: str) -> None:
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        self._file.write(line)
+        return len(line)
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetShardWriter(ShardWriter):
+    """
+    Parquet files with one row per document
+
+    Metadata and structured data vary by document type, so they are stored as
+    JSON strings; pages are a list column.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        if pa is None:
+            raise RuntimeError("Parquet shards require pyarrow")
+        super().__init__(*args, **kwargs)
+        self.schema = pa.schema([
+            ("path", pa.string()),
+            ("file_hash", pa.string()),
+            ("extractor_type", pa.string()),
+            ("page_count", pa.int64()),
+            ("content", pa.large_string()),
+            ("pages", pa.list_(pa.large_string())),
+            ("metadata", pa.string()),
+            ("structured_data", pa.large_string()),
+        ])
+        self._rows: List[Dict[str, Any]] = []
+
+    def _open(self, path: str) -> None:
+        self._writer = pa.parquet.ParquetWriter(path, self.schema, compression="zstd")
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        row = {name: record.get(name) for name in self.schema.names}
+        for name in ("metadata", "structured_data"):
+            if row[name] is not None:
+                row[name] = json.dumps(row[name], default=str, ensure_ascii=False)
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_ROW_GROUP_DOCUMENTS:
+            self._flush_rows()
+        return len(row["content"] or "") + len(row["structured_data"] or "")
+
+    def _flush_rows(self) -> None:
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def _close(self) -> None:
+        self._flush_rows()
+        self._writer.close()
+
+
+def create_shard_writer(shard_format: str, output_dir: str, **kwargs: Any) -> ShardWriter:
+    """
+    Create a shard writer
+
+    Args:
+        shard_format: "jsonl" or "parquet"
+        output_dir: Directory the shards are written to
+        **kwargs: max_documents and max_bytes per shard
+    """
+    if shard_format == "jsonl":
+        return JsonlShardWriter(output_dir, **kwargs)
+    if shard_format == "parquet":
+        return ParquetShardWriter(output_dir, **kwargs)
+    raise ValueError(f"Unsupported shard format: {shard_format}")
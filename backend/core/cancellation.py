@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Callable
+
+
+class ExtractionCancelled(Exception):
+    """Raised inside an extraction whose task was cancelled or deleted"""
+
+
+class ExtractionTimedOut(ExtractionCancelled):
+    """Raised inside an extraction that ran past its task or page deadline"""
+
+
+class CancellationToken:
+    """
+    Cancellation state of one extraction, checked by extractors between units of work
+
+    Args:
+        is_cancelled: Returns True once the task was cancelled; polled at most
+            every poll_interval seconds since it may query the task store
+        deadline: Wall-clock time (time.time()) the whole extraction must finish by
+        page_timeout: Seconds allowed between two checks, i.e. for one page,
+            sheet or OCR tile
+        poll_interval: Minimum seconds between is_cancelled calls
+    """
+
+    def __init__(
+        self,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        deadline: Optional[float] = None,
+        page_timeout: Optional[float] = None,
+        poll_interval: float = 0.25
+    ):
+        self.is_cancelled = is_cancelled
+        self.deadline = deadline
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self._unit_started = time.time()
+        self._last_poll = 0.0
+
+    def check(self) -> None:
+        """Raise ExtractionCancelled or ExtractionTimedOut if the extraction must stop"""
+        now = time.time()
+        if self.deadline is not None and now > self.deadline:
+            raise ExtractionTimedOut("Extraction exceeded its deadline")
+        if self.page_timeout is not None and now - self._unit_started > self.page_timeout:
+            raise ExtractionTimedOut(f"A page took longer than {self.page_timeout:g} seconds")
+        self._unit_started = now
+
+        if self.is_cancelled is not None and now - self._last_poll >= self.poll_interval:
+            self._last_poll = now
+            if self.is_cancelled():
+                raise ExtractionCancelled("Extraction was cancelled")
+
+
+# Token of the extraction running in the current context (a worker call)
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("cancellation_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make check_cancelled() inside the block check the given token"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def check_cancelled() -> None:
+    """
+    Stop the current extraction if it was cancelled or ran out of time
+
+    Extractors call this between pages, sheets and OCR tiles; outside a
+    cancellation_scope it does nothing, like metrics.stage().
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.check()
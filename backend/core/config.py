@@ -0,0 +1,127 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# Load settings from a local .env file if one is present
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a string setting from the environment, treating blanks as unset"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+# Directory where uploaded documents are stored while they are processed
+UPLOAD_DIR = _env_str("UPLOAD_DIR", "uploads")
+
+# Where extractions run: "process" (default), "thread" or "inline" (on the event loop)
+EXTRACTION_EXECUTOR = _env_str("EXTRACTION_EXECUTOR", "process")
+
+# Number of extraction workers; defaults to the number of cores
+EXTRACTION_WORKERS = _env_int("EXTRACTION_WORKERS", os.cpu_count() or 1)
+
+# multiprocessing start method for the process pool (None uses the platform default)
+EXTRACTION_START_METHOD = _env_str("EXTRACTION_START_METHOD")
+
+# Deadlines in seconds for a whole extraction and for a single page, sheet or
+# OCR tile (0 disables); tasks past them end as "timed_out"
+TASK_TIMEOUT_SECONDS = _env_int("TASK_TIMEOUT_SECONDS", 30 * 60)
+PAGE_TIMEOUT_SECONDS = _env_int("PAGE_TIMEOUT_SECONDS", 5 * 60)
+
+# Time a cancelled or overdue extraction gets to stop at its next page before
+# its process worker is killed
+CANCEL_GRACE_SECONDS = _env_int("CANCEL_GRACE_SECONDS", 5)
+
+# Per-type upload size limits in megabytes, keyed by extractor type
+MAX_UPLOAD_BYTES = {
+    "pdf": _env_int("MAX_UPLOAD_MB_PDF", 200) * 1024 * 1024,
+    "image": _env_int("MAX_UPLOAD_MB_IMAGE", 100) * 1024 * 1024,
+    "excel": _env_int("MAX_UPLOAD_MB_EXCEL", 100) * 1024 * 1024,
+    "archive": _env_int("MAX_UPLOAD_MB_ARCHIVE", 2048) * 1024 * 1024,
+}
+
+# Most bytes the members of one uploaded archive may decompress to together,
+# whatever the members' headers claim
+ARCHIVE_MAX_UNPACKED_BYTES = _env_int("ARCHIVE_MAX_UNPACKED_MB", 8192) * 1024 * 1024
+
+# Most documents accepted in one batch upload (files or archive members)
+BATCH_MAX_FILES = _env_int("BATCH_MAX_FILES", 10000)
+
+# Documents of a batch on the scheduler (queued or running) at once; keeps
+# every worker busy without filling the queue with one batch
+BATCH_CONCURRENCY = _env_int("BATCH_CONCURRENCY", 2 * EXTRACTION_WORKERS)
+
+# Scheduler: extractions running at once (defaults to the number of workers),
+# per extractor type, and jobs allowed to wait before uploads get a 429
+SCHEDULER_MAX_RUNNING = _env_int("SCHEDULER_MAX_RUNNING", EXTRACTION_WORKERS)
+SCHEDULER_TYPE_LIMITS = {
+    "pdf": _env_int("SCHEDULER_LIMIT_PDF", SCHEDULER_MAX_RUNNING),
+    # OCR is the most expensive, so by default it can't take every worker
+    "image": _env_int("SCHEDULER_LIMIT_IMAGE", max(1, SCHEDULER_MAX_RUNNING // 2)),
+    "excel": _env_int("SCHEDULER_LIMIT_EXCEL", SCHEDULER_MAX_RUNNING),
+}
+SCHEDULER_QUEUE_SIZE = _env_int("SCHEDULER_QUEUE_SIZE", 1000)
+
+# Extraction result cache: in-memory LRU tier and on-disk tier (0 disables a tier)
+RESULT_CACHE_MEMORY_MB = _env_int("RESULT_CACHE_MEMORY_MB", 256)
+RESULT_CACHE_DISK_MB = _env_int("RESULT_CACHE_DISK_MB", 2048)
+RESULT_CACHE_DIR = _env_str("RESULT_CACHE_DIR", "cache")
+
+# Task store backend: "sqlite" (shared between API workers) or "memory"
+TASK_STORE = _env_str("TASK_STORE", "sqlite")
+TASK_STORE_PATH = _env_str("TASK_STORE_PATH", "tasks.db")
+
+# Where completed results are kept: "file" (compressed result files read through
+# mmap, so finished tasks cost no heap) or "task_store" (inline in the task store)
+RESULT_STORAGE = _env_str("RESULT_STORAGE", "file")
+RESULT_DIR = _env_str("RESULT_DIR", "results")
+
+# Full-text search index over completed tasks: "sqlite" (FTS5) or "none"
+SEARCH_INDEX = _env_str("SEARCH_INDEX", "sqlite")
+SEARCH_INDEX_PATH = _env_str("SEARCH_INDEX_PATH", "search.db")
+
+# Finished tasks and their uploaded files are removed after this many seconds
+TASK_TTL_SECONDS = _env_int("TASK_TTL_SECONDS", 24 * 60 * 60)
+
+# Queued or running tasks not updated for this long are removed with their files too
+ACTIVE_TASK_TTL_SECONDS = _env_int("ACTIVE_TASK_TTL_SECONDS", 2 * 24 * 60 * 60)
+
+# How often the background eviction of expired tasks runs
+TASK_EVICTION_INTERVAL_SECONDS = _env_int("TASK_EVICTION_INTERVAL_SECONDS", 60)
+
+# Processes each extraction worker uses to extract page ranges of large PDFs in
+# parallel; the default splits the cores between the extraction workers, which
+# may all be extracting large PDFs at once
+PDF_PAGE_WORKERS = _env_int("PDF_PAGE_WORKERS", max(1, (os.cpu_count() or 1) // EXTRACTION_WORKERS))
+
+# Default PDF OCR mode: "off" (text layer only) or "hybrid" (render and OCR pages
+# with fewer than PDF_OCR_MIN_TEXT_CHARS characters of text; needs pypdfium2)
+PDF_OCR_MODE = _env_str("PDF_OCR_MODE", "off")
+PDF_OCR_MIN_TEXT_CHARS = _env_int("PDF_OCR_MIN_TEXT_CHARS", 8)
+
+# OCR engine: "auto" (tesserocr when installed), "tesserocr" or "pytesseract"
+OCR_ENGINE = _env_str("OCR_ENGINE", "auto")
+
+# Threads each extraction worker OCRs tiles or pages with, unless a request's
+# "ocr" workers option says otherwise; the default splits the cores between
+# the extraction workers like PDF_PAGE_WORKERS
+OCR_WORKERS = _env_int("OCR_WORKERS", max(1, (os.cpu_count() or 1) // EXTRACTION_WORKERS))
+
+# Persistent tesseract API handles per worker and language (tesserocr engine),
+# shared by the worker's PDF and image extractors
+OCR_POOL_SIZE = _env_int("OCR_POOL_SIZE", OCR_WORKERS)
+
+# Extractors loaded when a worker starts instead of on first use ("pdf,image,excel" or "all")
+PREWARM_EXTRACTORS = (_env_str("PREWARM_EXTRACTORS", "") or "").split(",")
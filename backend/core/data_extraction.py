@@ -1,12 +1,13 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterable
 import os
+import time
 import logging
 from enum import Enum
 
-from ..extractors.pdf_extractor import PDFExtractor
-from ..extractors.image_extractor import ImageExtractor
-from ..extractors.excel_extractor import ExcelExtractor
 from ..models.models import ExtractorType
+from ..utils.sniffing import SNIFF_BYTES
+from .cancellation import ExtractionCancelled
+from .extractor_registry import ExtractorRegistry, create_default_registry, current_rss_bytes
 
 # Configure logging
 logging.basicConfig(
@@ -18,22 +19,41 @@ logger = logging.getLogger(__name__)
 class DataExtractionApp:
     """Main class for document extraction functionality"""
     
-    def __init__(self):
-        """Initialize the data extraction application"""
-        self.extractors = {
-            ExtractorType.PDF: PDFExtractor(),
-            ExtractorType.IMAGE: ImageExtractor(),
-            ExtractorType.EXCEL: ExcelExtractor(),
-        }
-        logger.info("DataExtractionApp initialized")
+    def __init__(
+        self,
+        registry: Optional[ExtractorRegistry] = None,
+        prewarm: Optional[Iterable[ExtractorType]] = None
+    ):
+        """
+        Initialize the data extraction application; create one per worker and reuse it
+        
+        Args:
+            registry: Extractor registry; extractor backends are imported on first use
+            prewarm: Extractor types to load now instead of on first use
+        """
+        start = time.perf_counter()
+        self.registry = registry or create_default_registry()
+        if prewarm:
+            self.registry.prewarm(prewarm)
+        self.startup_seconds = round(time.perf_counter() - start, 4)
+        logger.info(f"DataExtractionApp initialized in {self.startup_seconds:.3f}s")
     
-    def extract(self, file_path: str, extractor_type: Optional[ExtractorType] = None) -> Dict[str, Any]:
+    def extract(
+        self,
+        file_path: str,
+        extractor_type: Optional[ExtractorType] = None,
+        options: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Extract content from a document
         
         Args:
             file_path: Path to the document file
-            extractor_type: The type of extractor to use. If None, determined from file extension.
+            extractor_type: The type of extractor to use. If None, determined from the file's content.
+            options: Extractor-specific options (ExtractionRequest.options)
+            progress_callback: Called with (page index, page count, page text)
+                as each page or sheet is extracted
             
         Returns:
             Dict containing extraction results (content, metadata, etc.)
@@ -47,38 +67,39 @@ class DataExtractionApp:
         
         logger.info(f"Extracting content from {file_path} using {extractor_type.value} extractor")
         
-        # Get the appropriate extractor
-        extractor = self.extractors.get(extractor_type)
-        if not extractor:
-            raise ValueError(f"No extractor available for type: {extractor_type}")
+        # Get the appropriate extractor, loading its backend on first use
+        extractor = self.registry.get(extractor_type)
         
         # Perform extraction
         try:
-            result = extractor.extract(file_path)
+            result = extractor.extract(file_path, options=options or {}, progress_callback=progress_callback)
             logger.info(f"Successfully extracted content from {file_path}")
             return result
+        except ExtractionCancelled as e:
+            logger.info(f"Extraction stopped for {file_path}: {str(e)}")
+            raise
         except Exception as e:
             logger.error(f"Extraction failed for {file_path}: {str(e)}")
             raise
     
     def _determine_extractor_type(self, file_path: str) -> ExtractorType:
-        """Determine the appropriate extractor type based on file extension"""
-        _, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-        
-        if ext in ['.pdf']:
-            return ExtractorType.PDF
-        elif ext in ['.jpg', '.jpeg', '.png', '.tiff', '.bmp']:
-            return ExtractorType.IMAGE
-        elif ext in ['.xlsx', '.xls', '.csv']:
-            return ExtractorType.EXCEL
-        else:
-            raise ValueError(f"Unsupported file extension: {ext}")
+        """Determine the appropriate extractor type from the file's leading bytes, whatever its extension"""
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+        extractor_type, _ = self.registry.extractor_type_for_content(
+            head, os.path.basename(file_path), complete=len(head) < SNIFF_BYTES
+        )
+        return extractor_type
     
     def get_supported_formats(self) -> Dict[str, list]:
         """Get all supported file formats by extractor type"""
+        return self.registry.supported_formats()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Startup time, resident memory and per-extractor load costs of this worker"""
         return {
-            "pdf": [".pdf"],
-            "image": [".jpg", ".jpeg", ".png", ".tiff", ".bmp"],
-            "excel": [".xlsx", ".xls", ".csv"]
+            "pid": os.getpid(),
+            "startup_seconds": self.startup_seconds,
+            "rss_bytes": current_rss_bytes(),
+            "extractors": self.registry.get_stats(),
         }
\ No newline at end of file
@@ -0,0 +1,432 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, List, Tuple
+
+from .cancellation import CancellationToken, ExtractionCancelled, ExtractionTimedOut, cancellation_scope
+from .data_extraction import DataExtractionApp
+from .extractor_registry import create_default_registry
+from .task_store import TaskStore, SQLiteTaskStore
+from .metrics import STAGE_SECONDS, collect_stage_timings, stage
+from ..models.models import ExtractorType, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("process", "thread", "inline")
+
+# Seconds between watchdog checks of running extractions
+WATCHDOG_INTERVAL_SECONDS = 1.0
+
+# Task statuses that tell a running extraction to stop (a deleted task stops too)
+STOP_STATUSES = (ProcessingStatus.CANCELLED, ProcessingStatus.TIMED_OUT)
+
+# Extraction app owned by the current worker, created once by the pool initializer
+_worker_app: Optional[DataExtractionApp] = None
+
+# Task store that workers publish per-page progress to
+_worker_store: Optional[TaskStore] = None
+
+
+def _init_worker(
+    task_store: Optional[TaskStore] = None,
+    task_store_path: Optional[str] = None,
+    prewarm: Optional[List[ExtractorType]] = None
+) -> None:
+    """Pool initializer: build the worker's long-lived DataExtractionApp and task store handle"""
+    global _worker_app, _worker_store
+    if _worker_app is None:
+        _worker_app = DataExtractionApp(prewarm=prewarm)
+    if _worker_store is None:
+        if task_store is not None:
+            _worker_store = task_store
+        elif task_store_path is not None:
+            # Worker processes open their own connection to the shared database
+            _worker_store = SQLiteTaskStore(task_store_path)
+
+
+def _warm_up() -> bool:
+    """No-op task used to force the pool to start its workers"""
+    return _worker_app is not None
+
+
+def _worker_stats() -> Dict[str, Any]:
+    """Startup and memory stats of the worker that runs this"""
+    return _worker_app.get_stats()
+
+
+def _run_extraction(
+    file_path: str,
+    extractor_type: Optional[ExtractorType],
+    options: Optional[Dict[str, Any]],
+    task_id: Optional[str] = None,
+    deadline: Optional[float] = None,
+    page_timeout: Optional[float] = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run a single extraction inside a worker, publishing pages as they are extracted
+
+    The extraction stops with ExtractionCancelled at the next page, sheet or OCR
+    tile once its task is cancelled or deleted, and with ExtractionTimedOut once
+    it passes the deadline or a single page takes longer than page_timeout.
+
+    Returns:
+        Tuple of (extraction result, stage timings); the timings include the
+        wall-clock start time so the caller can tell how long the task queued
+    """
+    started_at = time.time()
+    if _worker_app is None:
+        _init_worker()
+
+    progress_callback = None
+    is_cancelled = None
+    if task_id is not None and _worker_store is not None:
+        def progress_callback(page_num: int, page_count: int, content: str) -> None:
+            with stage("publish"):
+                _worker_store.add_page(task_id, page_num, content, page_count)
+
+        def is_cancelled() -> bool:
+            status = _worker_store.get_status(task_id)
+            return status is None or status in STOP_STATUSES
+
+        if multiprocessing.parent_process() is not None:
+            # Lets the API kill this worker if the extraction stops responding
+            _worker_store.update(task_id, worker_pid=os.getpid())
+
+    token = CancellationToken(is_cancelled, deadline=deadline, page_timeout=page_timeout)
+    with collect_stage_timings() as timings, cancellation_scope(token):
+        # The task may have been cancelled while it waited for a worker
+        token.check()
+        with stage("extract"):
+            result = _worker_app.extract(
+                file_path,
+                extractor_type=extractor_type,
+                options=options,
+                progress_callback=progress_callback
+            )
+    timings["started_at"] = started_at
+    return result, timings
+
+
+def _process_tree(pid: int) -> List[int]:
+    """A process and its descendants, children first (descendants are only found through Linux /proc)"""
+    children: List[int] = []
+    try:
+        for thread in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{thread}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    tree: List[int] = []
+    for child in children:
+        tree.extend(_process_tree(child))
+    tree.append(pid)
+    return tree
+
+
+class _RunningExtraction:
+    """Deadlines and cancellation state of an extraction, watched from the API process"""
+
+    def __init__(self, task_id: Optional[str], deadline: Optional[float], page_timeout: Optional[float]):
+        self.task_id = task_id
+        self.deadline = deadline
+        self.page_timeout = page_timeout
+        self.cancelled_at: Optional[float] = None
+        self.worker_pid: Optional[int] = None
+        # Set once the watchdog gave up on the extraction
+        self.stop_reason: Optional[ExtractionCancelled] = None
+
+
+class ExtractionExecutor:
+    """Runs document extractions off the API event loop"""
+
+    def __init__(
+        self,
+        mode: str = "process",
+        max_workers: int = 1,
+        start_method: Optional[str] = None,
+        task_store: Optional[TaskStore] = None,
+        prewarm: Optional[List[ExtractorType]] = None,
+        cancel_grace_seconds: float = 5.0
+    ):
+        """
+        Configure the executor
+
+        Args:
+            mode: "process" for a process pool, "thread" for a thread pool or
+                "inline" to run extractions directly on the calling thread
+            max_workers: Number of pool workers
+            start_method: multiprocessing start method for the process pool
+            task_store: Store that extracted pages are published to while a
+                task runs (process pools need a SQLiteTaskStore for this)
+            prewarm: Extractor types every worker loads at startup; with a
+                fork-based pool their modules are imported once before forking
+            cancel_grace_seconds: Time a cancelled or overdue extraction gets to
+                stop on its own before its process worker is killed
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unsupported executor mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.start_method = start_method
+        self.task_store = task_store
+        self.prewarm = prewarm or []
+        self.cancel_grace_seconds = cancel_grace_seconds
+        self._pool: Optional[Executor] = None
+        self._running: Dict[str, _RunningExtraction] = {}
+        self.in_flight = 0
+        self.workers_killed = 0
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def queue_depth(self) -> int:
+        """Submitted extractions waiting for a free worker"""
+        if self.mode == "inline":
+            return 0
+        return max(0, self.in_flight - self.max_workers)
+
+    @property
+    def publishes_progress(self) -> bool:
+        """Whether workers can publish pages to the task store while extracting"""
+        if self.task_store is None:
+            return False
+        return self.mode != "process" or isinstance(self.task_store, SQLiteTaskStore)
+
+    def start(self) -> None:
+        """Create the worker pool and warm up every worker"""
+        if self._pool is not None:
+            return
+
+        if self.mode == "inline":
+            _init_worker(task_store=self.task_store, prewarm=self.prewarm)
+            return
+
+        if self.mode == "process":
+            context = multiprocessing.get_context(self.start_method)
+            if self.prewarm and context.get_start_method() == "fork":
+                # Forked workers share the parent's already-imported backends copy-on-write
+                create_default_registry().prewarm(self.prewarm, instantiate=False)
+            if self.task_store is not None and not isinstance(self.task_store, SQLiteTaskStore):
+                self.logger.warning(
+                    "Progress is not published and extractions can't be cancelled "
+                    "in process workers without a SQLite task store"
+                )
+        self._pool = self._create_pool()
+
+        # Start all workers now so the first uploads don't pay the startup cost
+        futures = [self._pool.submit(_warm_up) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+        self.logger.info(f"Started {self.mode} extraction executor with {self.max_workers} workers")
+
+    def _create_pool(self) -> Executor:
+        if self.mode == "process":
+            store_path = self.task_store.db_path if isinstance(self.task_store, SQLiteTaskStore) else None
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(None, store_path, self.prewarm)
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="extraction",
+            initializer=_init_worker,
+            initargs=(self.task_store, None, self.prewarm)
+        )
+
+    def _replace_pool(self, broken: Executor) -> None:
+        """Start a new process pool after a worker was killed (the old pool can't be used anymore)"""
+        if self._pool is not broken:
+            # Another extraction on the same pool already replaced it
+            return
+        self._pool = self._create_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.logger.warning("Extraction worker pool restarted")
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self.logger.info("Extraction executor stopped")
+
+    async def get_worker_stats(self) -> Dict[str, Any]:
+        """Startup time, memory and loaded extractors of a pool worker"""
+        if self._pool is None:
+            self.start()
+
+        if self.mode == "inline":
+            return _worker_stats()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _worker_stats)
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Ask a running extraction to stop
+
+        The worker stops at its next page once it sees the task cancelled or
+        deleted in the task store; if it is still running after the grace
+        period, its process worker is killed.
+
+        Returns:
+            False if the task has no running extraction
+        """
+        running = self._running.get(task_id)
+        if running is None:
+            return False
+        if running.cancelled_at is None:
+            running.cancelled_at = time.time()
+            # The task record may be gone by the time the watchdog needs the pid
+            self._load_worker_pid(running)
+        return True
+
+    def _load_worker_pid(self, running: _RunningExtraction) -> None:
+        if running.worker_pid is None and running.task_id is not None and self.task_store is not None:
+            task = self.task_store.get(running.task_id, include_result=False)
+            if task is not None:
+                running.worker_pid = task.get("worker_pid")
+
+    def _overdue(self, running: _RunningExtraction) -> Optional[ExtractionCancelled]:
+        """Why the watchdog has to stop an extraction, or None while it may keep running"""
+        now = time.time()
+        grace = self.cancel_grace_seconds
+        if running.cancelled_at is not None and now - running.cancelled_at > grace:
+            return ExtractionCancelled("Extraction was cancelled")
+        if running.deadline is not None and now > running.deadline + grace:
+            return ExtractionTimedOut("Extraction exceeded its deadline")
+        if running.task_id is None or self.task_store is None:
+            return None
+
+        task = self.task_store.get(running.task_id, include_result=False)
+        if task is None:
+            return None
+        if running.worker_pid is None:
+            running.worker_pid = task.get("worker_pid")
+        # Every published page refreshes the task's updated_at
+        if running.page_timeout is not None and self.publishes_progress and now - task["updated_at"] > running.page_timeout + grace:
+            return ExtractionTimedOut(f"No page was extracted within {running.page_timeout:g} seconds")
+        return None
+
+    def _kill_worker(self, running: _RunningExtraction) -> bool:
+        """Kill the process worker running an extraction, with any page workers it started"""
+        self._load_worker_pid(running)
+        pid = running.worker_pid
+        # Only ever kill a current worker of this pool, never a reused pid
+        if pid is None or pid not in (getattr(self._pool, "_processes", None) or {}):
+            return False
+
+        self.logger.warning(f"Killing extraction worker {pid} of task {running.task_id}: {running.stop_reason}")
+        for process_id in _process_tree(pid):
+            try:
+                os.kill(process_id, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+        self.workers_killed += 1
+        return True
+
+    async def _watch(self, future: "asyncio.Future", running: _RunningExtraction) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Wait for an extraction, stopping it once it is cancelled or overdue"""
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=WATCHDOG_INTERVAL_SECONDS)
+            if done:
+                return future.result()
+            if running.stop_reason is not None:
+                # Already killed; the future fails as soon as the pool notices
+                continue
+
+            reason = await asyncio.to_thread(self._overdue, running)
+            if reason is None:
+                continue
+            running.stop_reason = reason
+            if self.mode == "process" and await asyncio.to_thread(self._kill_worker, running):
+                continue
+
+            # Threads can't be killed; the worker stops at its next check, its result is dropped
+            self.logger.warning(f"Abandoning extraction of task {running.task_id}: {reason}")
+            future.add_done_callback(lambda abandoned: abandoned.cancelled() or abandoned.exception())
+            raise reason
+
+    async def _submit_watched(self, running: _RunningExtraction, *args: Any) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run an extraction on the pool, resubmitting it once if another task's worker was killed"""
+        loop = asyncio.get_running_loop()
+        retried = False
+        while True:
+            pool = self._pool
+            future = loop.run_in_executor(pool, _run_extraction, *args)
+            try:
+                return await self._watch(future, running)
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+                if running.stop_reason is not None:
+                    raise running.stop_reason
+                if retried:
+                    raise
+                # Killing a worker breaks the whole pool, so innocent extractions run again
+                retried = True
+                self.logger.warning(f"Extraction pool broke, resubmitting task {running.task_id}")
+
+    async def submit(
+        self,
+        file_path: str,
+        extractor_type: Optional[ExtractorType] = None,
+        options: Optional[Dict[str, Any]] = None,
+        task_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        page_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Run an extraction on the pool and wait for its result
+
+        Args:
+            file_path: Path to the document file
+            extractor_type: The type of extractor to use
+            options: Extractor-specific options
+            task_id: Task that extracted pages are published to
+            timeout: Seconds the extraction may take in total
+            page_timeout: Seconds a single page, sheet or OCR tile may take
+
+        Returns:
+            Dict containing extraction results
+
+        Raises:
+            ExtractionCancelled: The task was cancelled (see cancel)
+            ExtractionTimedOut: The extraction ran past timeout or page_timeout
+        """
+        if self._pool is None:
+            self.start()
+
+        submitted_at = time.time()
+        running = _RunningExtraction(task_id, submitted_at + timeout if timeout else None, page_timeout or None)
+        if task_id is not None:
+            self._running[task_id] = running
+        self.in_flight += 1
+        try:
+            args = (file_path, extractor_type, options, task_id, running.deadline, running.page_timeout)
+            if self.mode == "inline":
+                # Runs on the event loop, so only the extraction's own checks apply
+                result, timings = _run_extraction(*args)
+            else:
+                result, timings = await self._submit_watched(running, *args)
+        finally:
+            self.in_flight -= 1
+            if task_id is not None:
+                self._running.pop(task_id, None)
+
+        # Stage timings are measured in the worker and recorded in this process's metrics
+        label = extractor_type.value if extractor_type is not None else "unknown"
+        STAGE_SECONDS.observe(max(0.0, timings.pop("started_at") - submitted_at), stage="queue", extractor_type=label)
+        for name, seconds in timings.items():
+            STAGE_SECONDS.observe(seconds, stage=name, extractor_type=label)
+
+        if running.cancelled_at is not None:
+            # Finished before it noticed the cancellation
+            raise ExtractionCancelled("Extraction was cancelled")
+        return result
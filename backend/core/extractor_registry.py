@@ -0,0 +1,243 @@
+import importlib
+import logging
+import os
+import resource
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Iterable, Tuple
+
+from ..models.models import ExtractorType
+from ..utils.sniffing import ContentFormat, UnsupportedContentError, sniff_format
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+class ExtractorSpec:
+    """How to find and build one extractor, without importing it"""
+
+    def __init__(
+        self,
+        extractor_type: ExtractorType,
+        module: str,
+        class_name: str,
+        extensions: List[str],
+        factory: Optional[Callable[[type], Any]] = None
+    ):
+        """
+        Args:
+            extractor_type: The extractor type this spec provides
+            module: Module name relative to the extractors package
+            class_name: Name of the extractor class in that module
+            extensions: File extensions handled by the extractor (with dot)
+            factory: Builds an instance from the class; defaults to calling it
+        """
+        self.extractor_type = extractor_type
+        self.module = module
+        self.class_name = class_name
+        self.extensions = [ext.lower() for ext in extensions]
+        self.factory = factory
+
+
+class ExtractorRegistry:
+    """Maps file extensions to extractors, importing each backend on first use"""
+
+    def __init__(self):
+        self._specs: Dict[ExtractorType, ExtractorSpec] = {}
+        self._by_extension: Dict[str, ExtractorType] = {}
+        self._classes: Dict[ExtractorType, type] = {}
+        self._instances: Dict[ExtractorType, Any] = {}
+        self._stats: Dict[ExtractorType, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def register(self, spec: ExtractorSpec) -> None:
+        """Register an extractor spec"""
+        self._specs[spec.extractor_type] = spec
+        for ext in spec.extensions:
+            self._by_extension[ext] = spec.extractor_type
+
+    def extractor_type_for(self, filename: str) -> Optional[ExtractorType]:
+        """Extractor type for a filename's extension, or None if it isn't supported"""
+        ext = os.path.splitext(filename)[1].lower()
+        return self._by_extension.get(ext)
+
+    def extractor_type_for_content(
+        self,
+        head: bytes,
+        filename: Optional[str] = None,
+        complete: bool = False
+    ) -> Tuple[ExtractorType, ContentFormat]:
+        """
+        Extractor type for a file's leading bytes, whatever its extension says
+
+        Args:
+            head: Leading bytes of the file (see utils.sniffing.SNIFF_BYTES)
+            filename: The file's name, a hint for single-column CSV only
+            complete: head is the whole file
+
+        Returns:
+            Tuple of (extractor type, detected format)
+
+        Raises:
+            UnsupportedContentError: No registered extractor handles the content
+        """
+        content_format = sniff_format(head, filename, complete)
+        extractor_type = self._by_extension.get(content_format.extension)
+        if extractor_type is None:
+            raise UnsupportedContentError(f"{content_format.name} files are not supported")
+        return extractor_type, content_format
+
+    def supported_formats(self) -> Dict[str, List[str]]:
+        """Supported extensions by extractor type"""
+        return {extractor_type.value: list(spec.extensions) for extractor_type, spec in self._specs.items()}
+
+    def load_class(self, extractor_type: ExtractorType) -> type:
+        """Import an extractor's backend module, recording how long it took and the RSS it added"""
+        with self._lock:
+            if extractor_type in self._classes:
+                return self._classes[extractor_type]
+
+            spec = self._specs.get(extractor_type)
+            if spec is None:
+                raise ValueError(f"No extractor available for type: {extractor_type}")
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            module = importlib.import_module(f"..extractors.{spec.module}", __package__)
+            extractor_class = getattr(module, spec.class_name)
+
+            self._stats[extractor_type] = {
+                "import_seconds": round(time.perf_counter() - start, 4),
+                "import_rss_bytes": max(0, current_rss_bytes() - rss_before),
+            }
+            self._classes[extractor_type] = extractor_class
+            return extractor_class
+
+    def get(self, extractor_type: ExtractorType) -> Any:
+        """Get the extractor instance for a type, importing and building it on first use"""
+        with self._lock:
+            if extractor_type in self._instances:
+                return self._instances[extractor_type]
+
+            extractor_class = self.load_class(extractor_type)
+            spec = self._specs[extractor_type]
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            instance = spec.factory(extractor_class) if spec.factory else extractor_class()
+
+            self._stats[extractor_type].update({
+                "init_seconds": round(time.perf_counter() - start, 4),
+                "init_rss_bytes": max(0, current_rss_bytes() - rss_before),
+            })
+            self._instances[extractor_type] = instance
+            logger.info(
+                f"Loaded {extractor_type.value} extractor in "
+                f"{self._stats[extractor_type]['import_seconds'] + self._stats[extractor_type]['init_seconds']:.3f}s"
+            )
+            return instance
+
+    def prewarm(self, extractor_types: Iterable[ExtractorType], instantiate: bool = True) -> None:
+        """
+        Load extractors ahead of their first use
+
+        Args:
+            extractor_types: Types to load
+            instantiate: Build instances too; with False only the backend
+                modules are imported, e.g. in a parent process before forking
+        """
+        for extractor_type in extractor_types:
+            if instantiate:
+                self.get(extractor_type)
+            else:
+                self.load_class(extractor_type)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-extractor load state, import/init time and RSS growth"""
+        return {
+            extractor_type.value: {
+                "imported": extractor_type in self._classes,
+                "instantiated": extractor_type in self._instances,
+                **self._stats.get(extractor_type, {}),
+            }
+            for extractor_type in self._specs
+        }
+
+
+def parse_extractor_types(names: Iterable[str]) -> List[ExtractorType]:
+    """Turn configured names ("pdf", "image", "excel" or "all") into extractor types"""
+    names = [name.strip().lower() for name in names if name and name.strip()]
+    if "all" in names:
+        return list(ExtractorType)
+    return [ExtractorType(name) for name in names]
+
+
+# OCR engine shared by the PDF and image extractors of this worker process
+_ocr_engine: Optional[Tuple[int, Any]] = None
+_ocr_engine_lock = threading.Lock()
+
+
+def _shared_ocr_engine() -> Any:
+    """
+    The worker's OCR engine, created on first use
+
+    One engine (and so one pool of tesseract handles) serves every extractor
+    in the process; it is never inherited across a fork.
+    """
+    global _ocr_engine
+    from ..extractors.ocr_engine import create_ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is None or _ocr_engine[0] != os.getpid():
+            _ocr_engine = (os.getpid(), create_ocr_engine(config.OCR_ENGINE, config.OCR_POOL_SIZE))
+        return _ocr_engine[1]
+
+
+def _build_pdf_extractor(extractor_class: type) -> Any:
+    return extractor_class(
+        max_workers=config.PDF_PAGE_WORKERS,
+        ocr_mode=config.PDF_OCR_MODE,
+        min_text_chars=config.PDF_OCR_MIN_TEXT_CHARS,
+        # The engine is only created once a document needs OCR
+        ocr_engine_factory=_shared_ocr_engine
+    )
+
+
+def _build_image_extractor(extractor_class: type) -> Any:
+    return extractor_class(ocr_engine=_shared_ocr_engine())
+
+
+def create_default_registry() -> ExtractorRegistry:
+    """Registry of the built-in PDF, image and Excel extractors"""
+    registry = ExtractorRegistry()
+    registry.register(ExtractorSpec(
+        ExtractorType.PDF,
+        "pdf_extractor",
+        "PDFExtractor",
+        [".pdf"],
+        factory=_build_pdf_extractor
+    ))
+    registry.register(ExtractorSpec(
+        ExtractorType.IMAGE,
+        "image_extractor",
+        "ImageExtractor",
+        [".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp"],
+        factory=_build_image_extractor
+    ))
+    registry.register(ExtractorSpec(
+        ExtractorType.EXCEL,
+        "excel_extractor",
+        "ExcelExtractor",
+        [".xlsx", ".xls", ".csv"]
+    ))
+    return registry
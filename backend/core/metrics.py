@@ -0,0 +1,279 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterator
+
+# Upper bounds (seconds) of the stage histogram buckets, from quick page reads to long OCR jobs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """A named metric with a fixed set of label names; one series per label combination"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, either set directly or read from a function at scrape time"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) gauge from a function whenever metrics are rendered"""
+        self._function = function
+
+    def _samples(self) -> Iterator[str]:
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per series: (count per bucket, sum)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * len(self.buckets), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: Any):
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """The metrics of this process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "extractor_stage_seconds",
+    "Time spent in each processing stage (upload, queue, extract, publish, preprocess, ocr, store, cache, index)",
+    ("stage", "extractor_type")
+)
+TASKS_TOTAL = REGISTRY.counter(
+    "extractor_tasks_total",
+    "Finished extraction tasks by outcome (completed, cached, failed, cancelled, timed_out)",
+    ("extractor_type", "status")
+)
+CACHE_REQUESTS_TOTAL = REGISTRY.counter(
+    "extractor_cache_requests_total",
+    "Result cache lookups by result (hit, miss)",
+    ("result",)
+)
+REJECTED_TOTAL = REGISTRY.counter(
+    "extractor_rejected_total",
+    "Uploads rejected with a 429 because the scheduler queue was full (extractor_type=\"batch\" for batches)",
+    ("extractor_type",)
+)
+UPLOAD_CONTENT_TOTAL = REGISTRY.counter(
+    "extractor_upload_content_total",
+    "Uploaded documents by how their sniffed format compared with their extension (matched, mismatched, rejected)",
+    ("result",)
+)
+BYTES_PROCESSED_TOTAL = REGISTRY.counter(
+    "extractor_bytes_processed_total",
+    "Bytes of documents extracted (cache hits excluded)",
+    ("extractor_type",)
+)
+PAGES_PROCESSED_TOTAL = REGISTRY.counter(
+    "extractor_pages_processed_total",
+    "Pages (sheets for workbooks) extracted (cache hits excluded)",
+    ("extractor_type",)
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "extractor_queue_depth",
+    "Extractions queued on the scheduler or the executor, waiting for a free worker"
+)
+TASKS_IN_FLIGHT = REGISTRY.gauge(
+    "extractor_tasks_in_flight",
+    "Extractions running (started by the scheduler and not finished yet)"
+)
+TASK_STORE_TASKS = REGISTRY.gauge(
+    "extractor_task_store_tasks",
+    "Tasks in the task store"
+)
+
+
+# Stage timings of the extraction running in the current context (a worker call)
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+# Guards the timings dicts, which threads running in a copy of the context share
+_stage_timings_lock = threading.Lock()
+
+
+@contextmanager
+def collect_stage_timings():
+    """Collect the stage() timings recorded inside the block into the yielded dict"""
+    timings: Dict[str, float] = {}
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a stage of the current extraction
+
+    Durations add up when a stage runs more than once, including in threads
+    started with a copy of the context (contextvars.copy_context), so stages run
+    in parallel can total more than the wall time; outside collect_stage_timings
+    this does nothing, so extractors can be used without any instrumentation.
+    """
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stage_timings_lock:
+            timings[name] = timings.get(name, 0.0) + elapsed
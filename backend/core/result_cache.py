@@ -0,0 +1,271 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Options that only change how an extraction runs, not its result
+EXECUTION_OPTIONS = ("workers",)
+
+# Fraction of its budget the disk tier is trimmed to once it overflows, so the
+# directory scan that eviction needs runs once per many puts rather than on each
+DISK_EVICT_TO_FRACTION = 0.9
+
+
+def make_cache_key(content_hash: str, extractor_type: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cache key for an extraction
+
+    Args:
+        content_hash: Hash of the document contents
+        extractor_type: Extractor type value used for the extraction
+        options: Extraction options; EXECUTION_OPTIONS are left out of the key
+
+    Returns:
+        A hex key that identifies the extraction result
+    """
+    semantic_options = {key: value for key, value in (options or {}).items() if key not in EXECUTION_OPTIONS}
+    canonical_options = json.dumps(semantic_options, sort_keys=True, default=str)
+    key_source = f"{content_hash}:{extractor_type}:{canonical_options}"
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a result: the objects it is built from, not its JSON length
+
+    Shared objects (e.g. interned strings) are counted once.
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return size
+
+
+class MemoryResultCache:
+    """In-memory LRU tier, evicting least recently used entries by size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, result: Dict[str, Any], size: int) -> None:
+        # Entries larger than the whole tier are never cached
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+
+            self._entries[key] = (result, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskResultCache:
+    """On-disk tier of gzipped JSON files, evicting the least recently read by size"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Rebuild the size accounting from whatever a previous run left behind
+        self.total_bytes = 0
+        self.entry_count = 0
+        for path in self._iter_entries():
+            self.total_bytes += os.path.getsize(path)
+            self.entry_count += 1
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    yield os.path.join(root, name)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as f:
+                payload = gzip.decompress(f.read())
+            # Reads refresh the mtime, which drives eviction order
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+            self._remove(path)
+            return None
+        return json.loads(payload), len(payload)
+
+    def put(self, key: str, payload: bytes) -> None:
+        compressed = gzip.compress(payload, compresslevel=5)
+        if len(compressed) > self.max_bytes:
+            return
+
+        path = self._path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary name first so readers never see partial entries
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+
+        with self._lock:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else None
+            os.replace(tmp_path, path)
+            if previous_size is None:
+                self.entry_count += 1
+            else:
+                self.total_bytes -= previous_size
+            self.total_bytes += len(compressed)
+
+            if self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * DISK_EVICT_TO_FRACTION))
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            self.total_bytes -= size
+            self.entry_count -= 1
+
+    def _evict(self, target_bytes: int) -> None:
+        """Remove the oldest entries until the tier is down to target_bytes (lock held)"""
+        entries = []
+        for path in self._iter_entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Recount from disk, other processes may share this directory
+        self.total_bytes = sum(size for _, size, _ in entries)
+        self.entry_count = len(entries)
+
+        for _, size, path in sorted(entries):
+            if self.total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+            self.entry_count -= 1
+
+
+class ResultCache:
+    """Content-addressed cache of extraction results with memory and disk tiers"""
+
+    def __init__(self, memory_bytes: int, disk_bytes: int, cache_dir: Optional[str] = None):
+        """
+        Configure the cache tiers
+
+        Args:
+            memory_bytes: Size budget of the in-memory LRU tier (0 disables it)
+            disk_bytes: Size budget of the on-disk tier (0 disables it)
+            cache_dir: Directory for the on-disk tier
+        """
+        self.memory = MemoryResultCache(memory_bytes) if memory_bytes > 0 else None
+        self.disk = DiskResultCache(cache_dir, disk_bytes) if disk_bytes > 0 and cache_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, promoting disk hits into memory"""
+        if self.memory is not None:
+            result = self.memory.get(key)
+            if result is not None:
+                self.memory_hits += 1
+                return result
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                result, _ = entry
+                self.disk_hits += 1
+                if self.memory is not None:
+                    self.memory.put(key, result, estimate_size(result))
+                return result
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in every enabled tier"""
+        if self.memory is None and self.disk is None:
+            return
+
+        try:
+            payload = json.dumps(result, default=str).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Result for {key} is not cacheable: {str(e)}")
+            return
+
+        if self.memory is not None:
+            self.memory.put(key, result, estimate_size(result))
+        if self.disk is not None:
+            try:
+                self.disk.put(key, payload)
+            except OSError as e:
+                logger.warning(f"Failed to write cache entry {key}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "hits": self.memory_hits + self.disk_hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory) if self.memory is not None else 0,
+            "memory_bytes": self.memory.total_bytes if self.memory is not None else 0,
+            "disk_entries": self.disk.entry_count if self.disk is not None else 0,
+            "disk_bytes": self.disk.total_bytes if self.disk is not None else 0,
+        }
@@ -0,0 +1,256 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import uuid
+import zlib
+from array import array
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EXRESLT1"
+
+# Footer: offset and length of the compressed metadata block, then the magic again
+_FOOTER = struct.Struct("<QQ8s")
+
+# Content that isn't just the pages joined by a separator is stored in blocks of this many characters
+CONTENT_BLOCK_CHARS = 256 * 1024
+
+# Separators extractors join pages with, tried in order when deriving content from the pages
+_PAGE_SEPARATORS = ("\n\n", "\n", "")
+
+# Result keys stored as JSON sections of the file
+SECTION_KEYS = ("structured_data", "raw_data")
+
+# Result keys kept in the file rather than in the task record
+SPILLED_KEYS = ("pages", "content") + SECTION_KEYS
+
+
+class ResultFileError(RuntimeError):
+    """Raised when a result file is missing or corrupt"""
+
+
+class _Writer:
+    """Appends compressed segments to a file, tracking byte offsets"""
+
+    def __init__(self, f, level: int):
+        self.f = f
+        self.level = level
+        self.position = f.tell()
+
+    def write(self, data: bytes) -> int:
+        start = self.position
+        self.f.write(data)
+        self.position += len(data)
+        return start
+
+    def segment(self, text: str) -> int:
+        return self.write(zlib.compress(text.encode("utf-8"), self.level))
+
+    def align(self) -> None:
+        padding = -self.position % 8
+        if padding:
+            self.write(b"\0" * padding)
+
+    def table(self, values: List[int]) -> int:
+        """Write an array of unsigned 64-bit integers, 8-byte aligned, and return its offset"""
+        self.align()
+        return self.write(array("Q", values).tobytes())
+
+    def stream(self, segments: List[str], starts: List[int]) -> Dict[str, int]:
+        """
+        Write text segments and their index
+
+        The index is two tables of count + 1 entries: byte offsets of the
+        compressed segments, and character offsets of the segments in the text
+        they slice (so a character range maps to segments with a bisect).
+        """
+        offsets = []
+        for text in segments:
+            offsets.append(self.segment(text))
+        offsets.append(self.position)
+        return {
+            "count": len(segments),
+            "offsets": self.table(offsets),
+            "starts": self.table(starts),
+        }
+
+
+def _page_separator(pages: List[str], content: str) -> Optional[str]:
+    """The separator content was joined from the pages with, or None if it wasn't"""
+    total = sum(len(page) for page in pages)
+    for separator in _PAGE_SEPARATORS:
+        if len(content) != total + len(separator) * max(0, len(pages) - 1):
+            continue
+        if content == separator.join(pages):
+            return separator
+    return None
+
+
+def write_result_file(path: str, result: Dict[str, Any], level: int = 6) -> Dict[str, Any]:
+    """
+    Write an extraction result's pages, content and structured data to a compact file
+
+    Each page is a separately compressed segment, so one page or a character
+    range can be read without decompressing the rest. When the content is the
+    pages joined by a separator (as every extractor produces it), it isn't
+    stored a second time but sliced out of the pages.
+
+    Args:
+        path: Destination file, replaced atomically
+        result: Extraction result
+        level: zlib compression level
+
+    Returns:
+        Summary of the written file (pages, content length, file size)
+    """
+    pages = [page or "" for page in (result.get("pages") or [])]
+    content = result.get("content") or ""
+    separator = _page_separator(pages, content) if pages else None
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            writer = _Writer(f, level)
+            writer.write(MAGIC)
+
+            page_starts = [0]
+            for page in pages:
+                page_starts.append(page_starts[-1] + len(page) + len(separator or ""))
+            meta: Dict[str, Any] = {
+                "content_length": len(content),
+                "separator": separator,
+                "pages": writer.stream(pages, page_starts),
+                "content": None,
+                "sections": {},
+            }
+
+            if separator is None:
+                blocks = [content[i:i + CONTENT_BLOCK_CHARS] for i in range(0, len(content), CONTENT_BLOCK_CHARS)]
+                meta["content"] = writer.stream(blocks, [i * CONTENT_BLOCK_CHARS for i in range(len(blocks))] + [len(content)])
+
+            for key in SECTION_KEYS:
+                if result.get(key) is not None:
+                    data = zlib.compress(json.dumps(result[key], default=str).encode("utf-8"), level)
+                    meta["sections"][key] = [writer.write(data), len(data)]
+
+            meta_data = zlib.compress(json.dumps(meta).encode("utf-8"), level)
+            meta_offset = writer.write(meta_data)
+            writer.write(_FOOTER.pack(meta_offset, len(meta_data), MAGIC))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return {"page_count": len(pages), "content_length": len(content), "file_size": os.path.getsize(path)}
+
+
+class ResultFile:
+    """
+    Read access to a result file through a memory map
+
+    Only the metadata block is parsed on open; offset tables are read in place
+    from the map and only the segments a read needs are decompressed, so the
+    heap cost of a read is the slice it returns, not the document.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self._file = open(path, "rb")
+        except FileNotFoundError:
+            raise ResultFileError(f"Result file not found: {path}")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._map) < len(MAGIC) + _FOOTER.size or self._map[:len(MAGIC)] != MAGIC:
+                raise ResultFileError(f"Not a result file: {path}")
+            meta_offset, meta_length, magic = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+            if magic != MAGIC:
+                raise ResultFileError(f"Truncated result file: {path}")
+            self._meta = json.loads(zlib.decompress(self._map[meta_offset:meta_offset + meta_length]))
+        except BaseException:
+            self.close()
+            raise
+
+        self._view = memoryview(self._map)
+        self.content_length: int = self._meta["content_length"]
+        self._separator: Optional[str] = self._meta["separator"]
+        self._pages = self._tables(self._meta["pages"])
+        self._content = self._tables(self._meta["content"]) if self._meta["content"] else None
+
+    def _tables(self, stream: Dict[str, int]) -> Tuple[int, memoryview, memoryview]:
+        size = (stream["count"] + 1) * 8
+        offsets = self._view[stream["offsets"]:stream["offsets"] + size].cast("Q")
+        starts = self._view[stream["starts"]:stream["starts"] + size].cast("Q")
+        return stream["count"], offsets, starts
+
+    @staticmethod
+    def _segment_at(view: memoryview, offsets: memoryview, index: int) -> str:
+        return zlib.decompress(view[offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    @property
+    def page_count(self) -> int:
+        return self._pages[0]
+
+    def get_pages(self, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str]]:
+        """(page number, text) pairs with start <= page number < end"""
+        count, offsets, _ = self._pages
+        end = count if end is None else min(end, count)
+        return [(index, self._segment_at(self._view, offsets, index)) for index in range(max(0, start), end)]
+
+    def get_content(self, offset: int = 0, length: Optional[int] = None) -> Tuple[str, int]:
+        """A character range of the content and the total content length"""
+        end = self.content_length if length is None else min(self.content_length, offset + length)
+        if offset >= end:
+            return "", self.content_length
+
+        if self._content is not None:
+            count, offsets, starts = self._content
+            separator = ""
+        else:
+            count, offsets, starts = self._pages
+            separator = self._separator or ""
+
+        # Segments overlapping [offset, end); starts holds count + 1 entries
+        first = bisect.bisect_right(starts, offset, 0, count) - 1
+        last = bisect.bisect_left(starts, end, 0, count)
+        text = separator.join(self._segment_at(self._view, offsets, index) for index in range(first, last))
+        if last < count:
+            # The range can end inside the separator before the next page
+            text += separator
+        base = starts[first]
+        return text[offset - base:end - base], self.content_length
+
+    def get_section(self, key: str) -> Optional[Any]:
+        """Decode a JSON section such as structured_data, or None if the result had none"""
+        section = self._meta["sections"].get(key)
+        if section is None:
+            return None
+        offset, length = section
+        return json.loads(zlib.decompress(self._view[offset:offset + length]))
+
+    def close(self) -> None:
+        view = getattr(self, "_view", None)
+        if view is not None:
+            # Views into the map must be released before it can be closed
+            for table in (getattr(self, "_pages", None), getattr(self, "_content", None)):
+                if table is not None:
+                    table[1].release()
+                    table[2].release()
+            view.release()
+            self._view = None
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "ResultFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
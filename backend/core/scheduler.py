@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable, Deque, Tuple
+
+from ..models.models import ExtractorType, JobPriority
+
+logger = logging.getLogger(__name__)
+
+# Priority classes in the order they are served
+PRIORITY_ORDER = (JobPriority.INTERACTIVE, JobPriority.BULK)
+
+Job = Tuple[str, Callable[[], Awaitable[Any]], "asyncio.Future"]
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """Raised when the scheduler queue can't take more jobs"""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Extraction queue is full, retry in {retry_after} seconds")
+
+
+class ExtractionScheduler:
+    """
+    Admission control and ordering of extraction jobs
+
+    Jobs wait in a bounded queue per priority class and extractor type. Whenever a
+    slot frees up, the next job comes from the highest priority class with work,
+    and within that class from the type with the fewest running jobs, so a burst
+    of one type can't starve the others. Each type also has its own running limit.
+    """
+
+    def __init__(
+        self,
+        max_running: int,
+        type_limits: Optional[Dict[ExtractorType, int]] = None,
+        queue_size: int = 1000
+    ):
+        """
+        Args:
+            max_running: Jobs running at once (normally the number of extraction workers)
+            type_limits: Jobs of a type running at once; defaults to max_running
+            queue_size: Jobs waiting at once, across all classes and types
+        """
+        self.max_running = max(1, max_running)
+        self.type_limits = {
+            extractor_type: max(1, (type_limits or {}).get(extractor_type, self.max_running))
+            for extractor_type in ExtractorType
+        }
+        self.queue_size = max(1, queue_size)
+
+        self._queues: Dict[JobPriority, Dict[ExtractorType, Deque[Job]]] = {
+            priority: {extractor_type: deque() for extractor_type in ExtractorType} for priority in PRIORITY_ORDER
+        }
+        self._running: Dict[ExtractorType, int] = {extractor_type: 0 for extractor_type in ExtractorType}
+        # When each type last had a job started, to rotate between equally loaded types
+        self._last_started: Dict[ExtractorType, int] = {extractor_type: 0 for extractor_type in ExtractorType}
+        self._started = 0
+        self._tasks: set = set()
+        self._queued = 0
+        self._room: Optional[asyncio.Condition] = None
+
+        # Moving average of job run time, used for Retry-After
+        self._average_seconds = 1.0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up"""
+        return min(300, max(1, math.ceil(self._average_seconds / self.max_running)))
+
+    def check_capacity(self, count: int = 1) -> None:
+        """Raise SchedulerQueueFullError unless count more jobs can be queued"""
+        if self._queued + count > self.queue_size:
+            self.rejected += 1
+            raise SchedulerQueueFullError(self.retry_after())
+
+    def submit(
+        self,
+        job_id: str,
+        extractor_type: ExtractorType,
+        run: Callable[[], Awaitable[Any]],
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> "asyncio.Future":
+        """
+        Queue a job, or raise SchedulerQueueFullError if the queue is full
+
+        Args:
+            job_id: Identifies the job in logs (the task ID)
+            extractor_type: Type the per-type limit and fair sharing apply to
+            run: Coroutine function running the job
+            priority: Priority class
+
+        Returns:
+            Future resolved with the job's result once it has run
+        """
+        self.check_capacity()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[JobPriority(priority)][extractor_type].append((job_id, run, future))
+        self._queued += 1
+        self._dispatch()
+        return future
+
+    async def run(
+        self,
+        job_id: str,
+        extractor_type: ExtractorType,
+        run: Callable[[], Awaitable[Any]],
+        priority: JobPriority = JobPriority.BULK
+    ) -> Any:
+        """Queue a job, waiting for room instead of failing when the queue is full, and wait for it"""
+        room = self._room_condition()
+        async with room:
+            await room.wait_for(lambda: self._queued < self.queue_size)
+            future = self.submit(job_id, extractor_type, run, priority)
+        return await future
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Drop a queued job; its future is resolved with None
+
+        Returns:
+            False if the job isn't queued (it already started or never existed)
+        """
+        for queues in self._queues.values():
+            for queue in queues.values():
+                for job in queue:
+                    if job[0] == job_id:
+                        queue.remove(job)
+                        self._queued -= 1
+                        if not job[2].done():
+                            job[2].set_result(None)
+                        self._dispatch()
+                        return True
+        return False
+
+    def _room_condition(self) -> asyncio.Condition:
+        if self._room is None:
+            self._room = asyncio.Condition()
+        return self._room
+
+    def _next_job(self) -> Optional[Tuple[ExtractorType, Job]]:
+        for priority in PRIORITY_ORDER:
+            candidates = [
+                extractor_type
+                for extractor_type, queue in self._queues[priority].items()
+                if queue and self._running[extractor_type] < self.type_limits[extractor_type]
+            ]
+            if candidates:
+                # Fair sharing: the type with the fewest running jobs goes next,
+                # ties go to the type that waited longest
+                extractor_type = min(
+                    candidates, key=lambda candidate: (self._running[candidate], self._last_started[candidate])
+                )
+                return extractor_type, self._queues[priority][extractor_type].popleft()
+        return None
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are free slots"""
+        while self.running < self.max_running:
+            selected = self._next_job()
+            if selected is None:
+                break
+
+            extractor_type, (job_id, run, future) = selected
+            self._queued -= 1
+            self._running[extractor_type] += 1
+            self._started += 1
+            self._last_started[extractor_type] = self._started
+            logger.debug(f"Starting {extractor_type.value} job {job_id} ({self._queued} queued)")
+            task = asyncio.create_task(self._run_job(extractor_type, run, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._room is not None and self._queued < self.queue_size:
+            asyncio.create_task(self._notify_room())
+
+    async def _notify_room(self) -> None:
+        async with self._room:
+            self._room.notify_all()
+
+    async def _run_job(self, extractor_type: ExtractorType, run: Callable[[], Awaitable[Any]], future: "asyncio.Future") -> None:
+        start = time.perf_counter()
+        try:
+            result = await run()
+            if not future.done():
+                future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self._average_seconds = 0.9 * self._average_seconds + 0.1 * (time.perf_counter() - start)
+            self._running[extractor_type] -= 1
+            self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queued and running jobs by priority class and type, with the configured limits"""
+        return {
+            "max_running": self.max_running,
+            "queue_size": self.queue_size,
+            "queued": self._queued,
+            "running": self.running,
+            "rejected": self.rejected,
+            "average_job_seconds": round(self._average_seconds, 3),
+            "types": {
+                extractor_type.value: {
+                    "limit": self.type_limits[extractor_type],
+                    "running": self._running[extractor_type],
+                    "queued": {priority.value: len(self._queues[priority][extractor_type]) for priority in PRIORITY_ORDER},
+                }
+                for extractor_type in ExtractorType
+            },
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs and drop queued ones"""
+        for queues in self._queues.values():
+            for queue in queues.values():
+                while queue:
+                    _, _, future = queue.popleft()
+                    future.cancel()
+        self._queued = 0
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
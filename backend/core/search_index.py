@@ -0,0 +1,277 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("terms", "fts")
+
+
+class SearchQueryError(ValueError):
+    """Raised for a query the full-text index can't parse"""
+
+
+def fts5_available() -> bool:
+    """Whether the sqlite3 library Python is linked against was built with FTS5"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def build_match_query(query: str, mode: str = "terms") -> str:
+    """
+    Turn a search query into an FTS5 MATCH expression
+
+    In "terms" mode every whitespace-separated term must occur and is matched as
+    a phrase of its tokens, so "INV-2024-00123" finds exactly that invoice
+    number and punctuation never reaches the FTS5 query parser. "fts" mode
+    passes the query through as FTS5 syntax (OR, NOT, NEAR, prefix*, "phrases").
+    """
+    if mode not in SEARCH_MODES:
+        raise SearchQueryError(f"Unsupported search mode: {mode}")
+    if mode == "fts":
+        if not query.strip():
+            raise SearchQueryError("Empty search query")
+        return query
+
+    terms = query.split()
+    if not terms:
+        raise SearchQueryError("Empty search query")
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class SearchIndex:
+    """
+    Full-text index over the pages of completed tasks, in a SQLite FTS5 database
+
+    Each page is one row of the FTS table; a plain table maps its rowid to the
+    task and page number, so removing a task is an index lookup rather than a
+    scan of the full-text table. Results are ranked with BM25 and grouped by task.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(
+                    content,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indexed_pages (
+                    rowid INTEGER PRIMARY KEY,
+                    task_id TEXT NOT NULL,
+                    page_num INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_indexed_pages_task ON indexed_pages (task_id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indexed_documents (
+                    task_id TEXT PRIMARY KEY,
+                    file_name TEXT,
+                    page_count INTEGER NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets searches run alongside indexing"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _delete_rows(conn: sqlite3.Connection, task_id: str) -> int:
+        rowids = [row[0] for row in conn.execute("SELECT rowid FROM indexed_pages WHERE task_id = ?", (task_id,))]
+        conn.executemany("DELETE FROM page_text WHERE rowid = ?", ((rowid,) for rowid in rowids))
+        conn.execute("DELETE FROM indexed_pages WHERE task_id = ?", (task_id,))
+        conn.execute("DELETE FROM indexed_documents WHERE task_id = ?", (task_id,))
+        return len(rowids)
+
+    def add(self, task_id: str, file_name: Optional[str], pages: Iterable[str]) -> int:
+        """
+        Index the pages (0-indexed) of a task, replacing any earlier entry for it
+
+        Returns:
+            Number of pages indexed
+        """
+        conn = self._connection()
+        count = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._delete_rows(conn, task_id)
+            for page_num, content in enumerate(pages):
+                count += 1
+                if not content or not content.strip():
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO indexed_pages (task_id, page_num) VALUES (?, ?)", (task_id, page_num)
+                )
+                conn.execute("INSERT INTO page_text (rowid, content) VALUES (?, ?)", (cursor.lastrowid, content))
+            conn.execute(
+                "INSERT INTO indexed_documents (task_id, file_name, page_count, indexed_at) VALUES (?, ?, ?, ?)",
+                (task_id, file_name, count, time.time())
+            )
+        return count
+
+    def remove(self, task_id: str) -> bool:
+        """Drop a task from the index; returns False if it wasn't indexed"""
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            removed = conn.execute("SELECT 1 FROM indexed_documents WHERE task_id = ?", (task_id,)).fetchone()
+            self._delete_rows(conn, task_id)
+        return removed is not None
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        hits_per_task: int = 3,
+        mode: str = "terms",
+        snippet_tokens: int = 16
+    ) -> Dict[str, Any]:
+        """
+        Find the tasks whose pages best match a query
+
+        Tasks are ranked by their best page and paged in SQL, so a document with
+        many matching pages takes one result slot rather than crowding out the
+        others; snippets are then made only for the top hits_per_task pages of
+        the returned tasks.
+
+        Args:
+            query: Search terms, or FTS5 syntax in "fts" mode
+            limit: Tasks to return
+            offset: Tasks to skip, for paging
+            hits_per_task: Matching pages returned per task
+            mode: "terms" or "fts" (see build_match_query)
+            snippet_tokens: Approximate length of each snippet in tokens
+
+        Returns:
+            Dict with the ranked results and whether more tasks match
+        """
+        match = build_match_query(query, mode)
+        conn = self._connection()
+        try:
+            tasks = conn.execute(
+                """
+                SELECT p.task_id, d.file_name, MIN(m.score) AS score
+                FROM (SELECT rowid, rank AS score FROM page_text WHERE page_text MATCH ?) AS m
+                JOIN indexed_pages AS p ON p.rowid = m.rowid
+                JOIN indexed_documents AS d ON d.task_id = p.task_id
+                GROUP BY p.task_id
+                ORDER BY score, p.task_id
+                LIMIT ? OFFSET ?
+                """,
+                (match, limit + 1, offset)
+            ).fetchall()
+            selected = tasks[:limit]
+            task_ids = [row["task_id"] for row in selected]
+            pages = conn.execute(
+                f"""
+                SELECT p.task_id, p.page_num, m.score, m.snippet
+                FROM (
+                    SELECT rowid, rank AS score,
+                           snippet(page_text, 0, '[', ']', '…', ?) AS snippet
+                    FROM page_text
+                    WHERE page_text MATCH ? AND rowid IN (
+                        SELECT rowid FROM (
+                            SELECT p.rowid,
+                                   ROW_NUMBER() OVER (PARTITION BY p.task_id ORDER BY t.score, p.page_num) AS hit
+                            FROM (SELECT rowid, rank AS score FROM page_text WHERE page_text MATCH ?) AS t
+                            JOIN indexed_pages AS p ON p.rowid = t.rowid
+                            WHERE p.task_id IN ({", ".join("?" * len(task_ids))})
+                        )
+                        WHERE hit <= ?
+                    )
+                ) AS m
+                JOIN indexed_pages AS p ON p.rowid = m.rowid
+                ORDER BY m.score, p.page_num
+                """,
+                (max(1, min(64, snippet_tokens)), match, match, *task_ids, hits_per_task)
+            ).fetchall() if task_ids else []
+        except sqlite3.OperationalError as e:
+            raise SearchQueryError(f"Invalid search query: {str(e)}")
+
+        results: Dict[str, Dict[str, Any]] = {
+            row["task_id"]: {
+                "task_id": row["task_id"],
+                "file_name": row["file_name"],
+                # BM25 scores are negative, lower is better; report higher is better
+                "score": -row["score"],
+                "hits": [],
+            }
+            for row in selected
+        }
+        for row in pages:
+            results[row["task_id"]]["hits"].append(
+                {"page": row["page_num"] + 1, "score": -row["score"], "snippet": row["snippet"]}
+            )
+
+        return {
+            "results": list(results.values()),
+            "has_more": len(tasks) > limit,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Indexed documents and pages"""
+        conn = self._connection()
+        return {
+            "documents": conn.execute("SELECT COUNT(*) FROM indexed_documents").fetchone()[0],
+            "pages": conn.execute("SELECT COUNT(*) FROM indexed_pages").fetchone()[0],
+            "db_path": self.db_path,
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_search_index(backend: str, db_path: Optional[str] = None) -> Optional[SearchIndex]:
+    """
+    Create the full-text search index
+
+    Args:
+        backend: "sqlite" or "none"
+        db_path: Database file for the SQLite index
+
+    Returns:
+        The SearchIndex, or None if search is disabled or SQLite lacks FTS5
+    """
+    if backend == "none":
+        return None
+    if backend != "sqlite":
+        raise ValueError(f"Unsupported search index backend: {backend}")
+    if not fts5_available():
+        logger.warning("SQLite was built without FTS5; full-text search is disabled")
+        return None
+    return SearchIndex(db_path or "search.db")
@@ -0,0 +1,533 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+from ..models.models import ExtractorType, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a task no longer changes and may expire
+FINISHED_STATUSES = (
+    ProcessingStatus.COMPLETED,
+    ProcessingStatus.FAILED,
+    ProcessingStatus.CANCELLED,
+    ProcessingStatus.TIMED_OUT,
+)
+
+# Statuses of tasks that are queued or running
+ACTIVE_STATUSES = (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
+
+
+def _process_start(pid: int) -> Optional[str]:
+    """Start time of a process in clock ticks since boot, or None if it isn't running (or there is no /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Field 22; the command name before it is parenthesized and may contain spaces
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+_owner: Optional[Tuple[int, str]] = None
+
+
+def process_owner() -> str:
+    """
+    Identity of this process as the owner of the tasks it queues, "pid:start time"
+
+    The start time tells the process from a later one that reuses its pid, e.g.
+    a restarted container's server; it is left empty where /proc isn't available.
+    """
+    global _owner
+    pid = os.getpid()
+    if _owner is None or _owner[0] != pid:
+        _owner = (pid, f"{pid}:{_process_start(pid) or ''}")
+    return _owner[1]
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that owns a task (see process_owner) is still running"""
+    pid_text, _, started = (owner or "").partition(":")
+    try:
+        pid = int(pid_text)
+    except ValueError:
+        return False
+    if started:
+        return _process_start(pid) == started
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class TaskStore:
+    """Interface for extraction task persistence"""
+
+    def create(self, task_id: str, task: Dict[str, Any]) -> None:
+        """Add a new task record"""
+        raise NotImplementedError
+
+    def get(self, task_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a task record, or None if it doesn't exist; the result is left out unless requested"""
+        raise NotImplementedError
+
+    def get_status(self, task_id: str) -> Optional[ProcessingStatus]:
+        """Get only a task's status, or None if there is no such task"""
+        raise NotImplementedError
+
+    def update(self, task_id: str, **fields: Any) -> bool:
+        """Update fields of a task record; returns False if it doesn't exist"""
+        raise NotImplementedError
+
+    def delete(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a task record and return it"""
+        raise NotImplementedError
+
+    def expire(self, ttl_seconds: float, active_ttl_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Remove finished tasks not updated within the TTL and return them
+
+        Active tasks are removed too once they haven't been updated within
+        active_ttl_seconds, e.g. ones a crashed process left queued.
+        """
+        raise NotImplementedError
+
+    def fail_orphaned(self, error: str) -> List[str]:
+        """
+        Mark pending and processing tasks whose owner process is gone failed
+
+        Tasks are owned by the API worker that queued them (their "owner", see
+        process_owner); tasks of other live workers sharing the store are left
+        alone. Returns the ids of the failed tasks.
+        """
+        raise NotImplementedError
+
+    def add_page(self, task_id: str, page_num: int, content: str, page_count: int) -> None:
+        """Publish one extracted page (0-indexed) and update pages_done/page_count"""
+        raise NotImplementedError
+
+    def set_pages(self, task_id: str, pages: List[str]) -> None:
+        """Store all pages of a task at once"""
+        raise NotImplementedError
+
+    def clear_pages(self, task_id: str) -> None:
+        """Drop a task's pages once they are stored elsewhere; pages_done and page_count are kept"""
+        raise NotImplementedError
+
+    def get_pages(self, task_id: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Get published (page number, content) pairs with start <= page number < end"""
+        raise NotImplementedError
+
+    def get_content(self, task_id: str, offset: int = 0, length: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """Get a slice of a finished task's content and its total length, or None if there is no content"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Number of stored tasks"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+
+
+class InMemoryTaskStore(TaskStore):
+    """Process-local task store, only suitable for a single API worker"""
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, task_id: str, task: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._tasks[task_id] = {**task, "created_at": now, "updated_at": now}
+
+    def get(self, task_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            task = {key: value for key, value in task.items() if key not in ("pages", "content")}
+            if not include_result:
+                task["result"] = None
+            return task
+
+    def get_status(self, task_id: str) -> Optional[ProcessingStatus]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return ProcessingStatus(task["status"]) if task is not None else None
+
+    def update(self, task_id: str, **fields: Any) -> bool:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            task.update(fields)
+            task["updated_at"] = time.time()
+            return True
+
+    def delete(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._tasks.pop(task_id, None)
+
+    def expire(self, ttl_seconds: float, active_ttl_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        now = time.time()
+        cutoff = now - ttl_seconds
+        active_cutoff = now - active_ttl_seconds if active_ttl_seconds is not None else None
+        with self._lock:
+            expired_ids = [
+                task_id for task_id, task in self._tasks.items()
+                if (task["status"] in FINISHED_STATUSES and task["updated_at"] < cutoff)
+                or (active_cutoff is not None and task["status"] in ACTIVE_STATUSES and task["updated_at"] < active_cutoff)
+            ]
+            return [{"task_id": task_id, **self._tasks.pop(task_id)} for task_id in expired_ids]
+
+    def fail_orphaned(self, error: str) -> List[str]:
+        now = time.time()
+        with self._lock:
+            failed_ids = [
+                task_id for task_id, task in self._tasks.items()
+                if task["status"] in ACTIVE_STATUSES and not owner_alive(task.get("owner"))
+            ]
+            for task_id in failed_ids:
+                self._tasks[task_id].update(status=ProcessingStatus.FAILED, error=error, updated_at=now)
+            return failed_ids
+
+    def add_page(self, task_id: str, page_num: int, content: str, page_count: int) -> None:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            pages = task.setdefault("pages", {})
+            pages[page_num] = content
+            task["pages_done"] = len(pages)
+            task["page_count"] = page_count
+            task["updated_at"] = time.time()
+
+    def set_pages(self, task_id: str, pages: List[str]) -> None:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            task["pages"] = dict(enumerate(pages))
+            task["pages_done"] = task["page_count"] = len(pages)
+            task["updated_at"] = time.time()
+
+    def clear_pages(self, task_id: str) -> None:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.pop("pages", None)
+
+    def get_pages(self, task_id: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return []
+            return sorted(
+                (page_num, content) for page_num, content in task.get("pages", {}).items()
+                if page_num >= start and (end is None or page_num < end)
+            )
+
+    def get_content(self, task_id: str, offset: int = 0, length: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.get("content") is None:
+                return None
+            content = task["content"]
+            end = offset + length if length is not None else None
+            return content[offset:end], len(content)
+
+    def count(self) -> int:
+        return len(self._tasks)
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store in a SQLite database that several worker processes can share"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    result TEXT,
+                    content TEXT
+                )
+                """
+            )
+            self._ensure_column(conn, "tasks", "content", "TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, updated_at)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS task_pages (
+                    task_id TEXT NOT NULL,
+                    page_num INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    PRIMARY KEY (task_id, page_num)
+                )
+                """
+            )
+
+    @staticmethod
+    def _ensure_column(conn: sqlite3.Connection, table: str, column: str, column_type: str) -> None:
+        """Add a column that databases created by older versions don't have yet"""
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(task: Dict[str, Any]) -> Dict[str, Any]:
+        data = {key: value for key, value in task.items() if key not in ("status", "result", "content")}
+        if isinstance(data.get("extractor_type"), ExtractorType):
+            data["extractor_type"] = data["extractor_type"].value
+        return data
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        task = json.loads(row["data"])
+        task["status"] = ProcessingStatus(row["status"])
+        task["result"] = json.loads(row["result"]) if "result" in row.keys() and row["result"] else None
+        task["created_at"] = row["created_at"]
+        task["updated_at"] = row["updated_at"]
+        if task.get("extractor_type"):
+            task["extractor_type"] = ExtractorType(task["extractor_type"])
+        return task
+
+    def create(self, task_id: str, task: Dict[str, Any]) -> None:
+        now = time.time()
+        status = ProcessingStatus(task.get("status", ProcessingStatus.PENDING))
+        result = task.get("result")
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO tasks (task_id, status, created_at, updated_at, data, result) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    task_id,
+                    status.value,
+                    now,
+                    now,
+                    json.dumps(self._encode(task), default=str),
+                    json.dumps(result, default=str) if result is not None else None,
+                )
+            )
+
+    def get(self, task_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        columns = "task_id, status, created_at, updated_at, data" + (", result" if include_result else "")
+        row = self._connection().execute(f"SELECT {columns} FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def get_status(self, task_id: str) -> Optional[ProcessingStatus]:
+        row = self._connection().execute("SELECT status FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return ProcessingStatus(row["status"]) if row is not None else None
+
+    def update(self, task_id: str, **fields: Any) -> bool:
+        conn = self._connection()
+        with conn:
+            # Take the write lock up front so concurrent updates don't interleave
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return False
+
+            assignments = ["updated_at = ?"]
+            params: List[Any] = [time.time()]
+
+            if "status" in fields:
+                assignments.append("status = ?")
+                params.append(ProcessingStatus(fields["status"]).value)
+            if "result" in fields:
+                assignments.append("result = ?")
+                result = fields["result"]
+                params.append(json.dumps(result, default=str) if result is not None else None)
+            if "content" in fields:
+                assignments.append("content = ?")
+                params.append(fields["content"])
+
+            other_fields = {key: value for key, value in fields.items() if key not in ("status", "result", "content")}
+            if other_fields:
+                data = json.loads(row["data"])
+                data.update(self._encode(other_fields))
+                assignments.append("data = ?")
+                params.append(json.dumps(data, default=str))
+
+            params.append(task_id)
+            conn.execute(f"UPDATE tasks SET {', '.join(assignments)} WHERE task_id = ?", params)
+            return True
+
+    def delete(self, task_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT task_id, status, created_at, updated_at, data FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            conn.execute("DELETE FROM task_pages WHERE task_id = ?", (task_id,))
+            return self._decode(row)
+
+    def expire(self, ttl_seconds: float, active_ttl_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        now = time.time()
+        finished = [status.value for status in FINISHED_STATUSES]
+        active = [status.value for status in ACTIVE_STATUSES]
+        query = f"SELECT task_id, data FROM tasks WHERE (status IN ({', '.join('?' for _ in finished)}) AND updated_at < ?)"
+        params: List[Any] = [*finished, now - ttl_seconds]
+        if active_ttl_seconds is not None:
+            query += f" OR (status IN ({', '.join('?' for _ in active)}) AND updated_at < ?)"
+            params.extend([*active, now - active_ttl_seconds])
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(query, params).fetchall()
+            expired_ids = [(row["task_id"],) for row in rows]
+            conn.executemany("DELETE FROM tasks WHERE task_id = ?", expired_ids)
+            conn.executemany("DELETE FROM task_pages WHERE task_id = ?", expired_ids)
+
+        # Results aren't needed for cleanup, so they are never loaded here
+        return [{"task_id": row["task_id"], **json.loads(row["data"])} for row in rows]
+
+    def fail_orphaned(self, error: str) -> List[str]:
+        active = [status.value for status in ACTIVE_STATUSES]
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT task_id, data FROM tasks WHERE status IN ({', '.join('?' for _ in active)})", active
+            ).fetchall()
+            alive: Dict[Optional[str], bool] = {}
+            orphaned = []
+            for row in rows:
+                data = json.loads(row["data"])
+                owner = data.get("owner")
+                if owner not in alive:
+                    alive[owner] = owner_alive(owner)
+                if not alive[owner]:
+                    orphaned.append((row["task_id"], data))
+
+            now = time.time()
+            for task_id, data in orphaned:
+                data["error"] = error
+                conn.execute(
+                    "UPDATE tasks SET status = ?, data = ?, updated_at = ? WHERE task_id = ?",
+                    (ProcessingStatus.FAILED.value, json.dumps(data, default=str), now, task_id)
+                )
+        return [task_id for task_id, _ in orphaned]
+
+    def _set_progress(self, conn: sqlite3.Connection, task_id: str, page_count: int) -> None:
+        """Recount published pages into the task's progress fields (transaction held)"""
+        row = conn.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return
+        pages_done = conn.execute("SELECT COUNT(*) FROM task_pages WHERE task_id = ?", (task_id,)).fetchone()[0]
+        data = json.loads(row["data"])
+        data["pages_done"] = pages_done
+        data["page_count"] = page_count
+        conn.execute(
+            "UPDATE tasks SET data = ?, updated_at = ? WHERE task_id = ?",
+            (json.dumps(data, default=str), time.time(), task_id)
+        )
+
+    def add_page(self, task_id: str, page_num: int, content: str, page_count: int) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO task_pages (task_id, page_num, content) VALUES (?, ?, ?)",
+                (task_id, page_num, content or "")
+            )
+            self._set_progress(conn, task_id, page_count)
+
+    def set_pages(self, task_id: str, pages: List[str]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM task_pages WHERE task_id = ?", (task_id,))
+            conn.executemany(
+                "INSERT INTO task_pages (task_id, page_num, content) VALUES (?, ?, ?)",
+                [(task_id, page_num, content or "") for page_num, content in enumerate(pages)]
+            )
+            self._set_progress(conn, task_id, len(pages))
+
+    def clear_pages(self, task_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM task_pages WHERE task_id = ?", (task_id,))
+
+    def get_pages(self, task_id: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str]]:
+        rows = self._connection().execute(
+            "SELECT page_num, content FROM task_pages WHERE task_id = ? AND page_num >= ? AND page_num < ? "
+            "ORDER BY page_num",
+            (task_id, start, end if end is not None else 2 ** 62)
+        ).fetchall()
+        return [(row["page_num"], row["content"]) for row in rows]
+
+    def get_content(self, task_id: str, offset: int = 0, length: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        # substr() slices by character inside SQLite, so only the slice reaches Python
+        if length is None:
+            query, params = "SELECT substr(content, ?) AS slice", (offset + 1, task_id)
+        else:
+            query, params = "SELECT substr(content, ?, ?) AS slice", (offset + 1, length, task_id)
+        row = self._connection().execute(
+            query + ", length(content) AS total FROM tasks WHERE task_id = ?", params
+        ).fetchone()
+        if row is None or row["total"] is None:
+            return None
+        return row["slice"], row["total"]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_task_store(backend: str, db_path: Optional[str] = None) -> TaskStore:
+    """
+    Create a task store
+
+    Args:
+        backend: "sqlite" or "memory"
+        db_path: Database file for the SQLite store
+
+    Returns:
+        The configured TaskStore
+    """
+    if backend == "sqlite":
+        return SQLiteTaskStore(db_path or "tasks.db")
+    if backend == "memory":
+        return InMemoryTaskStore()
+    raise ValueError(f"Unsupported task store backend: {backend}")
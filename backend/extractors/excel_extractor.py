@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
 import os
 import json
 
@@ -7,57 +7,88 @@ import json
 try:
     import pandas as pd
     import openpyxl
+    from pandas.io.parsers import TextParser
 except ImportError:
     logging.warning("pandas or openpyxl not installed. Excel extraction will not work.")
 
+from ..core.cancellation import ExtractionCancelled, check_cancelled
+from ..utils.sniffing import UnsupportedContentError, sniff_csv_delimiter, sniff_file
+
+# Workbook formats openpyxl can stream in read-only mode
+STREAMING_EXTENSIONS = ('.xlsx', '.xlsm')
+
+# Rows streamed between cancellation checks on large sheets
+CANCEL_CHECK_ROWS = 10000
+
 class ExcelExtractor:
     """Extract content from Excel and CSV files"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
-    def extract(self, file_path: str) -> Dict[str, Any]:
+    def extract(
+        self,
+        file_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Extract data from an Excel or CSV file
         
         Args:
             file_path: Path to the Excel/CSV file
+            options: Extraction options; "excel_mode" is "streaming" (default,
+                single-pass openpyxl read-only parsing of .xlsx) or "pandas"
+            progress_callback: Called with (sheet index, sheet count, sheet text)
+                as soon as each sheet is extracted
             
         Returns:
             Dict containing extracted data and metadata
+        
+        Only one sheet's rows and DataFrame are held at a time, and each sheet's
+        text is published through progress_callback before the next sheet is
+        read. The returned result still keeps every sheet's columnar values and
+        text (the result file is written from it), so peak memory is about the
+        size of the whole result rather than of one sheet.
         """
+        options = options or {}
         self.logger.info(f"Extracting content from Excel/CSV: {file_path}")
         
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         try:
-            file_ext = os.path.splitext(file_path)[1].lower()
+            file_ext = self._format_extension(file_path)
             
             if file_ext == '.csv':
-                # Handle CSV
-                df = pd.read_csv(file_path)
+                # Handle CSV, with the delimiter it was recognized by (";", tab and "|" as well as ",")
+                df = pd.read_csv(file_path, sep=sniff_csv_delimiter(file_path))
                 metadata = {
                     "format": "CSV",
                     "rows": len(df),
                     "columns": len(df.columns)
                 }
-                sheets = [{"name": "Sheet1", "data": df.to_dict(orient="records")}]
+                sheets = [self._to_columnar("Sheet1", df)]
                 sheet_names = ["Sheet1"]
+                pages = [self._format_sheet("Sheet1", df)]
+                if progress_callback:
+                    progress_callback(0, 1, pages[0])
                 
             else:
-                # Handle Excel
-                excel_file = pd.ExcelFile(file_path)
-                sheet_names = excel_file.sheet_names
-                
-                # Extract data from each sheet
+                # Handle Excel, parsing the workbook once and holding one sheet's DataFrame at a time
                 sheets = []
-                for sheet_name in sheet_names:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    sheets.append({
-                        "name": sheet_name,
-                        "data": df.to_dict(orient="records")
-                    })
+                pages = []
+                sheet_iter = self._iter_sheets(file_path, options, file_ext)
+                for sheet_index, (sheet_count, sheet_name, df) in enumerate(sheet_iter):
+                    check_cancelled()
+                    sheets.append(self._to_columnar(sheet_name, df))
+                    
+                    pages.append(self._format_sheet(sheet_name, df))
+                    if progress_callback:
+                        progress_callback(sheet_index, sheet_count, pages[-1])
+                    del df
+                
+                sheet_names = [sheet["name"] for sheet in sheets]
                 
                 metadata = {
                     "format": file_ext.upper().replace('.', ''),
@@ -65,24 +96,11 @@ class ExcelExtractor:
                     "sheet_names": sheet_names
                 }
             
-            # Convert the structured data to a readable text format
-            content_parts = []
-            for sheet in sheets:
-                content_parts.append(f"Sheet: {sheet['name']}")
-                
-                # Convert DataFrame to string representation
-                if sheet["data"]:
-                    df = pd.DataFrame(sheet["data"])
-                    content_parts.append(df.to_string(index=False))
-                else:
-                    content_parts.append("(Empty sheet)")
-                    
-                content_parts.append("\n")
-            
-            content = "\n".join(content_parts)
+            content = "\n".join(pages)
             
             result = {
                 "content": content,
+                "pages": pages,
                 "page_count": len(sheets),  # Consider each sheet as a page
                 "metadata": metadata,
                 "structured_data": {
@@ -92,11 +110,172 @@ class ExcelExtractor:
             
             self.logger.info(f"Successfully extracted data from {file_path}")
             return result
-                
+        
+        except ExtractionCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Excel extraction failed: {str(e)}")
             raise ValueError(f"Failed to extract content from Excel/CSV: {str(e)}")
     
+    def _format_extension(self, file_path: str) -> str:
+        """Extension of the file's actual format, so a mislabeled CSV or workbook gets the right reader"""
+        try:
+            return sniff_file(file_path).extension
+        except UnsupportedContentError:
+            # Let the reader for the claimed format report what's wrong
+            return os.path.splitext(file_path)[1].lower()
+    
+    def _iter_sheets(
+        self,
+        file_path: str,
+        options: Dict[str, Any],
+        file_ext: Optional[str] = None
+    ) -> Iterator[Tuple[int, str, "pd.DataFrame"]]:
+        """
+        Parse a workbook once, yielding one sheet at a time
+        
+        Args:
+            file_path: Path to the Excel file
+            options: Extraction options
+            file_ext: Extension of the workbook's format (defaults to the file's own)
+            
+        Returns:
+            Iterator of (sheet count, sheet name, sheet DataFrame)
+        """
+        file_ext = file_ext or os.path.splitext(file_path)[1].lower()
+        
+        if file_ext in STREAMING_EXTENSIONS and options.get("excel_mode", "streaming") == "streaming":
+            # A file object skips openpyxl's check of the filename's extension
+            with open(file_path, "rb") as f:
+                workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+                try:
+                    worksheets = workbook.worksheets
+                    for worksheet in worksheets:
+                        yield len(worksheets), worksheet.title, self._read_worksheet(worksheet)
+                finally:
+                    workbook.close()
+        else:
+            # Legacy formats go through pandas, still opening the file only once
+            with pd.ExcelFile(file_path) as excel_file:
+                for sheet_name in excel_file.sheet_names:
+                    yield len(excel_file.sheet_names), sheet_name, excel_file.parse(sheet_name)
+    
+    def _read_worksheet(self, worksheet) -> "pd.DataFrame":
+        """
+        Stream a read-only worksheet into a DataFrame, matching pd.read_excel's layout
+        
+        The sheet's rows are buffered before parsing: the column count is only
+        known after the last row, and TextParser reads every row into memory to
+        infer each column's dtype anyway (read_excel's own openpyxl reader
+        buffers the same way).
+        
+        Args:
+            worksheet: An openpyxl read-only worksheet
+            
+        Returns:
+            DataFrame with the first row as header
+        """
+        # Stored dimensions are often wrong, so read every row that exists
+        worksheet.reset_dimensions()
+        
+        rows = []
+        width = 0
+        blank_rows = 0
+        for row_index, row in enumerate(worksheet.iter_rows(values_only=True), 1):
+            if row_index % CANCEL_CHECK_ROWS == 0:
+                check_cancelled()
+            
+            # Drop trailing empty cells
+            end = len(row)
+            while end and row[end - 1] is None:
+                end -= 1
+            if not end:
+                blank_rows += 1
+                continue
+            
+            # Blank rows before this one are kept (also above the header, like
+            # read_excel), trailing ones are dropped
+            rows.extend([] for _ in range(blank_rows))
+            blank_rows = 0
+            # Empty cells are "" like in read_excel's openpyxl reader, so they parse to NaN
+            rows.append(["" if value is None else value for value in row[:end]])
+            width = max(width, end)
+        
+        if not rows:
+            return pd.DataFrame()
+        
+        # read_excel parses the cell values with TextParser, which infers dtypes,
+        # turns "" and "NA"-like strings into NaN and names and deduplicates
+        # columns ("Unnamed: 3", "a.1"), so the streamed frame matches it
+        for row in rows:
+            row.extend([""] * (width - len(row)))
+        return TextParser(rows, header=0).read()
+    
+    def _to_columnar(self, sheet_name: str, df: "pd.DataFrame") -> Dict[str, Any]:
+        """
+        Convert a sheet to columnar structured data
+        
+        Args:
+            sheet_name: Name of the sheet
+            df: The sheet's data
+            
+        Returns:
+            Dict with column names, a type per column ("integer", "float",
+            "boolean", "datetime" or "string") and one value array per column
+        """
+        columns = []
+        types = []
+        values = []
+        
+        for name in df.columns:
+            series = df[name]
+            kind = series.dtype.kind
+            
+            if kind in "iu":
+                column_type = "integer"
+                column_values = series.tolist()
+            elif kind == "f":
+                column_type = "float"
+                column_values = series.astype(object).where(series.notna(), None).tolist()
+            elif kind == "b":
+                column_type = "boolean"
+                column_values = series.tolist()
+            elif kind == "M":
+                column_type = "datetime"
+                column_values = [value.isoformat() if value is not pd.NaT else None for value in series]
+            else:
+                # Mixed columns keep their JSON-representable values, everything else becomes text
+                column_type = "string"
+                column_values = [
+                    None if pd.isna(value) else value if isinstance(value, (str, int, float, bool)) else str(value)
+                    for value in series
+                ]
+            
+            columns.append(str(name))
+            types.append(column_type)
+            values.append(column_values)
+        
+        return {
+            "name": sheet_name,
+            "columns": columns,
+            "types": types,
+            "values": values,
+            "row_count": len(df)
+        }
+    
+    def _format_sheet(self, sheet_name: str, df: "pd.DataFrame") -> str:
+        """Convert a sheet to its readable text format"""
+        content_parts = [f"Sheet: {sheet_name}"]
+        
+        # Convert DataFrame to string representation
+        if len(df):
+            content_parts.append(df.to_string(index=False))
+        else:
+            content_parts.append("(Empty sheet)")
+            
+        content_parts.append("\n")
+        return "\n".join(content_parts)
+    
     def extract_sheet(self, file_path: str, sheet_name: str = None) -> Dict[str, Any]:
         """
         Extract data from a specific sheet in an Excel file
@@ -1,32 +1,48 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable, Tuple
 import os
 
 # Import the necessary libraries for image extraction
 try:
-    import pytesseract
     from PIL import Image
 except ImportError:
-    logging.warning("pytesseract or PIL not installed. Image extraction will not work.")
+    logging.warning("PIL not installed. Image extraction will not work.")
+
+from ..core.cancellation import ExtractionCancelled
+from ..core.metrics import stage
+from .layout import concat_words, group_layout, layout_blocks, layout_text, layout_to_columnar
+from .ocr import resolve_ocr_options, ocr_image, ocr_image_layout, ocr_image_stream
+from .ocr_engine import create_ocr_engine
 
 class ImageExtractor:
     """Extract text content from image files using OCR"""
     
-    def __init__(self):
+    def __init__(self, ocr_engine=None):
+        """
+        Args:
+            ocr_engine: Long-lived OCR engine shared by every extraction in this
+                worker (see ocr_engine.create_ocr_engine)
+        """
         self.logger = logging.getLogger(__name__)
-        
-        # Check if tesseract is installed and configured
-        try:
-            pytesseract.get_tesseract_version()
-        except Exception as e:
-            self.logger.warning(f"Tesseract OCR may not be properly installed: {str(e)}")
+        self.ocr_engine = ocr_engine or create_ocr_engine()
     
-    def extract(self, file_path: str) -> Dict[str, Any]:
+    def extract(
+        self,
+        file_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Extract text from an image using OCR
         
         Args:
             file_path: Path to the image file
+            options: Extraction options; "ocr" configures preprocessing and
+                tiling (see ocr.DEFAULT_OCR_OPTIONS) and "layout" adds word
+                boxes, lines and paragraphs as columnar tables under
+                structured_data["layout"] (see layout.layout_to_columnar)
+            progress_callback: Called with (page index, page count, page text)
+                as each frame is OCR'd; frames may arrive out of order
             
         Returns:
             Dict containing extracted text and metadata
@@ -36,72 +52,145 @@ class ImageExtractor:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Image file not found: {file_path}")
         
+        options = options or {}
+        layout = bool(options.get("layout"))
+        if layout:
+            options = self._layout_options(options)
+        
         try:
-            # Open the image
-            image = Image.open(file_path)
-            
-            # Extract metadata
-            metadata = {
-                "format": image.format,
-                "size": f"{image.width}x{image.height}",
-                "mode": image.mode
-            }
-            
-            # Perform OCR to extract text
-            text = pytesseract.image_to_string(image)
+            with Image.open(file_path) as image:
+                # Extract metadata
+                frame_count = getattr(image, "n_frames", 1)
+                metadata = {
+                    "format": image.format,
+                    "size": f"{image.width}x{image.height}",
+                    "mode": image.mode
+                }
+                
+                if frame_count > 1:
+                    # Multi-frame TIFFs (fax and scanner feeds) are one page per frame
+                    metadata["frames"] = frame_count
+                    pages, page_words, page_sizes = self._extract_frames(
+                        image, frame_count, options, layout, progress_callback
+                    )
+                    metadata["ocr"] = {"engine": self.ocr_engine.name, "pages": frame_count}
+                else:
+                    ocr_options = resolve_ocr_options(options)
+                    page_sizes = [image.size]
+                    if layout:
+                        # One image_to_data call gives both the boxes and the text
+                        words, ocr_info = ocr_image_layout(image, ocr_options, self.ocr_engine.image_to_data)
+                        page_words = [words]
+                        text = layout_text(group_layout(words))
+                    else:
+                        # Perform OCR to extract text, in parallel tiles for large scans
+                        text, ocr_info = ocr_image(image, ocr_options, self.ocr_engine.image_to_string)
+                    ocr_info["engine"] = self.ocr_engine.name
+                    metadata["ocr"] = ocr_info
+                    pages = [text]
+                    if progress_callback:
+                        progress_callback(0, 1, text)
             
             result = {
-                "content": text,
-                "page_count": 1,  # Images are single-page
+                "content": "\n\n".join(pages),
+                "pages": pages,
+                "page_count": len(pages),
                 "metadata": metadata,
             }
             
+            if layout:
+                with stage("layout"):
+                    tables = layout_to_columnar(group_layout(concat_words(page_words)))
+                tables["pages"] = [
+                    {"page": index + 1, "width": width, "height": height}
+                    for index, (width, height) in enumerate(page_sizes)
+                ]
+                result["structured_data"] = {"layout": tables}
+            
             self.logger.info(f"Successfully extracted text from {file_path}")
             return result
-                
+        
+        except ExtractionCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Image extraction failed: {str(e)}")
             raise ValueError(f"Failed to extract content from image: {str(e)}")
     
-    def extract_with_layout(self, file_path: str) -> Dict[str, Any]:
+    @staticmethod
+    def _layout_options(options: Dict[str, Any]) -> Dict[str, Any]:
+        """Options for layout OCR: no deskew unless asked for, so boxes line up with the source image"""
+        return {**options, "ocr": {"deskew": False, **(options.get("ocr") or {})}}
+    
+    def _extract_frames(
+        self,
+        image: "Image.Image",
+        frame_count: int,
+        options: Dict[str, Any],
+        layout: bool = False,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[Tuple[int, int]]]:
+        """
+        OCR every frame of a multi-frame image concurrently
+        
+        Frames are decoded one at a time as OCR workers free up, so memory
+        holds about one decoded frame per worker rather than the whole file.
+        
+        Returns:
+            Tuple of (text of each frame, word arrays of each frame when layout
+            is requested, size of each frame), in frame order
+        """
+        pages: List[Optional[str]] = [None] * frame_count
+        page_words: List[Optional[Dict[str, Any]]] = [None] * frame_count if layout else []
+        page_sizes: List[Optional[Tuple[int, int]]] = [None] * frame_count
+        
+        def frames():
+            for index in range(frame_count):
+                with stage("decode"):
+                    image.seek(index)
+                    frame = image.copy()
+                page_sizes[index] = frame.size
+                yield index, frame
+        
+        def recognize_layout(index: int, frame: "Image.Image", ocr_options: Dict[str, Any]):
+            return ocr_image_layout(frame, ocr_options, self.ocr_engine.image_to_data, page=index + 1)
+        
+        def on_page(index: int, result: Any, info: Dict[str, Any]) -> None:
+            if layout:
+                page_words[index] = result
+                result = layout_text(group_layout(result))
+            pages[index] = result
+            if progress_callback:
+                progress_callback(index, frame_count, result)
+        
+        self.logger.info(f"OCR'ing {frame_count} frames")
+        ocr_image_stream(
+            frames(),
+            options,
+            self.ocr_engine.image_to_string,
+            on_page=on_page,
+            recognize=recognize_layout if layout else None
+        )
+        return pages, page_words, page_sizes
+    
+    def extract_with_layout(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Extract text with layout information from an image
         
         Args:
             file_path: Path to the image file
+            options: Extraction options; "ocr" configures preprocessing
             
         Returns:
-            Dict containing extracted text with layout information
+            Dict with the text, the text of each block and the word, line and
+            paragraph tables (see layout.layout_to_columnar)
         """
-        # Open the image
-        image = Image.open(file_path)
-        
-        # Extract text with layout information
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-        
-        # Process the OCR data to reconstruct layout
-        text_blocks = []
-        current_block = ""
+        ocr_options = resolve_ocr_options(self._layout_options(options or {}))
+        with Image.open(file_path) as image:
+            words, _ = ocr_image_layout(image, ocr_options, self.ocr_engine.image_to_data)
         
-        for i in range(len(data["text"])):
-            # Skip empty text
-            if not data["text"][i].strip():
-                continue
-                
-            # If this is a new block, add the previous block to the list
-            if data["block_num"][i] != data["block_num"][i-1] and current_block:
-                text_blocks.append(current_block.strip())
-                current_block = ""
-                
-            # Add text to current block
-            current_block += data["text"][i] + " "
-            
-        # Add the last block
-        if current_block:
-            text_blocks.append(current_block.strip())
-            
+        grouped = group_layout(words)
         return {
-            "content": "\n\n".join(text_blocks),
-            "blocks": text_blocks,
-            "raw_data": data
-        }
\ No newline at end of file
+            "content": layout_text(grouped),
+            "blocks": layout_blocks(grouped),
+            "layout": layout_to_columnar(grouped)
+        }
@@ -0,0 +1,225 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    logging.warning("numpy not installed. Layout extraction will not work.")
+
+# Columns of the word table and their types, in the columnar form ExcelExtractor
+# uses for sheets ("columns", "types", "values"); boxes are in source image pixels
+WORD_COLUMNS = (
+    ("page", "integer"),
+    ("block", "integer"),
+    ("paragraph", "integer"),
+    ("line", "integer"),
+    ("left", "integer"),
+    ("top", "integer"),
+    ("width", "integer"),
+    ("height", "integer"),
+    ("conf", "float"),
+    ("text", "string"),
+)
+
+# Lines and paragraphs point into the table below them with a first row and a count
+LINE_COLUMNS = (
+    ("page", "integer"),
+    ("block", "integer"),
+    ("paragraph", "integer"),
+    ("line", "integer"),
+    ("first_word", "integer"),
+    ("word_count", "integer"),
+    ("left", "integer"),
+    ("top", "integer"),
+    ("width", "integer"),
+    ("height", "integer"),
+    ("conf", "float"),
+)
+
+PARAGRAPH_COLUMNS = (
+    ("page", "integer"),
+    ("block", "integer"),
+    ("paragraph", "integer"),
+    ("first_line", "integer"),
+    ("line_count", "integer"),
+    ("left", "integer"),
+    ("top", "integer"),
+    ("width", "integer"),
+    ("height", "integer"),
+)
+
+_NUMERIC_WORD_KEYS = ("block_num", "par_num", "line_num", "left", "top", "width", "height")
+
+
+def words_from_ocr_data(data: Dict[str, list], page: int = 1, scale: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Turn tesseract's image_to_data dict into typed word arrays
+
+    Rows that aren't words or whose text is blank are dropped before anything
+    is compared, so grouping never looks at an empty token.
+
+    Args:
+        data: Dict of lists as returned by an OCR engine's image_to_data
+        page: 1-based page number stored with every word
+        scale: Factor the image was downscaled by before OCR; boxes are mapped
+            back to the source image
+
+    Returns:
+        Dict of numpy arrays (int32 ids and boxes, float32 confidences) plus a
+        "text" list, one entry per word in reading order
+    """
+    texts = data.get("text") or []
+    levels = data.get("level")
+    keep = [
+        i for i, text in enumerate(texts)
+        if text and text.strip() and (levels is None or levels[i] == 5)
+    ]
+    index = np.asarray(keep, dtype=np.intp)
+
+    columns = {key: np.asarray(data[key], dtype=np.float64)[index] for key in _NUMERIC_WORD_KEYS}
+    if scale:
+        for key in ("left", "top", "width", "height"):
+            columns[key] = columns[key] / scale
+
+    return {
+        "page": np.full(len(keep), page, dtype=np.int32),
+        "block": columns["block_num"].astype(np.int32),
+        "paragraph": columns["par_num"].astype(np.int32),
+        "line": columns["line_num"].astype(np.int32),
+        "left": np.rint(columns["left"]).astype(np.int32),
+        "top": np.rint(columns["top"]).astype(np.int32),
+        "width": np.rint(columns["width"]).astype(np.int32),
+        "height": np.rint(columns["height"]).astype(np.int32),
+        "conf": np.asarray(data["conf"], dtype=np.float32)[index],
+        "text": [texts[i].strip() for i in keep],
+    }
+
+
+def concat_words(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Join the word arrays of several pages, in page order"""
+    if not pages:
+        return words_from_ocr_data({"text": [], "conf": [], **{key: [] for key in _NUMERIC_WORD_KEYS}})
+    words = {
+        name: np.concatenate([page[name] for page in pages])
+        for name, column_type in WORD_COLUMNS if column_type != "string"
+    }
+    words["text"] = [text for page in pages for text in page["text"]]
+    return words
+
+
+def _runs(*keys: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Start index and length of each run of equal key tuples"""
+    size = len(keys[0])
+    if size == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    changed = np.zeros(size, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(changed)
+    counts = np.diff(np.append(starts, size))
+    return starts, counts
+
+
+def _boxes(left, top, width, height, starts) -> Dict[str, "np.ndarray"]:
+    """Bounding box of each run"""
+    run_left = np.minimum.reduceat(left, starts)
+    run_top = np.minimum.reduceat(top, starts)
+    run_right = np.maximum.reduceat(left + width, starts)
+    run_bottom = np.maximum.reduceat(top + height, starts)
+    return {
+        "left": run_left,
+        "top": run_top,
+        "width": run_right - run_left,
+        "height": run_bottom - run_top,
+    }
+
+
+def group_layout(words: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Group words into lines and lines into paragraphs
+
+    Words arrive in reading order, so a line is a run of words sharing
+    (page, block, paragraph, line) and a paragraph a run of lines sharing
+    (page, block, paragraph); runs, boxes and mean confidences are computed
+    on whole arrays.
+
+    Returns:
+        Dict with the "words", "lines" and "paragraphs" arrays
+    """
+    starts, counts = _runs(words["page"], words["block"], words["paragraph"], words["line"])
+    lines = {name: words[name][starts] for name in ("page", "block", "paragraph", "line")}
+    lines["first_word"] = starts.astype(np.int32)
+    lines["word_count"] = counts.astype(np.int32)
+    if len(starts):
+        lines.update(_boxes(words["left"], words["top"], words["width"], words["height"], starts))
+        lines["conf"] = (np.add.reduceat(words["conf"], starts) / counts).astype(np.float32)
+    else:
+        for name in ("left", "top", "width", "height"):
+            lines[name] = np.zeros(0, dtype=np.int32)
+        lines["conf"] = np.zeros(0, dtype=np.float32)
+
+    starts, counts = _runs(lines["page"], lines["block"], lines["paragraph"])
+    paragraphs = {name: lines[name][starts] for name in ("page", "block", "paragraph")}
+    paragraphs["first_line"] = starts.astype(np.int32)
+    paragraphs["line_count"] = counts.astype(np.int32)
+    if len(starts):
+        paragraphs.update(_boxes(lines["left"], lines["top"], lines["width"], lines["height"], starts))
+    else:
+        for name in ("left", "top", "width", "height"):
+            paragraphs[name] = np.zeros(0, dtype=np.int32)
+
+    return {"words": words, "lines": lines, "paragraphs": paragraphs}
+
+
+def layout_text(layout: Dict[str, Dict[str, Any]]) -> str:
+    """Text of grouped words: words joined by spaces, lines by newlines, paragraphs by blank lines"""
+    words, lines, paragraphs = layout["words"], layout["lines"], layout["paragraphs"]
+    texts = words["text"]
+    line_texts = [
+        " ".join(texts[first:first + count])
+        for first, count in zip(lines["first_word"].tolist(), lines["word_count"].tolist())
+    ]
+    return "\n\n".join(
+        "\n".join(line_texts[first:first + count])
+        for first, count in zip(paragraphs["first_line"].tolist(), paragraphs["line_count"].tolist())
+    )
+
+
+def layout_blocks(layout: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Text of each block, its words joined by spaces"""
+    words = layout["words"]
+    starts, counts = _runs(words["page"], words["block"])
+    texts = words["text"]
+    return [" ".join(texts[first:first + count]) for first, count in zip(starts.tolist(), counts.tolist())]
+
+
+def _columnar(arrays: Dict[str, Any], spec: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
+    values = []
+    for name, column_type in spec:
+        column = arrays[name]
+        if column_type == "float":
+            # One decimal is all tesseract's confidences carry
+            column = np.round(column.astype(np.float64), 1)
+        values.append(column if isinstance(column, list) else column.tolist())
+    return {
+        "columns": [name for name, _ in spec],
+        "types": [column_type for _, column_type in spec],
+        "values": values,
+        "row_count": len(values[0]) if values else 0,
+    }
+
+
+def layout_to_columnar(layout: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Columnar JSON form of grouped words, one table per level
+
+    Each table has "columns", "types" and column-major "values" like an
+    extracted sheet, so utils.tables.columnar_to_bytes can turn it into an
+    Arrow IPC stream or Parquet file.
+    """
+    return {
+        "words": _columnar(layout["words"], WORD_COLUMNS),
+        "lines": _columnar(layout["lines"], LINE_COLUMNS),
+        "paragraphs": _columnar(layout["paragraphs"], PARAGRAPH_COLUMNS),
+    }
@@ -0,0 +1,355 @@
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Callable, Tuple, Iterable
+
+from ..core import config
+from ..core.cancellation import ExtractionCancelled, check_cancelled
+from ..core.metrics import stage
+from .layout import words_from_ocr_data
+
+# Import the necessary libraries for OCR
+try:
+    import numpy as np
+    import pytesseract
+    from PIL import Image, ImageOps
+except ImportError:
+    logging.warning("numpy, pytesseract or PIL not installed. OCR will not work.")
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the "ocr" extraction option
+DEFAULT_OCR_OPTIONS = {
+    "preprocess": True,     # grayscale, downscale, deskew and binarize before OCR
+    "target_dpi": 300,      # images scanned at a higher resolution are downscaled to this
+    "binarize": True,
+    "deskew": True,
+    "max_skew": 5.0,        # largest skew angle (degrees) searched for
+    "tiles": True,          # split tall pages into bands OCR'd in parallel
+    "tile_height": 1200,    # approximate band height in pixels at the target DPI
+    "tile_overlap": 40,     # overlap used when a band has to be cut through text
+    "workers": None,        # parallel OCR calls (defaults to config.OCR_WORKERS)
+    "lang": None,
+}
+
+# Resolution assumed when an image doesn't record its DPI
+ASSUMED_DPI = 300
+
+# How much more a skew angle's projection profile must vary than the page's
+# as-is profile before the page is rotated
+SKEW_MIN_GAIN = 0.05
+
+
+def resolve_ocr_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the request's "ocr" option over the defaults"""
+    ocr_options = dict(DEFAULT_OCR_OPTIONS)
+    ocr_options.update((options or {}).get("ocr") or {})
+    return ocr_options
+
+
+def _otsu_threshold(gray: "np.ndarray") -> int:
+    """Otsu's threshold for an 8-bit grayscale array"""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    levels = np.arange(256)
+
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    sum_background = np.cumsum(histogram * levels)
+    mean_background = sum_background / np.maximum(weight_background, 1)
+    mean_foreground = (sum_background[-1] - sum_background) / np.maximum(weight_foreground, 1)
+
+    between_variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(between_variance))
+
+
+def _estimate_skew(image: "Image.Image", max_skew: float, step: float = 0.5) -> float:
+    """
+    Estimate the skew angle of a page from its row projection profile
+
+    The page is rotated through candidate angles on a small thumbnail; text lines
+    are horizontal when the row sums vary the most.
+    """
+    thumbnail = image.copy()
+    thumbnail.thumbnail((800, 800))
+    gray = np.asarray(thumbnail, dtype=np.uint8)
+    # Ink is darkness below the paper's brightness, so a tinted page has none and
+    # the corners rotated in (filled with no ink) match the paper
+    paper = np.percentile(gray, 90)
+    ink = np.clip(paper - gray.astype(np.int16), 0, 255).astype(np.uint8)
+
+    def score(angle: float) -> float:
+        rotated = Image.fromarray(ink).rotate(angle, resample=Image.NEAREST, fillcolor=0)
+        return float(np.var(np.asarray(rotated, dtype=np.float64).sum(axis=1)))
+
+    # The page stays as it is unless another angle is clearly better; a blank or
+    # uniform page scores about the same at every angle
+    best_angle, best_score = 0.0, score(0.0)
+    threshold = best_score * (1 + SKEW_MIN_GAIN)
+    for angle in np.arange(-max_skew, max_skew + step / 2, step):
+        angle = float(angle)
+        if angle == 0.0:
+            continue
+        angle_score = score(angle)
+        if angle_score > threshold and angle_score > best_score:
+            best_angle, best_score = angle, angle_score
+    return best_angle
+
+
+def preprocess_image(image: "Image.Image", ocr_options: Dict[str, Any]) -> Tuple["Image.Image", Dict[str, Any]]:
+    """
+    Normalize an image for OCR: grayscale, downscale to the target DPI, deskew and binarize
+
+    Args:
+        image: The source image
+        ocr_options: Resolved OCR options
+
+    Returns:
+        Tuple of (processed grayscale image, dict describing what was done)
+    """
+    info: Dict[str, Any] = {}
+    gray = ImageOps.grayscale(image) if image.mode != "L" else image
+
+    # Downscale oversized scans, OCR accuracy doesn't improve beyond ~300 DPI
+    dpi = image.info.get("dpi", (ASSUMED_DPI, ASSUMED_DPI))[0] or ASSUMED_DPI
+    target_dpi = ocr_options.get("target_dpi")
+    if target_dpi and dpi > target_dpi:
+        scale = target_dpi / float(dpi)
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, resample=Image.LANCZOS)
+        info["scale"] = round(scale, 4)
+
+    if ocr_options.get("deskew"):
+        angle = _estimate_skew(gray, float(ocr_options.get("max_skew") or 5.0))
+        if angle:
+            gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+            info["deskew_angle"] = angle
+
+    if ocr_options.get("binarize"):
+        threshold = _otsu_threshold(np.asarray(gray, dtype=np.uint8))
+        gray = gray.point(lambda value: 255 if value > threshold else 0)
+        info["threshold"] = threshold
+
+    return gray, info
+
+
+def split_into_bands(image: "Image.Image", tile_height: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Split a page into horizontal bands, cutting through whitespace between text lines
+
+    Args:
+        image: Page image
+        tile_height: Approximate band height in pixels
+        overlap: Overlap added when no whitespace row is found near a cut
+
+    Returns:
+        List of (top, bottom) pixel bounds in reading order
+    """
+    height = image.height
+    if height <= tile_height * 1.5:
+        return [(0, height)]
+
+    gray = np.asarray(ImageOps.grayscale(image) if image.mode != "L" else image, dtype=np.uint8)
+    threshold = _otsu_threshold(gray)
+    ink_per_row = (gray < threshold).sum(axis=1)
+    # Rows with (almost) no ink separate text lines
+    blank_rows = ink_per_row <= max(1, image.width // 500)
+
+    bands = []
+    top = 0
+    while height - top > tile_height * 1.5:
+        target = top + tile_height
+        window = blank_rows[target - tile_height // 4:target + tile_height // 4]
+        candidates = np.flatnonzero(window)
+        if candidates.size:
+            # Cut at the blank row closest to the target height
+            cut = target - tile_height // 4 + int(candidates[np.argmin(np.abs(candidates - tile_height // 4))])
+            bands.append((top, cut))
+            top = cut
+        else:
+            # Text runs through the whole window; overlap so no line is lost
+            bands.append((top, min(height, target + overlap)))
+            top = target - overlap
+    bands.append((top, height))
+    return bands
+
+
+def _merge_band_text(texts: List[str]) -> str:
+    """Join band texts, dropping a line repeated at the seam of overlapping bands"""
+    merged: List[str] = []
+    for text in texts:
+        lines = text.strip("\n").splitlines()
+        if merged and lines and lines[0].strip() and lines[0].strip() == merged[-1].strip():
+            lines = lines[1:]
+        merged.extend(lines)
+    return "\n".join(merged)
+
+
+def _submit(pool: ThreadPoolExecutor, fn: Callable, *args):
+    """
+    Submit a call that runs in a copy of the caller's context
+
+    Pool threads don't inherit context variables, which carry the extraction's
+    stage timings and cancellation token.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def ocr_image(
+    image: "Image.Image",
+    ocr_options: Dict[str, Any],
+    ocr_fn: Optional[Callable[["Image.Image", Optional[str]], str]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    OCR an image through the preprocessing and tiling pipeline
+
+    Args:
+        image: The image to OCR
+        ocr_options: Resolved OCR options (see DEFAULT_OCR_OPTIONS)
+        ocr_fn: Function OCR-ing a single image with a language; defaults to pytesseract
+
+    Returns:
+        Tuple of (text, dict describing the pipeline run)
+    """
+    if ocr_fn is None:
+        ocr_fn = lambda tile, lang: pytesseract.image_to_string(tile, lang=lang)
+
+    info: Dict[str, Any] = {}
+    if ocr_options.get("preprocess"):
+        with stage("preprocess"):
+            image, info = preprocess_image(image, ocr_options)
+
+    lang = ocr_options.get("lang")
+    if not ocr_options.get("tiles"):
+        info["tiles"] = 1
+        with stage("ocr"):
+            return ocr_fn(image, lang), info
+
+    bands = split_into_bands(
+        image,
+        tile_height=int(ocr_options.get("tile_height") or 1200),
+        overlap=int(ocr_options.get("tile_overlap") or 0)
+    )
+    info["tiles"] = len(bands)
+    if len(bands) == 1:
+        with stage("ocr"):
+            return ocr_fn(image, lang), info
+
+    workers = min(len(bands), int(ocr_options.get("workers") or config.OCR_WORKERS))
+    tiles = [image.crop((0, top, image.width, bottom)) for top, bottom in bands]
+
+    # tesseract runs outside the GIL, so threads are enough to use the worker's cores
+    with stage("ocr"), ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+        futures = [_submit(pool, ocr_fn, tile, lang) for tile in tiles]
+        texts = []
+        try:
+            for future in futures:
+                check_cancelled()
+                texts.append(future.result())
+        except ExtractionCancelled:
+            # Tiles that haven't started are dropped; running ones finish on exit
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return _merge_band_text(texts), info
+
+
+def ocr_image_layout(
+    image: "Image.Image",
+    ocr_options: Dict[str, Any],
+    data_fn: Callable[["Image.Image", Optional[str]], Dict[str, list]],
+    page: int = 1
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    OCR an image into word boxes (see layout.words_from_ocr_data)
+
+    The image is preprocessed like ocr_image but never tiled, so boxes share
+    one coordinate system; a downscale is undone so boxes are in source pixels.
+
+    Args:
+        image: The image to OCR
+        ocr_options: Resolved OCR options
+        data_fn: Function returning image_to_data output for an image and language
+        page: 1-based page number stored with the words
+
+    Returns:
+        Tuple of (word arrays, dict describing the pipeline run)
+    """
+    info: Dict[str, Any] = {}
+    if ocr_options.get("preprocess"):
+        with stage("preprocess"):
+            image, info = preprocess_image(image, ocr_options)
+
+    info["tiles"] = 1
+    with stage("ocr"):
+        data = data_fn(image, ocr_options.get("lang"))
+    with stage("layout"):
+        return words_from_ocr_data(data, page=page, scale=info.get("scale")), info
+
+
+def ocr_image_stream(
+    images: Iterable[Tuple[int, "Image.Image"]],
+    options: Optional[Dict[str, Any]],
+    ocr_fn: Optional[Callable[["Image.Image", Optional[str]], str]] = None,
+    workers: Optional[int] = None,
+    on_page: Optional[Callable[[int, Any, Dict[str, Any]], None]] = None,
+    recognize: Optional[Callable[[int, "Image.Image", Dict[str, Any]], Tuple[Any, Dict[str, Any]]]] = None
+) -> int:
+    """
+    OCR a stream of page images concurrently, holding only a few of them at once
+
+    Images are pulled from the iterable one at a time, so it can decode or
+    render each page lazily; at most one image per worker is waiting or being
+    OCR'd. With several workers pages are OCR'd whole unless the request's
+    "ocr" option asks for tiles, since the pages already keep them busy.
+
+    Args:
+        images: (page index, image) pairs
+        options: Extraction options; "ocr" configures the OCR pipeline
+        ocr_fn: Function OCR-ing a single image with a language
+        workers: Pages OCR'd at once; defaults to the "ocr" workers option or config.OCR_WORKERS
+        on_page: Called with (page index, text, pipeline info) as each page
+            finishes; pages may finish out of order
+        recognize: Replaces ocr_image for each page, called with (page index,
+            image, resolved OCR options) and returning (result, info); e.g.
+            ocr_image_layout for word boxes instead of text
+
+    Returns:
+        Number of pages OCR'd
+    """
+    ocr_options = resolve_ocr_options(options)
+    workers = max(1, int(workers or ocr_options.get("workers") or config.OCR_WORKERS))
+    if workers > 1 and "tiles" not in ((options or {}).get("ocr") or {}):
+        ocr_options["tiles"] = False
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-page") as pool:
+        pending: Dict[Any, int] = {}
+
+        def collect(limit: int) -> None:
+            while len(pending) > limit:
+                future = next(as_completed(pending))
+                check_cancelled()
+                index = pending.pop(future)
+                result, info = future.result()
+                if on_page:
+                    on_page(index, result, info)
+
+        try:
+            for index, image in images:
+                check_cancelled()
+                if recognize is not None:
+                    future = _submit(pool, recognize, index, image, ocr_options)
+                else:
+                    future = _submit(pool, ocr_image, image, ocr_options, ocr_fn)
+                pending[future] = index
+                count += 1
+                # Drop our reference so a finished page's image can be freed
+                image = None
+                collect(workers)
+            collect(0)
+        except ExtractionCancelled:
+            # Pages that haven't started are dropped; running ones finish on exit
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return count
@@ -0,0 +1,175 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Import the necessary libraries for OCR
+try:
+    import pytesseract
+except ImportError:
+    logging.warning("pytesseract not installed. Image extraction will not work.")
+
+# tesserocr is optional; it keeps tesseract and its language data loaded in-process
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+    logging.warning(
+        "tesserocr not installed. OCR falls back to pytesseract, which starts one "
+        "tesseract process (and reloads the language model) per call."
+    )
+
+DEFAULT_LANG = "eng"
+
+
+class PytesseractEngine:
+    """OCR through the tesseract command line, one process per call"""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        # Check once per engine (i.e. once per worker) that tesseract is installed
+        try:
+            self.version = str(pytesseract.get_tesseract_version())
+        except Exception as e:
+            self.version = None
+            self.logger.warning(f"Tesseract OCR may not be properly installed: {str(e)}")
+
+    def image_to_string(self, image, lang: Optional[str] = None) -> str:
+        return pytesseract.image_to_string(image, lang=lang or DEFAULT_LANG)
+
+    def image_to_data(self, image, lang: Optional[str] = None) -> Dict[str, Any]:
+        return pytesseract.image_to_data(image, lang=lang or DEFAULT_LANG, output_type=pytesseract.Output.DICT)
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine:
+    """OCR through a pool of persistent tesseract API handles with models kept loaded"""
+
+    name = "tesserocr"
+
+    def __init__(self, pool_size: int = 1):
+        """
+        Args:
+            pool_size: Maximum number of API handles per language; also the
+                number of concurrent OCR calls the engine can serve
+        """
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+
+        self.logger = logging.getLogger(__name__)
+        self.pool_size = max(1, pool_size)
+        self.version = tesserocr.tesseract_version().splitlines()[0]
+        self._pools: Dict[str, "queue.LifoQueue"] = {}
+        self._created: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _api(self, lang: str):
+        """Borrow an API handle for a language, creating one while the pool has room"""
+        with self._lock:
+            pool = self._pools.setdefault(lang, queue.LifoQueue())
+            create = pool.empty() and self._created.get(lang, 0) < self.pool_size
+            if create:
+                self._created[lang] = self._created.get(lang, 0) + 1
+
+        # Loading the language model is the expensive part, so it happens once per handle
+        if create:
+            try:
+                api = tesserocr.PyTessBaseAPI(lang=lang)
+            except Exception:
+                # Give the slot back, or failed creations would leave callers
+                # waiting on a pool no handle will ever be returned to
+                with self._lock:
+                    self._created[lang] -= 1
+                raise
+        else:
+            api = pool.get()
+        try:
+            yield api
+        finally:
+            api.Clear()
+            pool.put(api)
+
+    def image_to_string(self, image, lang: Optional[str] = None) -> str:
+        with self._api(lang or DEFAULT_LANG) as api:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+    def image_to_data(self, image, lang: Optional[str] = None) -> Dict[str, Any]:
+        """Word-level results in the same layout as pytesseract's image_to_data dict"""
+        data: Dict[str, list] = {
+            key: [] for key in (
+                "level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text"
+            )
+        }
+        with self._api(lang or DEFAULT_LANG) as api:
+            api.SetImage(image)
+            api.Recognize()
+            iterator = api.GetIterator()
+            level = tesserocr.RIL.WORD
+            block_num = par_num = line_num = word_num = 0
+            for word in tesserocr.iterate_level(iterator, level):
+                if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block_num += 1
+                    par_num = line_num = 0
+                if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par_num += 1
+                    line_num = 0
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line_num += 1
+                    word_num = 0
+                word_num += 1
+
+                box = word.BoundingBox(level)
+                if box is None:
+                    continue
+                left, top, right, bottom = box
+                data["level"].append(5)
+                data["page_num"].append(1)
+                data["block_num"].append(block_num)
+                data["par_num"].append(par_num)
+                data["line_num"].append(line_num)
+                data["word_num"].append(word_num)
+                data["left"].append(left)
+                data["top"].append(top)
+                data["width"].append(right - left)
+                data["height"].append(bottom - top)
+                data["conf"].append(word.Confidence(level))
+                data["text"].append(word.GetUTF8Text(level) or "")
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                while not pool.empty():
+                    pool.get().End()
+            self._pools.clear()
+            self._created.clear()
+
+
+def create_ocr_engine(engine: str = "auto", pool_size: int = 1):
+    """
+    Create the OCR engine for this worker
+
+    Args:
+        engine: "tesserocr", "pytesseract" or "auto" (tesserocr when installed)
+        pool_size: Number of persistent API handles for the tesserocr engine
+
+    Returns:
+        An engine with image_to_string/image_to_data methods
+    """
+    if engine == "auto":
+        engine = "tesserocr" if tesserocr is not None else "pytesseract"
+
+    if engine == "tesserocr":
+        return TesserocrEngine(pool_size=pool_size)
+    if engine == "pytesseract":
+        return PytesseractEngine()
+    raise ValueError(f"Unsupported OCR engine: {engine}")
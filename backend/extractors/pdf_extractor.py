@@ -1,5 +1,8 @@
 import logging
-from typing import Dict, Any, List
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Tuple, Callable
 import os
 
 # Import the necessary libraries for PDF extraction
@@ -9,27 +12,138 @@ try:
 except ImportError:
     logging.warning("PyPDF2 not installed. PDF extraction will not work.")
 
+# pypdfium2 is optional; it rasterizes pages without a text layer for hybrid OCR
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+from ..core.cancellation import ExtractionCancelled, check_cancelled
+from ..core.metrics import stage
+from .ocr import resolve_ocr_options, ocr_image_stream
+
+# Values of the "ocr_mode" option: "off" keeps the text layer only, "hybrid"
+# OCRs the pages whose text layer is missing or negligible
+PDF_OCR_MODES = ("off", "hybrid")
+
+def parse_page_range(pages: Any, page_count: int) -> Tuple[int, int]:
+    """
+    Parse a 1-based, inclusive page range option
+    
+    Args:
+        pages: "3", "1-10", "5-" or a [first, last] list
+        page_count: Number of pages in the document
+        
+    Returns:
+        0-based (start, end) bounds, end exclusive
+    """
+    if isinstance(pages, int):
+        first, last = pages, pages
+    elif isinstance(pages, str):
+        first_str, sep, last_str = pages.partition("-")
+        first = int(first_str) if first_str.strip() else 1
+        last = (int(last_str) if last_str.strip() else page_count) if sep else first
+    elif isinstance(pages, (list, tuple)) and len(pages) == 2:
+        first = int(pages[0]) if pages[0] is not None else 1
+        last = int(pages[1]) if pages[1] is not None else page_count
+    else:
+        raise ValueError(f"Invalid page range: {pages}")
+    
+    if first < 1 or last < first or first > page_count:
+        raise ValueError(f"Invalid page range {pages} for a document with {page_count} pages")
+    
+    return first - 1, min(last, page_count)
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Extract the text of pages [start, end) with a single reader (runs in page workers)"""
+    with open(file_path, 'rb') as file:
+        reader = PdfReader(file)
+        return [reader.pages[i].extract_text() for i in range(start, end)]
+
 class PDFExtractor:
     """Extract content from PDF files"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_min_pages: int = 64,
+        ocr_mode: str = "off",
+        min_text_chars: int = 8,
+        ocr_engine_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            max_workers: Processes used to extract page ranges in parallel; the
+                pool is started by the first large document and reused by later ones
+            parallel_min_pages: Documents with fewer pages are extracted in-process
+            ocr_mode: Default for the "ocr_mode" option (see PDF_OCR_MODES)
+            min_text_chars: Pages whose text layer has fewer non-blank characters
+                are OCR'd in hybrid mode
+            ocr_engine_factory: Creates the OCR engine on the first hybrid
+                extraction (see ocr_engine.create_ocr_engine)
+        """
+        if ocr_mode not in PDF_OCR_MODES:
+            raise ValueError(f"Unsupported PDF OCR mode: {ocr_mode}")
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        self.ocr_mode = ocr_mode
+        self.min_text_chars = min_text_chars
+        self.ocr_engine_factory = ocr_engine_factory
+        self._ocr_engine = None
+        self._page_pool: Optional[ProcessPoolExecutor] = None
+        self._page_pool_lock = threading.Lock()
     
-    def extract(self, file_path: str) -> Dict[str, Any]:
+    @property
+    def ocr_engine(self):
+        """OCR engine, created on first use so text-only workers never load tesseract"""
+        if self._ocr_engine is None:
+            if self.ocr_engine_factory is None:
+                from .ocr_engine import create_ocr_engine
+                self.ocr_engine_factory = create_ocr_engine
+            self._ocr_engine = self.ocr_engine_factory()
+        return self._ocr_engine
+    
+    def extract(
+        self,
+        file_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
         """
         Extract text and metadata from a PDF file
         
         Args:
             file_path: Path to the PDF file
+            options: Extraction options; "pages" limits extraction to a 1-based
+                page range, "workers" lowers the number of page workers,
+                "ocr_mode" set to "hybrid" OCRs pages with fewer than
+                "min_text_chars" characters of text and "ocr" configures that
+                OCR (see ocr.DEFAULT_OCR_OPTIONS)
+            progress_callback: Called with (page index, page count, page text)
+                as soon as each page is extracted; pages may arrive out of order
             
         Returns:
             Dict containing extracted content and metadata
         """
+        options = options or {}
         self.logger.info(f"Extracting content from PDF: {file_path}")
         
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"PDF file not found: {file_path}")
         
+        ocr_mode = options.get("ocr_mode") or self.ocr_mode
+        if ocr_mode not in PDF_OCR_MODES:
+            raise ValueError(f"Unsupported PDF OCR mode: {ocr_mode}")
+        min_text_chars = int(options.get("min_text_chars", self.min_text_chars))
+        
+        # In hybrid mode pages without usable text are only published once OCR'd
+        native_callback = progress_callback
+        if ocr_mode == "hybrid" and progress_callback:
+            def native_callback(page_num: int, page_count: int, page_text: str) -> None:
+                if not self._needs_ocr(page_text, min_text_chars):
+                    progress_callback(page_num, page_count, page_text)
+        
         try:
             # Open the PDF
             with open(file_path, 'rb') as file:
@@ -50,46 +164,210 @@ class PDFExtractor:
                             except:
                                 pass
                 
-                # Extract text content from each page
-                num_pages = len(reader.pages)
-                content = []
-                
-                for i in range(num_pages):
-                    page = reader.pages[i]
-                    content.append(page.extract_text())
-                
-                # Combine all pages into a single string
-                combined_content = "\n\n".join(content)
-                
-                result = {
-                    "content": combined_content,
-                    "page_count": num_pages,
-                    "metadata": metadata,
-                }
+                total_pages = len(reader.pages)
                 
-                self.logger.info(f"Successfully extracted {num_pages} pages from {file_path}")
-                return result
+                # Restrict extraction to the requested pages
+                start, end = 0, total_pages
+                if options.get("pages") is not None and total_pages:
+                    start, end = parse_page_range(options["pages"], total_pages)
+                    metadata["page_range"] = [start + 1, end]
+                metadata["total_pages"] = total_pages
                 
+                max_workers = min(int(options.get("workers") or self.max_workers), self.max_workers)
+                if max_workers > 1 and end - start >= self.parallel_min_pages:
+                    content = self._extract_parallel(file_path, start, end, max_workers, native_callback)
+                else:
+                    content = []
+                    for i in range(start, end):
+                        check_cancelled()
+                        content.append(reader.pages[i].extract_text())
+                        if native_callback:
+                            native_callback(i - start, end - start, content[-1])
+            
+            if ocr_mode == "hybrid":
+                scanned = [i for i, page_text in enumerate(content) if self._needs_ocr(page_text, min_text_chars)]
+                metadata["ocr_pages"] = [start + i + 1 for i in scanned]
+                if scanned:
+                    metadata["ocr"] = self._ocr_pages(
+                        file_path, start, scanned, content, options, max_workers, progress_callback
+                    )
+            
+            # Combine all pages into a single string
+            num_pages = len(content)
+            combined_content = "\n\n".join(content)
+            
+            result = {
+                "content": combined_content,
+                "pages": content,
+                "page_count": num_pages,
+                "metadata": metadata,
+            }
+            
+            self.logger.info(f"Successfully extracted {num_pages} pages from {file_path}")
+            return result
+        
+        except ExtractionCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"PDF extraction failed: {str(e)}")
             raise ValueError(f"Failed to extract content from PDF: {str(e)}")
     
-    def extract_page(self, file_path: str, page_num: int) -> str:
+    def _extract_parallel(
+        self,
+        file_path: str,
+        start: int,
+        end: int,
+        max_workers: int,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[str]:
+        """Split pages [start, end) into contiguous ranges, extract them on the page pool and merge in order"""
+        page_total = end - start
+        workers = min(max_workers, page_total)
+        pool = self._get_page_pool()
+        
+        # A few ranges per worker keeps the pool busy when some pages are slower
+        range_count = min(page_total, workers * 4)
+        bounds = [start + (page_total * i) // range_count for i in range(range_count + 1)]
+        starts, ends = bounds[:-1], bounds[1:]
+        
+        self.logger.info(f"Extracting {page_total} pages in {range_count} ranges on {workers} workers")
+        
+        content: List[Optional[str]] = [None] * page_total
+        futures = {}
+        pending = list(zip(starts, ends))
+        
+        def submit_next() -> None:
+            range_start, range_end = pending.pop(0)
+            futures[pool.submit(_extract_page_range, file_path, range_start, range_end)] = range_start
+        
+        # At most `workers` ranges in flight, so a lower "workers" option is honoured on the shared pool
+        for _ in range(min(workers, len(pending))):
+            submit_next()
+        
+        # Publish each range as soon as it finishes, then merge in page order
+        try:
+            while futures:
+                future = next(as_completed(futures))
+                check_cancelled()
+                offset = futures.pop(future) - start
+                for i, page_content in enumerate(future.result()):
+                    content[offset + i] = page_content
+                    if progress_callback:
+                        progress_callback(offset + i, page_total, page_content)
+                if pending:
+                    submit_next()
+        except BrokenProcessPool:
+            self._discard_page_pool(pool)
+            raise
+        except Exception:
+            # The pool outlives this document; ranges that are running finish unobserved
+            for future in futures:
+                future.cancel()
+            raise
+        return content
+    
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        """The page worker pool, started on first use"""
+        with self._page_pool_lock:
+            if self._page_pool is None:
+                self._page_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._page_pool
+    
+    def _discard_page_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken page pool so the next document starts a new one"""
+        with self._page_pool_lock:
+            if self._page_pool is pool:
+                self._page_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _needs_ocr(page_text: Optional[str], min_text_chars: int) -> bool:
+        """Whether a page's text layer is missing or too short to be the page's real text"""
+        if not page_text:
+            return True
+        return len("".join(page_text.split())) < min_text_chars
+    
+    def _ocr_pages(
+        self,
+        file_path: str,
+        start: int,
+        page_indexes: List[int],
+        content: List[str],
+        options: Dict[str, Any],
+        max_workers: int,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
         """
-        Extract text from a specific page of a PDF
+        Rasterize the given pages (indexes into content, relative to start) and OCR them in parallel
+        
+        The OCR'd text replaces the page's entry in content. Pages are rendered
+        one at a time on this thread (pdfium isn't thread-safe) and OCR'd on a
+        thread pool, since tesseract runs outside the GIL.
+        
+        Returns:
+            Dict describing the OCR run, stored as the "ocr" metadata
+        """
+        if pypdfium2 is None:
+            raise ValueError("Hybrid OCR needs pypdfium2 to render pages; install it with pip")
+        
+        dpi = int(resolve_ocr_options(options).get("target_dpi") or 300)
+        workers = min(len(page_indexes), int((options.get("ocr") or {}).get("workers") or max_workers))
+        engine = self.ocr_engine
+        self.logger.info(f"OCR'ing {len(page_indexes)} of {len(content)} pages at {dpi} DPI on {workers} workers")
+        
+        def render_pages():
+            for index in page_indexes:
+                with stage("render"):
+                    page = document[start + index]
+                    try:
+                        image = page.render(scale=dpi / 72.0, grayscale=True).to_pil()
+                    finally:
+                        page.close()
+                image.info["dpi"] = (dpi, dpi)
+                yield index, image
+        
+        def on_page(index: int, text: str, info: Dict[str, Any]) -> None:
+            content[index] = text
+            if progress_callback:
+                progress_callback(index, len(content), text)
+        
+        document = pypdfium2.PdfDocument(file_path)
+        try:
+            ocr_image_stream(render_pages(), options, engine.image_to_string, workers, on_page)
+        finally:
+            document.close()
+        
+        return {"engine": engine.name, "mode": "hybrid", "dpi": dpi, "pages": len(page_indexes)}
+    
+    def extract_pages(self, file_path: str, page_nums: List[int]) -> List[str]:
+        """
+        Extract text from several pages of a PDF, parsing the file once
         
         Args:
             file_path: Path to the PDF file
-            page_num: Page number to extract (0-indexed)
+            page_nums: Page numbers to extract (0-indexed)
             
         Returns:
-            The extracted text from the specified page
+            The extracted text of each requested page, in the given order
         """
         with open(file_path, 'rb') as file:
             reader = PdfReader(file)
             
-            if page_num < 0 or page_num >= len(reader.pages):
-                raise ValueError(f"Invalid page number: {page_num}")
+            for page_num in page_nums:
+                if page_num < 0 or page_num >= len(reader.pages):
+                    raise ValueError(f"Invalid page number: {page_num}")
+            
+            return [reader.pages[page_num].extract_text() for page_num in page_nums]
+    
+    def extract_page(self, file_path: str, page_num: int) -> str:
+        """
+        Extract text from a specific page of a PDF
+        
+        Args:
+            file_path: Path to the PDF file
+            page_num: Page number to extract (0-indexed)
             
-            page = reader.pages[page_num]
-            return page.extract_text()
\ No newline at end of file
+        Returns:
+            The extracted text from the specified page
+        """
+        return self.extract_pages(file_path, [page_num])[0]
\ No newline at end of file
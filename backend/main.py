@@ -1,24 +1,112 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, Form, Query, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import shutil
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import json
 import os
+import time
 import uuid
 from typing import List, Optional
+import logging
 import uvicorn
-from extractor.backend.core.data_extraction import DataExtractionApp
+from extractor.backend.core import config, metrics
+from extractor.backend.core.cancellation import ExtractionCancelled, ExtractionTimedOut
+from extractor.backend.core.executor import ExtractionExecutor
+from extractor.backend.core.extractor_registry import create_default_registry, parse_extractor_types
+from extractor.backend.core.result_cache import ResultCache, make_cache_key
+from extractor.backend.core.result_file import SECTION_KEYS, SPILLED_KEYS, ResultFile, ResultFileError, write_result_file
+from extractor.backend.core.scheduler import ExtractionScheduler, SchedulerQueueFullError
+from extractor.backend.core.search_index import SEARCH_MODES, SearchQueryError, create_search_index
+from extractor.backend.core.task_store import ACTIVE_STATUSES, create_task_store, process_owner
+from extractor.backend.utils.uploads import save_upload, save_stream, UploadTooLargeError
+from extractor.backend.utils.archives import ArchiveTooLargeError, iter_archive_members
+from extractor.backend.utils.sniffing import SNIFF_BYTES, UnsupportedContentError, sniff_archive, stored_filename
+from extractor.backend.utils.tables import LAYOUT_TABLES, TABLE_FORMATS, TABLE_MEDIA_TYPES, arrow_available, columnar_to_bytes
+from extractor.backend.utils.helpers import CHUNK_UNITS, iter_chunks, count_tokens
 from extractor.backend.models.models import (
     ExtractionResponse, 
     ExtractionRequest, 
     DocumentInfo, 
+    DocumentSummary,
+    ContentSlice,
+    SearchResponse,
+    ExtractionProgress,
     ExtractorType,
+    JobPriority,
+    BatchProgress,
+    BatchResponse,
     ProcessingStatus
 )
 
+logger = logging.getLogger(__name__)
+
+# Task records, shared between API worker processes by the SQLite store
+task_store = create_task_store(config.TASK_STORE, config.TASK_STORE_PATH)
+
+# Extractions run here so the event loop only dispatches and awaits;
+# workers publish each page to the task store as soon as it is extracted
+extraction_executor = ExtractionExecutor(
+    mode=config.EXTRACTION_EXECUTOR,
+    max_workers=config.EXTRACTION_WORKERS,
+    start_method=config.EXTRACTION_START_METHOD,
+    task_store=task_store,
+    prewarm=parse_extractor_types(config.PREWARM_EXTRACTORS),
+    cancel_grace_seconds=config.CANCEL_GRACE_SECONDS
+)
+
+# Admission control and ordering of extraction jobs in front of the executor
+scheduler = ExtractionScheduler(
+    max_running=config.SCHEDULER_MAX_RUNNING,
+    type_limits={ExtractorType(name): limit for name, limit in config.SCHEDULER_TYPE_LIMITS.items()},
+    queue_size=config.SCHEDULER_QUEUE_SIZE
+)
+
+# Full-text index of completed tasks' pages (None when search is disabled)
+search_index = create_search_index(config.SEARCH_INDEX, config.SEARCH_INDEX_PATH)
+
+# Extension lookup only; extractor backends are imported by the workers on first use
+extractor_registry = create_default_registry()
+
+# Results of previous extractions, keyed by content hash, extractor and options
+result_cache = ResultCache(
+    memory_bytes=config.RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_bytes=config.RESULT_CACHE_DISK_MB * 1024 * 1024,
+    cache_dir=config.RESULT_CACHE_DIR
+)
+
+# Gauges read when /metrics is scraped
+metrics.QUEUE_DEPTH.set_function(lambda: scheduler.queued + extraction_executor.queue_depth)
+metrics.TASKS_IN_FLIGHT.set_function(lambda: scheduler.running)
+metrics.TASK_STORE_TASKS.set_function(task_store.count)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the extraction workers with the app and stop them on shutdown"""
+    # Each worker's scheduler queue lives in its own process, so active tasks
+    # whose worker is gone (a restart or crash) would otherwise never finish;
+    # those of other live workers sharing the store keep running
+    orphaned = await asyncio.to_thread(task_store.fail_orphaned, "Interrupted by a server restart")
+    if orphaned:
+        logger.warning(f"Marked {len(orphaned)} tasks interrupted by a restart as failed")
+    extraction_executor.start()
+    eviction_task = asyncio.create_task(evict_expired_tasks())
+    try:
+        yield
+    finally:
+        eviction_task.cancel()
+        await scheduler.shutdown()
+        extraction_executor.shutdown()
+        task_store.close()
+        if search_index is not None:
+            search_index.close()
+
 app = FastAPI(
     title="Document Extraction API",
     description="API for extracting content from various document types",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -31,139 +119,989 @@ app.add_middleware(
 )
 
 # Create uploads directory if it doesn't exist
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = config.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# In-memory storage for background tasks (replace with database in production)
-extraction_tasks = {}
+# Completed results are spilled here when RESULT_STORAGE is "file"
+RESULT_DIR = config.RESULT_DIR
+if config.RESULT_STORAGE == "file":
+    os.makedirs(RESULT_DIR, exist_ok=True)
+
+def remove_task_file(task: dict):
+    """Remove the uploaded file and the result file that belong to a task"""
+    for path in (task.get("file_path"), task.get("result_file")):
+        if path and os.path.exists(path):
+            os.remove(path)
+
+def index_result(task_id: str, file_name: str, result: dict):
+    """Add a finished extraction's pages to the search index"""
+    if search_index is None:
+        return
+    pages = result.get("pages")
+    if pages is None:
+        pages = [result.get("content") or ""]
+    try:
+        search_index.add(task_id, file_name, pages)
+    except Exception as e:
+        # The extraction itself succeeded; the task just won't show up in searches
+        logger.error(f"Indexing task {task_id} failed: {str(e)}")
+
+def unindex_task(task_id: str):
+    """Drop a deleted task from the search index"""
+    if search_index is not None:
+        search_index.remove(task_id)
+
+def save_result(task_id: str, result: dict, pages_published: bool = False):
+    """Store a finished extraction: pages go to the page table, content and the rest to the task record"""
+    if config.RESULT_STORAGE == "file":
+        save_result_file(task_id, result, pages_published)
+        return
+    
+    pages = result.get("pages")
+    if pages is not None and not pages_published:
+        task_store.set_pages(task_id, pages)
+    
+    content = result.get("content") or ""
+    stored_result = {key: value for key, value in result.items() if key not in ("pages", "content")}
+    task_store.update(
+        task_id,
+        status=ProcessingStatus.COMPLETED,
+        result=stored_result,
+        content=content,
+        content_length=len(content),
+        page_count=result.get("page_count", 1),
+        metadata=result.get("metadata", {})
+    )
+
+def save_result_file(task_id: str, result: dict, pages_published: bool = False):
+    """Store a finished extraction in a compressed result file; the task record keeps only the summary"""
+    result_path = os.path.join(RESULT_DIR, f"{task_id}.result")
+    summary = write_result_file(result_path, result)
+    
+    stored_result = {key: value for key, value in result.items() if key not in SPILLED_KEYS}
+    updated = task_store.update(
+        task_id,
+        status=ProcessingStatus.COMPLETED,
+        result=stored_result,
+        result_file=result_path,
+        content_length=summary["content_length"],
+        page_count=result.get("page_count", 1),
+        pages_done=summary["page_count"],
+        metadata=result.get("metadata", {})
+    )
+    if not updated:
+        # Deleted while it was being extracted
+        os.remove(result_path)
+    elif pages_published:
+        # Readers switch to the file once the task is completed, so the published pages can go
+        task_store.clear_pages(task_id)
+
+def read_pages(task_id: str, task: dict, start: int = 0, end: Optional[int] = None) -> list:
+    """Get (page number, text) pairs of a task from its result file or the task store"""
+    if task.get("result_file"):
+        try:
+            with ResultFile(task["result_file"]) as result_file:
+                return result_file.get_pages(start, end)
+        except ResultFileError as e:
+            # Deleted or expired since the task was read
+            logger.warning(str(e))
+            return []
+    return task_store.get_pages(task_id, start, end)
+
+def read_content(task_id: str, task: dict, offset: int = 0, length: Optional[int] = None) -> Optional[tuple]:
+    """Get a slice of a task's content and its total length from its result file or the task store"""
+    if task.get("result_file"):
+        try:
+            with ResultFile(task["result_file"]) as result_file:
+                return result_file.get_content(offset, length)
+        except ResultFileError as e:
+            logger.warning(str(e))
+            return None
+    return task_store.get_content(task_id, offset, length)
+
+def read_section(task: dict, key: str):
+    """Get a structured part of a completed task's result (structured_data, raw_data), or None"""
+    if task.get("result_file"):
+        try:
+            with ResultFile(task["result_file"]) as result_file:
+                return result_file.get_section(key)
+        except ResultFileError as e:
+            logger.warning(str(e))
+            return None
+    return (task.get("result") or {}).get(key)
+
+def cancel_task(task_id: str, task: dict) -> bool:
+    """
+    Stop a task's extraction: drop it from the scheduler queue or tell the running extraction to stop
+
+    The caller marks the task cancelled or deletes it right before or after;
+    that is what the extraction sees at its next page. Returns False if the
+    task wasn't active.
+    """
+    if task["status"] not in ACTIVE_STATUSES:
+        return False
+    if scheduler.cancel(task_id):
+        # Never started, so process_document won't count it
+        metrics.TASKS_TOTAL.inc(extractor_type=ExtractorType(task["extractor_type"]).value, status="cancelled")
+    else:
+        extraction_executor.cancel(task_id)
+    return True
+
+def queue_full(error: SchedulerQueueFullError, extractor_type: str) -> HTTPException:
+    """429 response telling the client when to retry"""
+    metrics.REJECTED_TOTAL.inc(extractor_type=extractor_type)
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+async def evict_expired_tasks():
+    """Periodically drop finished tasks past their TTL, and active ones that stopped updating, with their files"""
+    while True:
+        await asyncio.sleep(config.TASK_EVICTION_INTERVAL_SECONDS)
+        try:
+            expired = await asyncio.to_thread(
+                task_store.expire, config.TASK_TTL_SECONDS, config.ACTIVE_TASK_TTL_SECONDS
+            )
+            for task in expired:
+                await asyncio.to_thread(remove_task_file, task)
+                await asyncio.to_thread(unindex_task, task["task_id"])
+        except Exception as e:
+            logger.error(f"Task eviction failed: {str(e)}")
 
 @app.get("/")
 def read_root():
     return {"message": "Document Extraction API is running"}
 
 @app.post("/upload", response_model=ExtractionResponse)
-async def upload_file(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
-    """Upload a document file for extraction"""
+async def upload_file(
+    file: UploadFile = File(...),
+    options: Optional[str] = Form(None),
+    priority: JobPriority = Form(JobPriority.INTERACTIVE)
+):
+    """
+    Upload a document file for extraction, with optional JSON-encoded extraction options
+
+    Uploads are rejected with a 429 and a Retry-After header while the
+    extraction queue is full; "bulk" priority jobs run after "interactive" ones.
+    """
+    request = parse_extraction_request(options)
     
     # Generate unique task ID
     task_id = str(uuid.uuid4())
     
-    # Save uploaded file
-    file_path = os.path.join(UPLOAD_DIR, f"{task_id}_{file.filename}")
+    # Determine extractor type from the first bytes, before anything is written to disk
+    head = await file.read(SNIFF_BYTES)
+    try:
+        extractor_type, stored_name = detect_upload_type(file.filename, head)
+    except UnsupportedContentError as e:
+        raise HTTPException(status_code=415, detail=f"Unsupported file content: {str(e)}")
+    
+    # Refuse work that can't be queued before receiving the rest of it
+    try:
+        scheduler.check_capacity()
+    except SchedulerQueueFullError as e:
+        raise queue_full(e, extractor_type.value)
+    
+    # Stream the upload to disk, hashing it on the way
+    file_path = os.path.join(UPLOAD_DIR, f"{task_id}_{stored_name}")
     
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        with metrics.STAGE_SECONDS.time(stage="upload", extractor_type=extractor_type.value):
+            file_size, file_hash = await save_upload(
+                file,
+                file_path,
+                max_bytes=config.MAX_UPLOAD_BYTES.get(extractor_type.value),
+                head=head
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
-    # Determine extractor type based on file extension
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    # Add task to queue; duplicate uploads complete straight from the result cache
+    cached = await create_task(
+        task_id, file.filename, file_path, file_size, file_hash, extractor_type, request.options
+    )
+    if cached:
+        return ExtractionResponse(
+            task_id=task_id,
+            status=ProcessingStatus.COMPLETED,
+            message="Document extraction completed (cached)"
+        )
     
-    if file_ext in ['.pdf']:
-        extractor_type = ExtractorType.PDF
-    elif file_ext in ['.jpg', '.jpeg', '.png', '.tiff', '.bmp']:
-        extractor_type = ExtractorType.IMAGE
-    elif file_ext in ['.xlsx', '.xls', '.csv']:
-        extractor_type = ExtractorType.EXCEL
-    else:
-        os.remove(file_path)  # Clean up file
-        raise HTTPException(status_code=400, detail="Unsupported file format")
+    # Queue for processing
+    try:
+        scheduler.submit(task_id, extractor_type, functools.partial(process_document, task_id), priority)
+    except SchedulerQueueFullError as e:
+        task = task_store.delete(task_id)
+        if task is not None:
+            remove_task_file(task)
+        raise queue_full(e, extractor_type.value)
     
-    # Add task to queue
-    extraction_tasks[task_id] = {
+    return ExtractionResponse(
+        task_id=task_id,
+        status=ProcessingStatus.PENDING,
+        message="Document uploaded and queued for processing"
+    )
+
+def detect_upload_type(file_name: str, head: bytes) -> tuple:
+    """
+    Route a document by its leading bytes rather than its extension
+
+    A mislabeled document goes to the extractor for its actual format and is
+    stored under that format's extension; content no extractor handles is
+    rejected before it takes up disk space or a worker.
+
+    Args:
+        file_name: The client-supplied filename
+        head: Up to SNIFF_BYTES from the start of the document
+
+    Returns:
+        Tuple of (extractor type, filename to store the document under)
+
+    Raises:
+        UnsupportedContentError: The content isn't a supported document format
+    """
+    try:
+        extractor_type, content_format = extractor_registry.extractor_type_for_content(
+            head, file_name, complete=len(head) < SNIFF_BYTES
+        )
+    except UnsupportedContentError as e:
+        metrics.UPLOAD_CONTENT_TOTAL.inc(result="rejected")
+        logger.info(f"Rejected {file_name}: {str(e)}")
+        raise
+    
+    stored_name = stored_filename(file_name or "", content_format)
+    if stored_name != file_name:
+        metrics.UPLOAD_CONTENT_TOTAL.inc(result="mismatched")
+        logger.info(f"{file_name} contains {content_format.name} data; extracting it as {extractor_type.value}")
+    else:
+        metrics.UPLOAD_CONTENT_TOTAL.inc(result="matched")
+    return extractor_type, stored_name
+
+def parse_extraction_request(options: Optional[str]) -> ExtractionRequest:
+    """Parse JSON-encoded extraction options, e.g. {"pages": "1-10"}"""
+    try:
+        return ExtractionRequest(options=json.loads(options) if options else {})
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid extraction options: {str(e)}")
+
+async def create_task(
+    task_id: str,
+    file_name: str,
+    file_path: str,
+    file_size: int,
+    file_hash: str,
+    extractor_type: ExtractorType,
+    options: dict,
+    batch_id: Optional[str] = None
+) -> bool:
+    """Record a saved upload as a task; returns True if it was completed from the result cache"""
+    cache_key = make_cache_key(file_hash, extractor_type.value, options)
+    task = {
         "status": ProcessingStatus.PENDING,
         "file_path": file_path,
-        "file_name": file.filename,
+        "file_name": file_name,
+        "file_size": file_size,
+        "file_hash": file_hash,
+        "cache_key": cache_key,
         "extractor_type": extractor_type,
+        "options": options,
+        "owner": process_owner(),
         "result": None,
         "error": None
     }
+    if batch_id is not None:
+        task["batch_id"] = batch_id
+    await asyncio.to_thread(task_store.create, task_id, task)
     
-    # Process in background
-    if background_tasks:
-        background_tasks.add_task(process_document, task_id)
-    else:
-        # For sync processing (useful for testing)
-        await process_document(task_id)
-    
-    return ExtractionResponse(
-        task_id=task_id,
-        status=ProcessingStatus.PENDING,
-        message="Document uploaded and queued for processing"
-    )
+    cached_result = await asyncio.to_thread(result_cache.get, cache_key)
+    if cached_result is None:
+        metrics.CACHE_REQUESTS_TOTAL.inc(result="miss")
+        return False
+    metrics.CACHE_REQUESTS_TOTAL.inc(result="hit")
+    await asyncio.to_thread(save_result, task_id, cached_result)
+    await asyncio.to_thread(index_result, task_id, file_name, cached_result)
+    metrics.TASKS_TOTAL.inc(extractor_type=extractor_type.value, status="cached")
+    return True
 
 async def process_document(task_id: str):
     """Process document in background"""
-    if task_id not in extraction_tasks:
+    task = task_store.get(task_id, include_result=False)
+    if task is None or task["status"] not in ACTIVE_STATUSES:
+        # Deleted or cancelled while it was queued
         return
-    
-    task = extraction_tasks[task_id]
-    extraction_app = DataExtractionApp()
+    extractor_label = ExtractorType(task["extractor_type"]).value
     
     try:
         # Update status
-        task["status"] = ProcessingStatus.PROCESSING
-        extraction_tasks[task_id] = task
+        task_store.update(task_id, status=ProcessingStatus.PROCESSING)
         
-        # Process document
-        result = extraction_app.extract(
+        # Process document on the extraction executor
+        result = await extraction_executor.submit(
             task["file_path"], 
-            extractor_type=task["extractor_type"]
+            extractor_type=task["extractor_type"],
+            options=task.get("options"),
+            task_id=task_id,
+            timeout=config.TASK_TIMEOUT_SECONDS,
+            page_timeout=config.PAGE_TIMEOUT_SECONDS
         )
         
         # Update task with results
-        task["status"] = ProcessingStatus.COMPLETED
-        task["result"] = result
-        extraction_tasks[task_id] = task
+        with metrics.STAGE_SECONDS.time(stage="store", extractor_type=extractor_label):
+            await asyncio.to_thread(
+                save_result, task_id, result, extraction_executor.publishes_progress
+            )
+        
+        with metrics.STAGE_SECONDS.time(stage="cache", extractor_type=extractor_label):
+            await asyncio.to_thread(result_cache.put, task["cache_key"], result)
+        
+        # Make the document searchable
+        with metrics.STAGE_SECONDS.time(stage="index", extractor_type=extractor_label):
+            await asyncio.to_thread(index_result, task_id, task["file_name"], result)
+        
+        metrics.TASKS_TOTAL.inc(extractor_type=extractor_label, status="completed")
+        metrics.BYTES_PROCESSED_TOTAL.inc(task.get("file_size", 0), extractor_type=extractor_label)
+        metrics.PAGES_PROCESSED_TOTAL.inc(result.get("page_count", 1), extractor_type=extractor_label)
+        
+    except ExtractionTimedOut as e:
+        task_store.update(task_id, status=ProcessingStatus.TIMED_OUT, error=str(e))
+        metrics.TASKS_TOTAL.inc(extractor_type=extractor_label, status="timed_out")
+        
+    except ExtractionCancelled as e:
+        # A deleted task has nothing left to update
+        task_store.update(task_id, status=ProcessingStatus.CANCELLED, error=str(e))
+        metrics.TASKS_TOTAL.inc(extractor_type=extractor_label, status="cancelled")
         
     except Exception as e:
         # Update task with error
-        task["status"] = ProcessingStatus.FAILED
-        task["error"] = str(e)
-        extraction_tasks[task_id] = task
+        task_store.update(task_id, status=ProcessingStatus.FAILED, error=str(e))
+        metrics.TASKS_TOTAL.inc(extractor_type=extractor_label, status="failed")
+
+def unpack_archive(archive, archive_format: str, batch_id: str) -> tuple:
+    """
+    Save the supported members of an uploaded archive as individual upload files
+    
+    Args:
+        archive: The uploaded archive
+        archive_format: "zip" or "tar", as recognized by sniff_archive
+        batch_id: ID of the batch the members belong to
+
+    Returns:
+        Tuple of (saved members, skipped members); saved members are
+        (task_id, file_name, file_path, file_size, file_hash, extractor_type)
+    """
+    saved, skipped = [], []
+    try:
+        members = iter_archive_members(
+            archive.file, archive_format, max_unpacked_bytes=config.ARCHIVE_MAX_UNPACKED_BYTES
+        )
+        for member_name, declared_size, member in members:
+            file_name = os.path.basename(member_name)
+            head = member.read(SNIFF_BYTES)
+            try:
+                extractor_type, stored_name = detect_upload_type(file_name, head)
+            except UnsupportedContentError as e:
+                skipped.append({"file_name": member_name, "reason": f"Unsupported file content: {str(e)}"})
+                continue
+            max_bytes = config.MAX_UPLOAD_BYTES.get(extractor_type.value)
+            if max_bytes is not None and declared_size > max_bytes:
+                # Skip it without decompressing the rest of it
+                skipped.append({"file_name": member_name, "reason": str(UploadTooLargeError(max_bytes))})
+                continue
+            if len(saved) >= config.BATCH_MAX_FILES:
+                raise UploadTooLargeError(config.BATCH_MAX_FILES)
+            
+            task_id = str(uuid.uuid4())
+            file_path = os.path.join(UPLOAD_DIR, f"{task_id}_{stored_name}")
+            try:
+                with metrics.STAGE_SECONDS.time(stage="upload", extractor_type=extractor_type.value):
+                    file_size, file_hash = save_stream(member, file_path, max_bytes=max_bytes, head=head)
+            except UploadTooLargeError as e:
+                skipped.append({"file_name": member_name, "reason": str(e)})
+                continue
+            saved.append((task_id, member_name, file_path, file_size, file_hash, extractor_type))
+    except Exception:
+        # Don't leave the members of a rejected archive behind
+        for member in saved:
+            if os.path.exists(member[2]):
+                os.remove(member[2])
+        raise
+    
+    logger.info(f"Unpacked {len(saved)} documents from {archive.filename} for batch {batch_id}")
+    return saved, skipped
+
+def summarize_batch(batch: dict) -> BatchProgress:
+    """Aggregate the status and page progress of a batch's documents"""
+    progress = BatchProgress(total=len(batch["task_ids"]))
+    for task_id in batch["task_ids"]:
+        task = task_store.get(task_id, include_result=False)
+        if task is None:
+            continue
+        status = ProcessingStatus(task["status"]).value
+        setattr(progress, status, getattr(progress, status) + 1)
+        progress.pages_done += task.get("pages_done", 0)
+        progress.page_count += task.get("page_count") or 0
+    return progress
+
+async def process_batch(batch_id: str, jobs: List[tuple], priority: JobPriority):
+    """Feed the documents of a batch to the scheduler, then mark the batch finished"""
+    semaphore = asyncio.Semaphore(max(1, config.BATCH_CONCURRENCY))
+    
+    async def process(task_id: str, extractor_type: ExtractorType):
+        # Waits for room in the queue instead of being rejected
+        async with semaphore:
+            await scheduler.run(task_id, extractor_type, functools.partial(process_document, task_id), priority)
+    
+    await asyncio.gather(*(process(task_id, extractor_type) for task_id, extractor_type in jobs))
+    
+    batch = await asyncio.to_thread(task_store.get, batch_id, include_result=False)
+    if batch is None or batch["status"] == ProcessingStatus.CANCELLED:
+        return
+    progress = await asyncio.to_thread(summarize_batch, batch)
+    status = ProcessingStatus.FAILED if progress.total and progress.failed == progress.total else ProcessingStatus.COMPLETED
+    task_store.update(batch_id, status=status)
+
+@app.post("/upload/batch", response_model=BatchResponse)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    options: Optional[str] = Form(None),
+    priority: JobPriority = Form(JobPriority.BULK),
+    background_tasks: BackgroundTasks = None
+):
+    """
+    Upload several documents, or one ZIP/TAR archive of documents, as a batch
+
+    Every document becomes its own task under a parent batch task, which reports
+    aggregate progress; results are downloaded as JSONL from /batches/{id}/results.
+    Documents run at "bulk" priority unless requested otherwise.
+    """
+    request = parse_extraction_request(options)
+    batch_id = str(uuid.uuid4())
+    skipped = []
+    
+    # A batch only holds BATCH_CONCURRENCY queue slots at a time, but it needs one to start
+    try:
+        scheduler.check_capacity()
+    except SchedulerQueueFullError as e:
+        raise queue_full(e, "batch")
+    
+    # A single archive is recognized by its content, whatever it's named
+    archive_format = None
+    if len(files) == 1:
+        archive_format = sniff_archive(await files[0].read(SNIFF_BYTES))
+        await files[0].seek(0)
+    
+    if archive_format:
+        archive = files[0]
+        archive_limit = config.MAX_UPLOAD_BYTES["archive"]
+        if archive.size is not None and archive.size > archive_limit:
+            raise HTTPException(status_code=413, detail=str(UploadTooLargeError(archive_limit)))
+        
+        # Members are decompressed one at a time from the received archive
+        try:
+            documents, skipped = await asyncio.to_thread(unpack_archive, archive, archive_format, batch_id)
+        except ArchiveTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UploadTooLargeError:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {config.BATCH_MAX_FILES} documents")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid archive: {str(e)}")
+    else:
+        if len(files) > config.BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {config.BATCH_MAX_FILES} documents")
+        
+        documents = []
+        for file in files:
+            head = await file.read(SNIFF_BYTES)
+            try:
+                extractor_type, stored_name = detect_upload_type(file.filename, head)
+            except UnsupportedContentError as e:
+                skipped.append({"file_name": file.filename, "reason": f"Unsupported file content: {str(e)}"})
+                continue
+            
+            task_id = str(uuid.uuid4())
+            file_path = os.path.join(UPLOAD_DIR, f"{task_id}_{stored_name}")
+            try:
+                with metrics.STAGE_SECONDS.time(stage="upload", extractor_type=extractor_type.value):
+                    file_size, file_hash = await save_upload(
+                        file, file_path, max_bytes=config.MAX_UPLOAD_BYTES.get(extractor_type.value), head=head
+                    )
+            except UploadTooLargeError as e:
+                skipped.append({"file_name": file.filename, "reason": str(e)})
+                continue
+            documents.append((task_id, file.filename, file_path, file_size, file_hash, extractor_type))
+    
+    # Create the documents' tasks; cached ones complete immediately
+    task_ids, pending_jobs = [], []
+    for task_id, file_name, file_path, file_size, file_hash, extractor_type in documents:
+        cached = await create_task(
+            task_id, file_name, file_path, file_size, file_hash, extractor_type, request.options, batch_id=batch_id
+        )
+        task_ids.append(task_id)
+        if not cached:
+            pending_jobs.append((task_id, extractor_type))
+    
+    status = ProcessingStatus.PROCESSING if pending_jobs else ProcessingStatus.COMPLETED
+    task_store.create(batch_id, {
+        "status": status,
+        "kind": "batch",
+        "file_name": files[0].filename if len(files) == 1 else None,
+        "task_ids": task_ids,
+        "skipped": skipped,
+        "options": request.options,
+        "owner": process_owner(),
+        "result": None,
+        "error": None
+    })
+    
+    if pending_jobs:
+        if background_tasks:
+            background_tasks.add_task(process_batch, batch_id, pending_jobs, priority)
+        else:
+            await process_batch(batch_id, pending_jobs, priority)
+    
+    return BatchResponse(
+        batch_id=batch_id,
+        status=status,
+        message=f"{len(task_ids)} documents queued for processing",
+        task_ids=task_ids,
+        skipped=skipped
+    )
+
+async def get_batch(batch_id: str) -> dict:
+    """Load a batch task, raising a 404 if it doesn't exist"""
+    batch = await asyncio.to_thread(task_store.get, batch_id, include_result=False)
+    if batch is None or batch.get("kind") != "batch":
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+@app.get("/batches/{batch_id}", response_model=BatchResponse)
+async def get_batch_status(batch_id: str):
+    """Get the status and aggregate progress of a batch"""
+    batch = await get_batch(batch_id)
+    progress = await asyncio.to_thread(summarize_batch, batch)
+    
+    return BatchResponse(
+        batch_id=batch_id,
+        status=batch["status"],
+        message=f"{progress.total - progress.pending - progress.processing} of {progress.total} documents processed",
+        task_ids=batch["task_ids"],
+        skipped=batch.get("skipped", []),
+        progress=progress
+    )
+
+def batch_result_line(task_id: str, include_content: bool) -> str:
+    """One JSONL record with a batch document's status and, once completed, its result"""
+    task = task_store.get(task_id)
+    if task is None:
+        return json.dumps({"task_id": task_id, "status": None, "error": "Task not found"}) + "\n"
+    
+    record = {
+        "task_id": task_id,
+        "file_name": task.get("file_name"),
+        "status": task["status"],
+        "error": task.get("error")
+    }
+    if task["status"] == ProcessingStatus.COMPLETED:
+        record.update(task.get("result") or {})
+        if task.get("result_file"):
+            for key in SECTION_KEYS:
+                section = read_section(task, key)
+                if section is not None:
+                    record[key] = section
+        if include_content:
+            content_slice = read_content(task_id, task)
+            record["content"] = content_slice[0] if content_slice else ""
+    return json.dumps(record, default=str) + "\n"
+
+@app.get("/batches/{batch_id}/results")
+async def get_batch_results(batch_id: str, content: bool = Query(True)):
+    """Stream the results of a batch's documents as JSONL, one document per line"""
+    batch = await get_batch(batch_id)
+    
+    async def lines():
+        # One document is loaded at a time, however large the batch
+        for task_id in batch["task_ids"]:
+            yield await asyncio.to_thread(batch_result_line, task_id, content)
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{batch_id}.jsonl"'}
+    )
+
+@app.delete("/batches/{batch_id}")
+async def delete_batch(batch_id: str):
+    """Delete a batch, its documents' tasks and their files"""
+    batch = await get_batch(batch_id)
+    for task_id in batch["task_ids"]:
+        task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+        if task is None:
+            continue
+        # Cancel first, while the record still says which worker runs the task
+        cancel_task(task_id, task)
+        await asyncio.to_thread(task_store.delete, task_id)
+        await asyncio.to_thread(remove_task_file, task)
+        await asyncio.to_thread(unindex_task, task_id)
+    task_store.delete(batch_id)
+    
+    return {"message": f"Batch {batch_id} and {len(batch['task_ids'])} tasks deleted"}
 
 @app.get("/status/{task_id}", response_model=ExtractionResponse)
 async def get_status(task_id: str):
-    """Get status of an extraction task"""
-    if task_id not in extraction_tasks:
+    """Get status, progress and sizes of an extraction task (content is served by the page and content endpoints)"""
+    task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    task = extraction_tasks[task_id]
+    if task.get("kind") == "batch":
+        raise HTTPException(status_code=404, detail=f"Task {task_id} is a batch, see /batches/{task_id}")
     
     response = ExtractionResponse(
         task_id=task_id,
         status=task["status"],
-        message=f"Document extraction {task['status'].value}"
+        message=f"Document extraction {task['status'].value}",
+        progress=ExtractionProgress(
+            pages_done=task.get("pages_done", 0),
+            page_count=task.get("page_count")
+        )
     )
     
-    if task["status"] == ProcessingStatus.COMPLETED and task["result"]:
-        response.document = DocumentInfo(
+    if task["status"] == ProcessingStatus.COMPLETED:
+        response.summary = DocumentSummary(
             filename=task["file_name"],
-            content=task["result"]["content"],
-            page_count=task["result"].get("page_count", 1),
-            metadata=task["result"].get("metadata", {})
+            page_count=task.get("page_count", 1),
+            content_length=task.get("content_length", 0),
+            metadata=task.get("metadata", {})
         )
     elif task["status"] == ProcessingStatus.FAILED:
         response.message = f"Processing failed: {task['error']}"
+    elif task["status"] == ProcessingStatus.TIMED_OUT:
+        response.message = f"Processing timed out: {task['error']}"
     
     return response
 
+@app.get("/tasks/{task_id}/pages/{page_number}", response_model=DocumentInfo)
+async def get_page(task_id: str, page_number: int):
+    """Get a single extracted page (1-based); pages are available while the task is still processing"""
+    task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    page_count = task.get("page_count")
+    if page_number < 1 or (page_count is not None and page_number > page_count):
+        raise HTTPException(status_code=404, detail=f"Page {page_number} out of range")
+    
+    pages = await asyncio.to_thread(read_pages, task_id, task, page_number - 1, page_number)
+    if not pages:
+        raise HTTPException(status_code=404, detail=f"Page {page_number} has not been extracted yet")
+    
+    return DocumentInfo(
+        filename=task["file_name"],
+        content=pages[0][1],
+        page_count=page_count or 1,
+        metadata=task.get("metadata", {}),
+        current_page=page_number
+    )
+
+@app.get("/tasks/{task_id}/content", response_model=ContentSlice)
+async def get_content(
+    task_id: str,
+    offset: int = Query(0, ge=0),
+    length: int = Query(1024 * 1024, ge=1, le=16 * 1024 * 1024)
+):
+    """Get a character range of a completed task's content"""
+    task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] != ProcessingStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Document extraction {task['status'].value}")
+    
+    content_slice = await asyncio.to_thread(read_content, task_id, task, offset, length)
+    if content_slice is None:
+        raise HTTPException(status_code=404, detail="Task has no content")
+    
+    content, total_length = content_slice
+    return ContentSlice(offset=offset, length=len(content), total_length=total_length, content=content)
+
+# Pages read from the task store per query while chunking
+CHUNK_PAGE_BATCH = 32
+
+def iter_task_pages(task_id: str, task: dict, page_count: int):
+    """Yield (page number, text) of a task, reading its pages a batch at a time"""
+    for start in range(0, page_count, CHUNK_PAGE_BATCH):
+        yield from read_pages(task_id, task, start, start + CHUNK_PAGE_BATCH)
+
+@app.get("/tasks/{task_id}/chunks")
+async def get_chunks(
+    task_id: str,
+    size: int = Query(1000, ge=1, le=1_000_000),
+    overlap: int = Query(0, ge=0),
+    unit: str = Query("chars"),
+    per_page: bool = Query(False)
+):
+    """
+    Stream a completed task's content as NDJSON chunks of at most size characters or tokens
+
+    Chunks are produced while pages are read from the task store, so consumers can
+    start on the first chunks right away. With per_page, chunks don't cross page
+    boundaries and carry their (1-based) page number.
+    """
+    if unit not in CHUNK_UNITS:
+        raise HTTPException(status_code=400, detail=f"Unsupported chunk unit: {unit}")
+    if overlap >= size:
+        raise HTTPException(status_code=400, detail="overlap must be smaller than size")
+    
+    task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] != ProcessingStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Document extraction {task['status'].value}")
+    
+    page_count = task.get("page_count") or 0
+    measure = len if unit == "chars" else count_tokens
+    
+    def lines():
+        # A sync generator, so Starlette runs the store reads and chunking off the event loop
+        has_pages = bool(read_pages(task_id, task, 0, 1))
+        if not has_pages:
+            content_slice = read_content(task_id, task)
+            blocks = [(None, content_slice[0] if content_slice else "")]
+        elif per_page:
+            blocks = iter_task_pages(task_id, task, page_count)
+        else:
+            blocks = [(None, (text for _, text in iter_task_pages(task_id, task, page_count)))]
+        
+        index = 0
+        for page_num, text in blocks:
+            for chunk in iter_chunks(text, chunk_size=size, overlap=overlap, unit=unit):
+                record = {"index": index, "size": measure(chunk), "text": chunk}
+                if page_num is not None:
+                    record["page"] = page_num + 1
+                yield json.dumps(record) + "\n"
+                index += 1
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def get_structured_data(task_id: str) -> dict:
+    """Load the structured data of a completed task, raising HTTP errors otherwise"""
+    task = await asyncio.to_thread(task_store.get, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] != ProcessingStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Document extraction {task['status'].value}")
+    
+    structured_data = await asyncio.to_thread(read_section, task, "structured_data")
+    if not structured_data:
+        raise HTTPException(status_code=404, detail="Task has no structured data")
+    return structured_data
+
+@app.get("/tasks/{task_id}/tables")
+async def list_tables(task_id: str):
+    """List the tables (spreadsheet sheets) extracted from a document"""
+    structured_data = await get_structured_data(task_id)
+    
+    return {
+        "task_id": task_id,
+        "tables": [
+            {
+                "index": index,
+                "name": sheet["name"],
+                "columns": sheet["columns"],
+                "types": sheet["types"],
+                "row_count": sheet["row_count"]
+            }
+            for index, sheet in enumerate(structured_data.get("sheets", []))
+        ]
+    }
+
+@app.get("/tasks/{task_id}/tables/{table_index}")
+async def get_table(task_id: str, table_index: int, format: str = Query("json")):
+    """Get one extracted table in columnar form, as JSON, an Arrow IPC stream or Parquet"""
+    if format not in TABLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported table format: {format}")
+    
+    structured_data = await get_structured_data(task_id)
+    sheets = structured_data.get("sheets", [])
+    if table_index < 0 or table_index >= len(sheets):
+        raise HTTPException(status_code=404, detail=f"Table {table_index} not found")
+    
+    sheet = sheets[table_index]
+    if format == "json":
+        return sheet
+    
+    if not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow/Parquet output requires pyarrow")
+    
+    content = await asyncio.to_thread(columnar_to_bytes, sheet, format)
+    media_type = TABLE_MEDIA_TYPES[format]
+    extension = "arrows" if format == "arrow" else "parquet"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{task_id}_{table_index}.{extension}"'}
+    )
+
+@app.get("/tasks/{task_id}/layout")
+async def get_layout(task_id: str, table: Optional[str] = Query(None), format: str = Query("json")):
+    """
+    Get the word boxes, lines and paragraphs of an image extracted with the "layout" option
+
+    Without a table, all tables are returned as columnar JSON; a single table
+    (words, lines or paragraphs) can also be downloaded as Arrow IPC or Parquet.
+    """
+    if format not in TABLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported table format: {format}")
+    if table is not None and table not in LAYOUT_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unsupported layout table: {table}")
+    
+    structured_data = await get_structured_data(task_id)
+    layout = structured_data.get("layout")
+    if layout is None:
+        raise HTTPException(status_code=404, detail='Task has no layout; extract it with the "layout" option')
+    
+    if table is None:
+        if format != "json":
+            raise HTTPException(status_code=400, detail="Choose a table to download as Arrow or Parquet")
+        return layout
+    if format == "json":
+        return layout[table]
+    
+    if not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow/Parquet output requires pyarrow")
+    
+    content = await asyncio.to_thread(columnar_to_bytes, layout[table], format)
+    media_type = TABLE_MEDIA_TYPES[format]
+    extension = "arrows" if format == "arrow" else "parquet"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{task_id}_{table}.{extension}"'}
+    )
+
+@app.get("/extractors")
+async def get_extractors():
+    """Supported formats, plus startup time, memory and extractor load costs of a worker"""
+    return {
+        "formats": extractor_registry.supported_formats(),
+        "executor": {
+            "mode": extraction_executor.mode,
+            "workers": extraction_executor.max_workers,
+            "prewarm": [extractor_type.value for extractor_type in extraction_executor.prewarm]
+        },
+        "worker": await extraction_executor.get_worker_stats()
+    }
+
+@app.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """Get queued and running extraction jobs by priority class and extractor type"""
+    return scheduler.get_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Stage timings, task counters and queue gauges in the Prometheus text format"""
+    return Response(content=await asyncio.to_thread(metrics.REGISTRY.render), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="Search terms; every term must occur"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    hits: int = Query(3, ge=1, le=20, description="Matching pages returned per task"),
+    mode: str = Query("terms", description="\"terms\", or \"fts\" for raw FTS5 query syntax")
+):
+    """
+    Find completed tasks whose content matches a query, ranked by relevance
+
+    Each result lists the best-matching pages (1-based) with a snippet in which
+    the matched terms are wrapped in [brackets].
+    """
+    if search_index is None:
+        raise HTTPException(status_code=501, detail="Full-text search is disabled")
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported search mode. Use one of: {', '.join(SEARCH_MODES)}")
+    
+    start = time.perf_counter()
+    try:
+        found = await asyncio.to_thread(search_index.search, q, limit, offset, hits, mode)
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return SearchResponse(query=q, took_ms=round((time.perf_counter() - start) * 1000, 3), **found)
+
+@app.get("/search/stats")
+async def get_search_stats():
+    """Get the number of documents and pages in the search index"""
+    if search_index is None:
+        raise HTTPException(status_code=501, detail="Full-text search is disabled")
+    return await asyncio.to_thread(search_index.get_stats)
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters and sizes of the extraction result cache"""
+    return result_cache.get_stats()
+
+@app.post("/tasks/{task_id}/cancel", response_model=ExtractionResponse)
+async def cancel_extraction(task_id: str):
+    """
+    Cancel a queued or running extraction; the task is kept with status "cancelled"
+
+    A running extraction stops at its next page, sheet or OCR tile; one that
+    doesn't stop within CANCEL_GRACE_SECONDS has its worker process killed.
+    """
+    task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+    if task is None or task.get("kind") == "batch":
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] not in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Document extraction already {task['status'].value}")
+    
+    task_store.update(task_id, status=ProcessingStatus.CANCELLED, error="Cancelled by request")
+    cancel_task(task_id, task)
+    
+    return ExtractionResponse(
+        task_id=task_id,
+        status=ProcessingStatus.CANCELLED,
+        message="Document extraction cancelled"
+    )
+
+@app.post("/batches/{batch_id}/cancel", response_model=BatchResponse)
+async def cancel_batch(batch_id: str):
+    """Cancel every queued or running document of a batch; finished documents keep their results"""
+    batch = await get_batch(batch_id)
+    cancelled = 0
+    for task_id in batch["task_ids"]:
+        task = await asyncio.to_thread(task_store.get, task_id, include_result=False)
+        if task is None or task["status"] not in ACTIVE_STATUSES:
+            continue
+        task_store.update(task_id, status=ProcessingStatus.CANCELLED, error="Batch cancelled by request")
+        cancel_task(task_id, task)
+        cancelled += 1
+    task_store.update(batch_id, status=ProcessingStatus.CANCELLED)
+    
+    progress = await asyncio.to_thread(summarize_batch, batch)
+    return BatchResponse(
+        batch_id=batch_id,
+        status=ProcessingStatus.CANCELLED,
+        message=f"{cancelled} documents cancelled",
+        task_ids=batch["task_ids"],
+        skipped=batch.get("skipped", []),
+        progress=progress
+    )
+
 @app.delete("/tasks/{task_id}")
 async def delete_task(task_id: str):
-    """Delete a task and its associated files"""
-    if task_id not in extraction_tasks:
+    """Delete a task and its associated files, stopping its extraction if it is still running"""
+    task = task_store.get(task_id, include_result=False)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Remove file if it exists
-    task = extraction_tasks[task_id]
-    if "file_path" in task and os.path.exists(task["file_path"]):
-        os.remove(task["file_path"])
+    # Cancel first, while the record still says which worker runs the task
+    cancel_task(task_id, task)
+    task_store.delete(task_id)
     
-    # Remove task from memory
-    del extraction_tasks[task_id]
+    # Remove file if it exists
+    remove_task_file(task)
+    await asyncio.to_thread(unindex_task, task_id)
     
     return {"message": f"Task {task_id} and associated files deleted"}
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     uvicorn.run("extractor.backend.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
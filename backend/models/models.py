@@ -16,6 +16,14 @@ class ProcessingStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+class JobPriority(str, Enum):
+    """Scheduling class of an extraction job"""
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
 
 
 class DocumentInfo(BaseModel):
@@ -28,18 +36,88 @@ class DocumentInfo(BaseModel):
     structured_data: Optional[Dict[str, Any]] = None
 
 
+class DocumentSummary(BaseModel):
+    """Sizes and metadata of an extracted document, without its content"""
+    filename: str
+    page_count: int = 1
+    content_length: int = 0
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ContentSlice(BaseModel):
+    """A character range of an extracted document's content"""
+    offset: int
+    length: int
+    total_length: int
+    content: str
+
+
+class SearchHit(BaseModel):
+    """A page matching a search query"""
+    page: int
+    score: float
+    snippet: str
+
+
+class SearchResult(BaseModel):
+    """A task matching a search query, with its best-matching pages"""
+    task_id: str
+    file_name: Optional[str] = None
+    score: float
+    hits: List[SearchHit] = Field(default_factory=list)
+
+
+class SearchResponse(BaseModel):
+    """Ranked tasks matching a search query"""
+    query: str
+    results: List[SearchResult] = Field(default_factory=list)
+    has_more: bool = False
+    took_ms: float
+
+
 class ExtractionRequest(BaseModel):
     """Request to extract content from a document"""
     extractor_type: Optional[ExtractorType] = None
     options: Dict[str, Any] = Field(default_factory=dict)
 
 
+class ExtractionProgress(BaseModel):
+    """Progress of a document extraction, counted in pages (sheets for workbooks)"""
+    pages_done: int = 0
+    page_count: Optional[int] = None
+
+
 class ExtractionResponse(BaseModel):
     """Response with extraction results"""
     task_id: str
     status: ProcessingStatus
     message: str
     document: Optional[DocumentInfo] = None
+    summary: Optional[DocumentSummary] = None
+    progress: Optional[ExtractionProgress] = None
+
+
+class BatchProgress(BaseModel):
+    """Aggregate progress of the documents in a batch"""
+    total: int = 0
+    pending: int = 0
+    processing: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    timed_out: int = 0
+    pages_done: int = 0
+    page_count: int = 0
+
+
+class BatchResponse(BaseModel):
+    """Response for a batch upload and its status"""
+    batch_id: str
+    status: ProcessingStatus
+    message: str
+    task_ids: List[str] = Field(default_factory=list)
+    skipped: List[Dict[str, str]] = Field(default_factory=list)
+    progress: Optional[BatchProgress] = None
 
 
 class ExtractionResult(BaseModel):
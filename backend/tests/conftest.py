@@ -0,0 +1,89 @@
+import os
+import sys
+import types
+from typing import List, Optional
+
+import pytest
+
+# The backend is imported as extractor.backend (the checkout is the "extractor"
+# package), so register the checkout under that name when it's cloned elsewhere
+_CHECKOUT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "extractor" not in sys.modules:
+    _package = types.ModuleType("extractor")
+    _package.__path__ = [_CHECKOUT]
+    sys.modules["extractor"] = _package
+
+
+@pytest.fixture
+def write_file(tmp_path):
+    """Write bytes to a file under tmp_path and return its path"""
+    def write(name: str, data: bytes) -> str:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+def build_pdf(pages: int, texts: Optional[List[str]] = None) -> bytes:
+    """A minimal PDF whose page n (1-based) reads: Page n hello world, or texts[n - 1] when given"""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(pages))}] /Count {pages} >>",
+    ]
+    font = 3 + 2 * pages
+    for i in range(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        text = texts[i] if texts is not None else f"Page {i + 1} hello world"
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+@pytest.fixture
+def pdf_file(write_file):
+    """Write a generated PDF with the given number of pages and return its path"""
+    return lambda pages, name="doc.pdf", texts=None: write_file(name, build_pdf(pages, texts))
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """The API module, configured to keep its stores, uploads and results under a temporary directory"""
+    from extractor.backend.core import config
+
+    root = tmp_path_factory.mktemp("api")
+    # Settings are read when the API module is imported (config itself may be imported already)
+    for name, value in {
+        "UPLOAD_DIR": str(root / "uploads"),
+        "RESULT_CACHE_DIR": str(root / "cache"),
+        "RESULT_DIR": str(root / "results"),
+        "TASK_STORE_PATH": str(root / "tasks.db"),
+        "SEARCH_INDEX_PATH": str(root / "search.db"),
+        "EXTRACTION_EXECUTOR": "thread",
+        "EXTRACTION_WORKERS": 2,
+    }.items():
+        setattr(config, name, value)
+    from extractor.backend import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(api):
+    """A TestClient of the API, started once for the test session"""
+    from fastapi.testclient import TestClient
+    with TestClient(api.app) as client:
+        yield client
@@ -0,0 +1,135 @@
+import io
+import uuid
+import zipfile
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from extractor.backend.models.models import ExtractorType, ProcessingStatus
+
+
+def _task(api, status=ProcessingStatus.PROCESSING) -> str:
+    """Record a task in the API's store without uploading or extracting anything"""
+    task_id = str(uuid.uuid4())
+    api.task_store.create(task_id, {
+        "status": status,
+        "file_path": None,
+        "file_name": "report.pdf",
+        "extractor_type": ExtractorType.PDF,
+        "options": {},
+        "result": None,
+        "error": None,
+    })
+    return task_id
+
+
+@pytest.fixture
+def completed_task(api):
+    """A completed task whose three pages are in its result file"""
+    task_id = _task(api)
+    pages = ["alpha", "beta", "gamma"]
+    api.save_result_file(task_id, {"content": "\n\n".join(pages), "pages": pages, "page_count": 3, "metadata": {}})
+    return task_id
+
+
+def _zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_a_batch_archive_is_recognized_whatever_its_name(client):
+    archive = _zip({"a.csv": "a,b\n1,2\n", "b.csv": "x,y\n3,4\n", "notes.bin": b"\x00\x01"})
+    response = client.post("/upload/batch", files=[("files", ("export.dat", archive, "application/octet-stream"))])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["task_ids"]) == 2
+    assert [skipped["file_name"] for skipped in body["skipped"]] == ["notes.bin"]
+
+
+def test_a_workbook_named_like_an_archive_is_a_document(client):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["a", "b"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    response = client.post("/upload/batch", files=[("files", ("book.zip", buffer.getvalue(), "application/zip"))])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["task_ids"]) == 1
+    assert body["skipped"] == []
+
+
+def test_pages_are_readable_while_the_task_is_processing(api, client):
+    task_id = _task(api)
+    api.task_store.add_page(task_id, 0, "first page", 3)
+    api.task_store.add_page(task_id, 2, "third page", 3)
+
+    status = client.get(f"/status/{task_id}").json()
+    assert status["status"] == "processing"
+    assert status["progress"] == {"pages_done": 2, "page_count": 3}
+
+    page = client.get(f"/tasks/{task_id}/pages/3").json()
+    assert page["content"] == "third page"
+    assert page["current_page"] == 3
+    assert page["page_count"] == 3
+
+    response = client.get(f"/tasks/{task_id}/pages/2")
+    assert response.status_code == 404
+    assert "not been extracted yet" in response.json()["detail"]
+    # Content is only served once the whole document is done
+    assert client.get(f"/tasks/{task_id}/content").status_code == 409
+
+
+def test_status_reports_sizes_without_the_content(client, completed_task):
+    status = client.get(f"/status/{completed_task}").json()
+    assert status["status"] == "completed"
+    assert status["summary"]["page_count"] == 3
+    assert status["summary"]["content_length"] == len("alpha\n\nbeta\n\ngamma")
+    assert "content" not in status["summary"]
+
+
+@pytest.mark.parametrize("page_number, content", [(1, "alpha"), (3, "gamma")])
+def test_pages_of_a_completed_task(client, completed_task, page_number, content):
+    page = client.get(f"/tasks/{completed_task}/pages/{page_number}").json()
+    assert page["content"] == content
+    assert page["current_page"] == page_number
+
+
+@pytest.mark.parametrize("page_number", [0, 4, -1])
+def test_pages_out_of_range(client, completed_task, page_number):
+    response = client.get(f"/tasks/{completed_task}/pages/{page_number}")
+    assert response.status_code == 404
+    assert "out of range" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("query, content", [
+    ("", "alpha\n\nbeta\n\ngamma"),
+    ("?offset=7&length=4", "beta"),
+    ("?offset=13", "gamma"),
+    ("?offset=16&length=100", "ma"),
+    ("?offset=100", ""),
+])
+def test_content_ranges(client, completed_task, query, content):
+    body = client.get(f"/tasks/{completed_task}/content{query}").json()
+    assert body["content"] == content
+    assert body["length"] == len(content)
+    assert body["total_length"] == 18
+
+
+@pytest.mark.parametrize("query", ["?offset=-1", "?length=0", "?length=abc"])
+def test_invalid_content_ranges_are_rejected(client, completed_task, query):
+    assert client.get(f"/tasks/{completed_task}/content{query}").status_code == 422
+
+
+@pytest.mark.parametrize("path", ["/status/{}", "/tasks/{}/pages/1", "/tasks/{}/content"])
+def test_unknown_tasks_are_not_found(client, path):
+    response = client.get(path.format(uuid.uuid4()))
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Task not found"
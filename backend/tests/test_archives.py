@@ -0,0 +1,66 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from extractor.backend.utils.archives import ArchiveTooLargeError, iter_archive_members
+
+
+def _zip(members: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def _tar(members: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("build, archive_format", [(_zip, "zip"), (_tar, "tar")])
+def test_members_are_yielded_with_their_declared_size(build, archive_format):
+    archive = build({"a.csv": b"a,b\n1,2\n", "__MACOSX/._a.csv": b"junk", "dir/b.csv": b"x,y\n"})
+    members = [
+        (name, size, stream.read())
+        for name, size, stream in iter_archive_members(archive, archive_format, max_unpacked_bytes=1024)
+    ]
+    assert members == [("a.csv", 8, b"a,b\n1,2\n"), ("dir/b.csv", 4, b"x,y\n")]
+
+
+@pytest.mark.parametrize("build, archive_format", [(_zip, "zip"), (_tar, "tar")])
+def test_a_member_declared_over_the_limit_is_never_opened(build, archive_format):
+    # 64 MB of zeros compresses to a few tens of kilobytes
+    archive = build({"bomb.csv": bytes(64 * 1024 * 1024)})
+    members = iter_archive_members(archive, archive_format, max_unpacked_bytes=1024 * 1024)
+    with pytest.raises(ArchiveTooLargeError):
+        next(members)
+
+
+@pytest.mark.parametrize("build, archive_format", [(_zip, "zip"), (_tar, "tar")])
+def test_the_limit_covers_all_members_together(build, archive_format):
+    archive = build({f"{i}.csv": bytes(400) for i in range(3)})
+    members = iter_archive_members(archive, archive_format, max_unpacked_bytes=1000)
+    for _ in range(2):
+        _, _, stream = next(members)
+        stream.read()
+    with pytest.raises(ArchiveTooLargeError):
+        next(members)
+
+
+def test_bytes_read_are_counted_whatever_the_header_says():
+    archive = _tar({"a.csv": bytes(600)})
+    name, size, stream = next(iter_archive_members(archive, "tar", max_unpacked_bytes=1000))
+    # Pretend an earlier member used up most of the budget without declaring it
+    stream.budget["used"] = 500
+    with pytest.raises(ArchiveTooLargeError):
+        stream.read()
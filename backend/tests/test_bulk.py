@@ -0,0 +1,117 @@
+import io
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from extractor.backend.bulk.manifest import DONE, FAILED, BulkManifest, ManifestMismatchError
+from extractor.backend.bulk.runner import MANIFEST_NAME, run_bulk
+from extractor.backend.bulk.shards import create_shard_writer
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / "source"
+    (source / "sub").mkdir(parents=True)
+    for i in range(3):
+        (source / f"doc{i}.csv").write_text(f"x,y\n{i},{i * 2}\n")
+    # The same content under another name is extracted once
+    (source / "sub" / "copy.csv").write_text("x,y\n0,0\n")
+    (source / "broken.csv").write_bytes(b"\x00\x01 binary junk")
+    return source
+
+
+def _run(source, output, **kwargs):
+    return run_bulk(str(source), str(output), workers=1, progress_interval=60, out=io.StringIO(), **kwargs)
+
+
+def _records(output):
+    records = []
+    for name in sorted(os.listdir(output)):
+        if name.endswith(".jsonl"):
+            with open(output / name, encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_manifest_settings_and_hash_cache(tmp_path):
+    manifest = BulkManifest(str(tmp_path / "out" / MANIFEST_NAME))
+    manifest.check_settings({"options": {}, "format": "jsonl"})
+    manifest.check_settings({"format": "jsonl", "options": {}})
+    with pytest.raises(ManifestMismatchError):
+        manifest.check_settings({"options": {"ocr_mode": "hybrid"}, "format": "jsonl"})
+
+    manifest.remember_hash("a.csv", 10, 1000, "hash-a")
+    assert manifest.cached_hash("a.csv", 10, 1000) == "hash-a"
+    # A changed file is hashed again
+    assert manifest.cached_hash("a.csv", 10, 2000) is None
+    assert manifest.cached_hash("a.csv", 11, 1000) is None
+
+    manifest.mark([{"file_hash": "hash-a", "path": "a.csv"}], FAILED)
+    manifest.mark([{"file_hash": "hash-a", "path": "a.csv", "page_count": 1}], DONE)
+    assert manifest.get_status("hash-a") == DONE
+    assert manifest.get_status("hash-b") is None
+    assert manifest.get_stats() == {DONE: 1}
+    manifest.close()
+
+
+def test_a_rerun_resumes_and_skips_finished_files(tree, tmp_path):
+    output = tmp_path / "out"
+    first = _run(tree, output, shard_documents=2)
+    assert first["documents"] == 3
+    assert first["skipped"] == 1
+    assert first["failed"] == 1
+    assert first["manifest"] == {DONE: 3, FAILED: 1}
+    assert sorted(record["path"] for record in _records(output)) == ["doc0.csv", "doc1.csv", "doc2.csv"]
+
+    second = _run(tree, output, shard_documents=2)
+    assert second["documents"] == 0
+    assert second["skipped"] == 5
+    assert second["shards"] == []
+
+    # Only new content is extracted, and shards of earlier runs are kept
+    (tree / "doc3.csv").write_text("x,y\n3,6\n")
+    third = _run(tree, output, shard_documents=2)
+    assert third["documents"] == 1
+    assert sorted(record["path"] for record in _records(output)) == ["doc0.csv", "doc1.csv", "doc2.csv", "doc3.csv"]
+
+
+def test_failed_files_are_retried_on_request(tree, tmp_path):
+    output = tmp_path / "out"
+    _run(tree, output)
+    (tree / "broken.csv").write_text("x,y\n9,9\n")
+    # A changed file has a new hash, so it runs again anyway
+    assert _run(tree, output)["documents"] == 1
+
+    (tree / "doc0.csv").write_bytes(b"\x00 broken now")
+    assert _run(tree, output)["failed"] == 1
+    skipped = _run(tree, output)
+    assert skipped["failed"] == 0 and skipped["documents"] == 0
+    retried = _run(tree, output, retry_failed=True)
+    assert retried["failed"] == 1
+
+
+def test_unfinished_shards_of_an_interrupted_run_are_dropped(tree, tmp_path):
+    output = tmp_path / "out"
+    output.mkdir()
+    (output / "part-20240101-000000-00000.jsonl.tmp").write_text('{"path": "partial"}\n')
+    _run(tree, output)
+    assert not list(output.glob("*.tmp"))
+    assert "partial" not in [record["path"] for record in _records(output)]
+
+
+def test_other_settings_need_a_new_output_directory(tree, tmp_path):
+    output = tmp_path / "out"
+    _run(tree, output)
+    with pytest.raises(ManifestMismatchError):
+        _run(tree, output, include_pages=True)
+
+
+def test_runs_started_in_the_same_second_keep_their_own_shards(tmp_path):
+    for run in range(2):
+        writer = create_shard_writer("jsonl", str(tmp_path))
+        writer.write({"path": f"run{run}"}, {"file_hash": str(run), "path": f"run{run}"})
+        assert len(writer.close()) == 1
+    assert sorted(record["path"] for record in _records(tmp_path)) == ["run0", "run1"]
@@ -0,0 +1,175 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from extractor.backend.core import executor as executor_module
+from extractor.backend.core.cancellation import (
+    CancellationToken, ExtractionCancelled, ExtractionTimedOut, cancellation_scope, check_cancelled
+)
+from extractor.backend.core.data_extraction import DataExtractionApp
+from extractor.backend.core.executor import ExtractionExecutor
+from extractor.backend.core.task_store import InMemoryTaskStore, SQLiteTaskStore
+from extractor.backend.models.models import ExtractorType, ProcessingStatus
+
+pytest.importorskip("pandas")
+
+# Lets a hung extraction thread finish once its test is over
+_release_hung = threading.Event()
+
+
+@pytest.fixture(autouse=True)
+def fresh_worker_state(monkeypatch):
+    """Inline and thread executors share this process's worker globals"""
+    monkeypatch.setattr(executor_module, "_worker_app", None)
+    monkeypatch.setattr(executor_module, "_worker_store", None)
+    monkeypatch.setattr(executor_module, "WATCHDOG_INTERVAL_SECONDS", 0.05)
+    _release_hung.clear()
+
+
+def test_check_cancelled_does_nothing_outside_a_scope():
+    check_cancelled()
+
+
+def test_token_polls_the_task_at_most_every_poll_interval():
+    calls = []
+
+    def is_cancelled():
+        calls.append(time.time())
+        return len(calls) > 1
+
+    token = CancellationToken(is_cancelled, poll_interval=60)
+    with cancellation_scope(token):
+        check_cancelled()
+        check_cancelled()
+    assert len(calls) == 1
+
+    token.poll_interval = 0
+    with cancellation_scope(token), pytest.raises(ExtractionCancelled):
+        check_cancelled()
+
+
+def test_token_deadline_and_page_timeout():
+    with pytest.raises(ExtractionTimedOut, match="deadline"):
+        CancellationToken(deadline=time.time() - 1).check()
+
+    token = CancellationToken(page_timeout=0.05)
+    token.check()
+    time.sleep(0.1)
+    with pytest.raises(ExtractionTimedOut, match="page took longer"):
+        token.check()
+
+
+def _create_task(store, task_id, status=ProcessingStatus.PROCESSING):
+    store.create(task_id, {"status": status, "file_path": "", "result": None})
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread"])
+@pytest.mark.parametrize("status", [ProcessingStatus.CANCELLED, None])
+def test_a_task_cancelled_or_deleted_while_queued_never_starts(mode, status, write_file, monkeypatch):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    store = InMemoryTaskStore()
+    if status is not None:
+        _create_task(store, "task", status)
+    started = []
+    monkeypatch.setattr(DataExtractionApp, "extract", lambda *args, **kwargs: started.append(1))
+
+    executor = ExtractionExecutor(mode=mode, task_store=store)
+    try:
+        with pytest.raises(ExtractionCancelled):
+            asyncio.run(executor.submit(path, ExtractorType.EXCEL, task_id="task"))
+    finally:
+        executor.shutdown()
+    assert started == []
+    assert executor.in_flight == 0
+
+
+def test_an_extraction_past_its_deadline_times_out(write_file):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    executor = ExtractionExecutor(mode="inline")
+    with pytest.raises(ExtractionTimedOut):
+        asyncio.run(executor.submit(path, ExtractorType.EXCEL, timeout=1e-9))
+
+
+def _slow_extract(self, *args, **kwargs):
+    """Runs for a while, checking for cancellation like an extractor between pages"""
+    for _ in range(200):
+        check_cancelled()
+        time.sleep(0.01)
+    return {"content": "", "pages": [], "page_count": 0, "metadata": {}}
+
+
+def _hung_extract(self, *args, **kwargs):
+    """Never reaches a cancellation check"""
+    _release_hung.wait(60)
+
+
+def test_cancel_stops_a_thread_extraction_at_its_next_check(write_file, monkeypatch):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    store = InMemoryTaskStore()
+    _create_task(store, "task")
+    monkeypatch.setattr(DataExtractionApp, "extract", _slow_extract)
+    executor = ExtractionExecutor(mode="thread", task_store=store, cancel_grace_seconds=10)
+
+    async def run():
+        submitted = asyncio.ensure_future(executor.submit(path, ExtractorType.EXCEL, task_id="task"))
+        await asyncio.sleep(0.2)
+        store.update("task", status=ProcessingStatus.CANCELLED)
+        assert executor.cancel("task") is True
+        return await submitted
+
+    start = time.time()
+    try:
+        with pytest.raises(ExtractionCancelled):
+            asyncio.run(run())
+    finally:
+        executor.shutdown()
+    # The worker saw the cancellation long before the grace period ran out
+    assert time.time() - start < 2
+    assert executor.cancel("task") is False
+
+
+def test_a_hung_thread_extraction_is_abandoned_after_the_grace_period(write_file, monkeypatch):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    monkeypatch.setattr(DataExtractionApp, "extract", _hung_extract)
+    executor = ExtractionExecutor(mode="thread", cancel_grace_seconds=0)
+
+    start = time.time()
+    with pytest.raises(ExtractionTimedOut):
+        asyncio.run(executor.submit(path, ExtractorType.EXCEL, timeout=0.2))
+    try:
+        assert time.time() - start < 2
+        assert executor.in_flight == 0
+    finally:
+        # The abandoned thread keeps its worker until it returns
+        _release_hung.set()
+        executor.shutdown()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_a_hung_process_worker_is_killed_and_replaced(write_file, tmp_path, monkeypatch):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    _create_task(store, "hung")
+    # Forked workers inherit the patched method
+    monkeypatch.setattr(DataExtractionApp, "extract", _hung_extract)
+    executor = ExtractionExecutor(mode="process", start_method="fork", task_store=store, cancel_grace_seconds=0)
+
+    try:
+        start = time.time()
+        with pytest.raises(ExtractionTimedOut):
+            asyncio.run(executor.submit(path, ExtractorType.EXCEL, task_id="hung", timeout=0.5))
+        assert time.time() - start < 10
+        assert executor.workers_killed == 1
+
+        monkeypatch.undo()
+        monkeypatch.setattr(executor_module, "WATCHDOG_INTERVAL_SECONDS", 0.05)
+        # The replacement pool was forked before the undo, so give it a fresh one
+        executor.shutdown()
+        result = asyncio.run(executor.submit(path, ExtractorType.EXCEL))
+        assert result["metadata"]["rows"] == 1
+    finally:
+        executor.shutdown()
+        store.close()
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+openpyxl = pytest.importorskip("openpyxl")
+
+from extractor.backend.extractors.excel_extractor import ExcelExtractor
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """A workbook with gaps in mixed, numeric and text columns, "NA" text, repeated headers and blank rows"""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Data"
+    for row in [
+        ["id", "mixed", "num", "txt", "empty", "when", "a", "a", None],
+        [1, "x", 1.5, "foo", None, datetime.datetime(2024, 1, 1), 1, 2, None],
+        [2, None, None, None, None, None, None, None, "late"],
+        [3, 5, 2, "NA", None, datetime.datetime(2024, 1, 2), 3, None, None],
+        [None] * 9,
+        [4, True, 3, "bar", None, None, 5, 6, None],
+        [None] * 9,
+    ]:
+        sheet.append(row)
+    workbook.create_sheet("Blank")
+    # read_excel takes a blank first row as the header too
+    offset = workbook.create_sheet("Offset")
+    offset.append([None])
+    offset.append(["name", "value"])
+    offset.append(["x", 1])
+    path = tmp_path / "book.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def test_streaming_and_pandas_modes_give_the_same_result(workbook):
+    extractor = ExcelExtractor()
+    streamed = extractor.extract(workbook, options={"excel_mode": "streaming"})
+    parsed = extractor.extract(workbook, options={"excel_mode": "pandas"})
+
+    assert streamed["structured_data"] == parsed["structured_data"]
+    assert streamed["pages"] == parsed["pages"]
+    mixed = streamed["structured_data"]["sheets"][0]
+    assert mixed["values"][mixed["columns"].index("mixed")] == ["x", None, 5, None, True]
+    assert mixed["values"][mixed["columns"].index("txt")] == ["foo", None, None, None, "bar"]
+
+
+@pytest.mark.parametrize("sheet_name", ["Data", "Offset"])
+def test_streamed_sheet_matches_read_excel_frame(workbook, sheet_name):
+    workbook_file = openpyxl.load_workbook(workbook, read_only=True, data_only=True)
+    try:
+        frame = ExcelExtractor()._read_worksheet(workbook_file[sheet_name])
+    finally:
+        workbook_file.close()
+    pd.testing.assert_frame_equal(frame, pd.read_excel(workbook, sheet_name=sheet_name))
+
+
+def test_progress_is_published_per_sheet(workbook):
+    published = []
+    ExcelExtractor().extract(workbook, progress_callback=lambda i, count, text: published.append((i, count)))
+    assert published == [(0, 3), (1, 3), (2, 3)]
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t", "|"])
+def test_csv_is_read_with_its_sniffed_delimiter(write_file, delimiter):
+    rows = [["name", "amount", "note"], ["a", "1,5", "x"], ["b", "2", "y"]]
+    quoted = [[f'"{value}"' if "," in value else value for value in row] for row in rows]
+    path = write_file("table.csv", "\n".join(delimiter.join(row) for row in quoted).encode())
+
+    result = ExcelExtractor().extract(path)
+    assert result["metadata"] == {"format": "CSV", "rows": 2, "columns": 3}
+    assert result["structured_data"]["sheets"][0]["columns"] == ["name", "amount", "note"]
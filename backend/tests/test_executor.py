@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from extractor.backend.core.executor import ExtractionExecutor
+from extractor.backend.models.models import ExtractorType
+
+pytest.importorskip("pandas")
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_extracts_on_each_executor_mode(mode, write_file):
+    path = write_file("data.csv", b"x,y\n1,2\n3,4\n")
+    executor = ExtractionExecutor(mode=mode, max_workers=1)
+    try:
+        result = asyncio.run(executor.submit(path, extractor_type=ExtractorType.EXCEL))
+    finally:
+        executor.shutdown()
+
+    assert result["page_count"] == 1
+    assert result["metadata"]["rows"] == 2
+    assert executor.in_flight == 0
+
+
+def test_extractor_type_defaults_to_the_file_content(write_file):
+    path = write_file("data.csv", b"x,y\n1,2\n")
+    executor = ExtractionExecutor(mode="inline")
+    result = asyncio.run(executor.submit(path))
+    assert result["metadata"]["format"] == "CSV"
+
+
+def test_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        ExtractionExecutor(mode="fibers")
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from extractor.backend.utils.helpers import chunk_text, count_tokens, iter_chunks
+
+
+def _words(chunks):
+    return " ".join(chunks).split()
+
+
+def test_paragraphs_are_kept_together_where_they_fit():
+    text = "first paragraph here\n\nsecond one\n\nthird paragraph is here"
+    assert list(iter_chunks(text, chunk_size=35)) == [
+        "first paragraph here\n\nsecond one",
+        "third paragraph is here",
+    ]
+
+
+def test_chunks_respect_the_budget_and_keep_every_word():
+    text = "\n\n".join(" ".join(f"w{p}_{i}" for i in range(p * 7 % 40 + 1)) for p in range(30))
+    chunks = list(iter_chunks(text, chunk_size=50))
+    assert all(0 < len(chunk) <= 50 for chunk in chunks)
+    assert _words(chunks) == text.split()
+
+
+def test_a_word_longer_than_a_chunk_is_split():
+    chunks = list(iter_chunks("ab " + "x" * 25 + " cd", chunk_size=10))
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == "ab" + "x" * 25 + "cd"
+
+
+def test_overlap_repeats_the_end_of_the_previous_chunk():
+    text = " ".join(f"word{i}" for i in range(40))
+    chunks = list(iter_chunks(text, chunk_size=40, overlap=12))
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        first_word = chunk.split()[0]
+        assert first_word in previous.split()[-3:]
+    # Without the repeated words the text is unchanged
+    seen = []
+    for word in _words(chunks):
+        if word not in seen:
+            seen.append(word)
+    assert seen == text.split()
+
+
+def test_token_budgets():
+    text = "Hello, world! " * 50
+    chunks = list(iter_chunks(text, chunk_size=10, unit="tokens"))
+    assert all(count_tokens(chunk) <= 10 for chunk in chunks)
+    assert _words(chunks) == text.split()
+
+    def measure(piece: str) -> int:
+        return len(piece.split())
+
+    chunks = list(iter_chunks("a b c d e f g", chunk_size=3, unit="tokens", length_function=measure))
+    assert chunks == ["a b c", "d e f", "g"]
+
+
+def test_blocks_are_read_lazily():
+    read = []
+
+    def pages():
+        for number in range(1, 1000):
+            read.append(number)
+            yield f"page {number} " + "text " * 20
+
+    first = next(iter_chunks(pages(), chunk_size=120))
+    assert first.startswith("page 1 ")
+    assert len(read) < 5
+
+
+def test_long_text_is_chunked_in_linear_time():
+    text = "\n\n".join("lorem ipsum dolor sit amet " * 40 for _ in range(2000))
+    start = time.perf_counter()
+    chunks = list(iter_chunks(text, chunk_size=500, overlap=50))
+    assert time.perf_counter() - start < 5
+    assert all(len(chunk) <= 500 for chunk in chunks)
+
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("") == []
+    assert chunk_text("\n\n  \n\n") == []
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"chunk_size": 0},
+    {"chunk_size": 10, "overlap": 10},
+    {"chunk_size": 10, "overlap": -1},
+    {"unit": "words"},
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        list(iter_chunks("text", **kwargs))
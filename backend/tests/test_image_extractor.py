@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+pytest.importorskip("pytesseract")
+from PIL import Image
+
+from extractor.backend.extractors.image_extractor import ImageExtractor
+
+
+class _StubOcrEngine:
+    """Reads each image as its size; the first, widest frame is the slowest"""
+
+    name = "stub"
+
+    def image_to_string(self, image, lang=None):
+        if image.width == 300:
+            time.sleep(0.05)
+        return f"{image.width}x{image.height}"
+
+
+@pytest.fixture
+def tiff_file(tmp_path):
+    path = tmp_path / "scan.tif"
+    frames = [Image.new("L", (width, 100), 255) for width in (300, 200, 100)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    return str(path)
+
+
+def test_multi_frame_tiffs_are_one_page_per_frame_in_order(tiff_file):
+    progress = []
+    result = ImageExtractor(ocr_engine=_StubOcrEngine()).extract(
+        tiff_file,
+        options={"ocr": {"preprocess": False, "workers": 3}},
+        progress_callback=lambda index, count, text: progress.append((index, count))
+    )
+
+    assert result["page_count"] == 3
+    assert result["metadata"]["frames"] == 3
+    assert result["metadata"]["ocr"] == {"engine": "stub", "pages": 3}
+    assert result["pages"] == ["300x100", "200x100", "100x100"]
+    assert result["content"] == "300x100\n\n200x100\n\n100x100"
+    assert sorted(progress) == [(0, 3), (1, 3), (2, 3)]
+
+
+def test_single_frame_images_are_one_page(tmp_path):
+    path = str(tmp_path / "scan.png")
+    Image.new("L", (120, 80), 255).save(path)
+    result = ImageExtractor(ocr_engine=_StubOcrEngine()).extract(path, options={"ocr": {"preprocess": False}})
+
+    assert result["pages"] == ["120x80"]
+    assert result["page_count"] == 1
+    assert "frames" not in result["metadata"]
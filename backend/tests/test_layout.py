@@ -0,0 +1,116 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from extractor.backend.extractors.layout import (
+    LINE_COLUMNS, PARAGRAPH_COLUMNS, WORD_COLUMNS, concat_words, group_layout, layout_blocks,
+    layout_text, layout_to_columnar, words_from_ocr_data
+)
+
+
+def _ocr_data(rows):
+    """image_to_data output from (level, block, paragraph, line, left, top, text) rows"""
+    data = {key: [] for key in ("level", "block_num", "par_num", "line_num", "left", "top", "width", "height", "conf", "text")}
+    for level, block, paragraph, line, left, top, text in rows:
+        data["level"].append(level)
+        data["block_num"].append(block)
+        data["par_num"].append(paragraph)
+        data["line_num"].append(line)
+        data["left"].append(left)
+        data["top"].append(top)
+        data["width"].append(40)
+        data["height"].append(10)
+        data["conf"].append(-1 if level < 5 else 90.0)
+        data["text"].append(text)
+    return data
+
+
+# Two paragraphs in block 1 (two lines, then one), then block 2, whose
+# paragraph and line numbers restart at 1 like tesseract's do
+DATA = _ocr_data([
+    (1, 0, 0, 0, 0, 0, ""),
+    (2, 1, 0, 0, 10, 10, ""),
+    (5, 1, 1, 1, 10, 10, "The"),
+    (5, 1, 1, 1, 60, 10, "quick"),
+    (5, 1, 1, 1, 110, 10, "  "),
+    (5, 1, 1, 2, 10, 30, "brown"),
+    (5, 1, 2, 1, 10, 60, "fox"),
+    (5, 2, 1, 1, 300, 10, "jumps"),
+    (5, 2, 1, 1, 350, 10, "over"),
+])
+
+
+def test_only_non_blank_words_are_kept():
+    words = words_from_ocr_data(DATA, page=2)
+
+    assert words["text"] == ["The", "quick", "brown", "fox", "jumps", "over"]
+    assert words["page"].tolist() == [2] * 6
+    assert words["block"].dtype == np.int32
+    assert words["conf"].dtype == np.float32
+
+
+def test_boxes_are_mapped_back_to_the_source_image():
+    words = words_from_ocr_data(DATA, scale=0.5)
+    assert words["left"].tolist()[:2] == [20, 120]
+    assert words["width"].tolist()[0] == 80
+
+
+def test_words_are_grouped_into_lines_and_paragraphs():
+    layout = group_layout(words_from_ocr_data(DATA))
+    lines, paragraphs = layout["lines"], layout["paragraphs"]
+
+    assert lines["first_word"].tolist() == [0, 2, 3, 4]
+    assert lines["word_count"].tolist() == [2, 1, 1, 2]
+    assert paragraphs["first_line"].tolist() == [0, 2, 3]
+    assert paragraphs["line_count"].tolist() == [2, 1, 1]
+    # The first line's box spans both of its words
+    assert (lines["left"][0], lines["width"][0], lines["height"][0]) == (10, 90, 10)
+    assert layout_text(layout) == "The quick\nbrown\n\nfox\n\njumps over"
+
+
+def test_a_new_block_starts_a_new_line_even_with_the_same_line_numbers():
+    # Both words are paragraph 1, line 1; only the block number tells them apart
+    data = _ocr_data([
+        (5, 1, 1, 1, 10, 10, "left"),
+        (5, 2, 1, 1, 300, 10, "right"),
+    ])
+    layout = group_layout(words_from_ocr_data(data))
+
+    assert layout["lines"]["word_count"].tolist() == [1, 1]
+    assert layout["paragraphs"]["line_count"].tolist() == [1, 1]
+    assert layout_blocks(layout) == ["left", "right"]
+
+
+def test_a_dropped_blank_word_does_not_split_its_line():
+    data = _ocr_data([
+        (5, 1, 1, 1, 10, 10, "one"),
+        (5, 1, 1, 1, 60, 10, ""),
+        (5, 1, 1, 1, 110, 10, "two"),
+    ])
+    assert group_layout(words_from_ocr_data(data))["lines"]["word_count"].tolist() == [2]
+
+
+def test_pages_are_grouped_apart():
+    pages = [words_from_ocr_data(_ocr_data([(5, 1, 1, 1, 10, 10, "same")]), page=page) for page in (1, 2)]
+    layout = group_layout(concat_words(pages))
+
+    assert layout["lines"]["page"].tolist() == [1, 2]
+    assert layout_blocks(layout) == ["same", "same"]
+
+
+def test_columnar_tables_have_one_value_list_per_column():
+    tables = layout_to_columnar(group_layout(words_from_ocr_data(DATA)))
+
+    for name, spec, rows in (("words", WORD_COLUMNS, 6), ("lines", LINE_COLUMNS, 4), ("paragraphs", PARAGRAPH_COLUMNS, 3)):
+        table = tables[name]
+        assert table["columns"] == [column for column, _ in spec]
+        assert table["types"] == [column_type for _, column_type in spec]
+        assert table["row_count"] == rows
+        assert [len(values) for values in table["values"]] == [rows] * len(spec)
+    assert tables["words"]["values"][-1][0] == "The"
+    assert tables["lines"]["values"][LINE_COLUMNS.index(("conf", "float"))] == [90.0] * 4
+
+
+def test_no_words_give_empty_tables():
+    tables = layout_to_columnar(group_layout(concat_words([])))
+    assert {table["row_count"] for table in tables.values()} == {0}
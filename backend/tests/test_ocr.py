@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pytesseract")
+from PIL import Image, ImageDraw
+
+from extractor.backend.core.cancellation import CancellationToken, ExtractionCancelled, cancellation_scope
+from extractor.backend.core.metrics import collect_stage_timings, stage
+from extractor.backend.extractors.ocr import (
+    _estimate_skew, ocr_image, ocr_image_stream, preprocess_image, resolve_ocr_options
+)
+
+
+def _text_lines(angle: float = 0.0) -> "Image.Image":
+    image = Image.new("L", (800, 1000), 255)
+    draw = ImageDraw.Draw(image)
+    for top in range(80, 920, 40):
+        draw.rectangle((60, top, 740, top + 12), fill=0)
+    return image.rotate(angle, resample=Image.BICUBIC, fillcolor=255)
+
+
+@pytest.mark.parametrize("fill", [255, 0, 128])
+def test_uniform_pages_are_not_rotated(fill):
+    page = Image.new("L", (400, 500), fill)
+    assert _estimate_skew(page, 5.0) == 0.0
+
+    options = resolve_ocr_options({"ocr": {"binarize": False}})
+    processed, info = preprocess_image(page, options)
+    assert processed.size == (400, 500)
+    assert "deskew_angle" not in info
+
+
+def test_straight_text_is_not_rotated():
+    assert _estimate_skew(_text_lines(), 5.0) == 0.0
+
+
+def test_skewed_text_is_straightened():
+    assert _estimate_skew(_text_lines(3.0), 5.0) == pytest.approx(-3.0, abs=0.5)
+
+
+def _timed_ocr(image, lang):
+    with stage("tile"):
+        return "text"
+
+
+def test_stream_stages_are_collected_from_page_threads():
+    pages = [(index, _text_lines()) for index in range(4)]
+    with collect_stage_timings() as timings:
+        count = ocr_image_stream(pages, {"ocr": {"binarize": False}}, ocr_fn=_timed_ocr, workers=2)
+    assert count == 4
+    assert {"preprocess", "ocr", "tile"} <= set(timings)
+
+
+def test_tile_threads_share_the_extraction_context():
+    options = resolve_ocr_options({"ocr": {"preprocess": False, "tile_height": 300, "workers": 2}})
+    with collect_stage_timings() as timings:
+        text, info = ocr_image(Image.new("L", (200, 1200), 255), options, ocr_fn=_timed_ocr)
+    assert info["tiles"] > 1
+    assert "tile" in timings
+
+
+def test_page_threads_see_the_cancellation_token():
+    # Only the check between tiles, inside a page thread, finds the task cancelled
+    def is_cancelled():
+        return threading.current_thread().name.startswith("ocr-page")
+
+    pages = [(0, Image.new("L", (200, 1200), 255))]
+    options = {"ocr": {"preprocess": False, "tiles": True, "tile_height": 300}}
+    token = CancellationToken(is_cancelled=is_cancelled, poll_interval=0)
+    with cancellation_scope(token), pytest.raises(ExtractionCancelled):
+        ocr_image_stream(pages, options, ocr_fn=lambda image, lang: "text", workers=2)
+
+
+def test_tile_threads_default_to_the_workers_share_of_the_cores(monkeypatch):
+    from extractor.backend.core import config
+    monkeypatch.setattr(config, "OCR_WORKERS", 2)
+
+    threads = set()
+
+    def record_thread(image, lang):
+        threads.add(threading.current_thread().name)
+        return "text"
+
+    options = resolve_ocr_options({"ocr": {"preprocess": False, "tile_height": 100}})
+    text, info = ocr_image(Image.new("L", (200, 1200), 255), options, ocr_fn=record_thread)
+    assert info["tiles"] > 2
+    assert len(threads) <= 2
+
+
+def test_page_threads_default_to_the_workers_share_of_the_cores(monkeypatch):
+    from extractor.backend.core import config
+    monkeypatch.setattr(config, "OCR_WORKERS", 2)
+
+    threads = set()
+
+    def record_thread(image, lang):
+        threads.add(threading.current_thread().name)
+        return "text"
+
+    pages = [(index, Image.new("L", (200, 200), 255)) for index in range(6)]
+    ocr_image_stream(pages, {"ocr": {"preprocess": False}}, ocr_fn=record_thread)
+    assert 1 <= len(threads) <= 2
@@ -0,0 +1,65 @@
+import types
+
+import pytest
+
+pytest.importorskip("pytesseract")
+
+from extractor.backend.extractors import ocr_engine
+
+
+class _FakeApi:
+    def __init__(self, lang):
+        self.lang = lang
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        pass
+
+
+def _fake_tesserocr(failures: int):
+    """A tesserocr stand-in whose API constructor fails the first `failures` times"""
+    calls = {"count": 0}
+
+    def create(lang):
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+        return _FakeApi(lang)
+
+    return types.SimpleNamespace(tesseract_version=lambda: "tesseract 5.3.0", PyTessBaseAPI=create)
+
+
+def test_failed_api_creation_frees_its_slot(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "tesserocr", _fake_tesserocr(failures=1))
+    engine = ocr_engine.TesserocrEngine(pool_size=1)
+
+    with pytest.raises(RuntimeError):
+        with engine._api("eng"):
+            pass
+    assert engine._created["eng"] == 0
+
+    # The next caller creates a handle instead of blocking on the empty pool
+    with engine._api("eng") as api:
+        assert api.lang == "eng"
+    with engine._api("eng") as again:
+        assert again is api
+    assert engine._created["eng"] == 1
+
+
+def test_pdf_and_image_extractors_share_the_workers_engine(monkeypatch):
+    pytest.importorskip("pypdfium2")
+    from extractor.backend.core import extractor_registry
+    from extractor.backend.models.models import ExtractorType
+
+    created = []
+    monkeypatch.setattr(ocr_engine, "create_ocr_engine", lambda name, pool_size: created.append(pool_size) or object())
+    monkeypatch.setattr(extractor_registry, "_ocr_engine", None)
+    registry = extractor_registry.create_default_registry()
+
+    image_engine = registry.get(ExtractorType.IMAGE).ocr_engine
+    pdf_engine = registry.get(ExtractorType.PDF).ocr_engine
+
+    assert pdf_engine is image_engine
+    assert len(created) == 1
@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from extractor.backend.extractors.pdf_extractor import PDFExtractor, parse_page_range
+
+
+def test_parse_page_range():
+    assert parse_page_range("3", 10) == (2, 3)
+    assert parse_page_range("2-4", 10) == (1, 4)
+    assert parse_page_range("5-", 10) == (4, 10)
+    assert parse_page_range([None, 20], 10) == (0, 10)
+    with pytest.raises(ValueError):
+        parse_page_range("11", 10)
+
+
+def test_parallel_extraction_reuses_one_page_pool(pdf_file):
+    extractor = PDFExtractor(max_workers=2, parallel_min_pages=4)
+    path = pdf_file(12)
+    try:
+        first = extractor.extract(path)
+        pool = extractor._page_pool
+        second = extractor.extract(path, options={"pages": "3-10", "workers": 1})
+        assert extractor._page_pool is pool
+        assert pool._max_workers == 2
+    finally:
+        extractor._page_pool.shutdown()
+
+    assert [page.strip() for page in first["pages"]] == [f"Page {i} hello world" for i in range(1, 13)]
+    assert second["page_count"] == 8
+    assert second["pages"][0].strip() == "Page 3 hello world"
+
+
+def test_workers_option_cannot_exceed_the_page_budget(pdf_file):
+    extractor = PDFExtractor(max_workers=1, parallel_min_pages=4)
+    result = extractor.extract(pdf_file(6), options={"workers": 16})
+    # A budget of one worker extracts in-process, without a pool
+    assert extractor._page_pool is None
+    assert result["page_count"] == 6
+
+
+class _StubOcrEngine:
+    """Numbers the images it OCRs, in the order they arrive"""
+
+    name = "stub"
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_string(self, image, lang=None):
+        self.calls += 1
+        return f"OCR {self.calls}"
+
+
+def _hybrid_extractor(engine):
+    pytest.importorskip("pypdfium2")
+    return PDFExtractor(max_workers=1, ocr_mode="hybrid", min_text_chars=8, ocr_engine_factory=lambda: engine)
+
+
+_HYBRID_OPTIONS = {"ocr": {"preprocess": False, "target_dpi": 36}}
+
+
+def test_hybrid_mode_ocrs_only_pages_with_too_little_text(pdf_file):
+    engine = _StubOcrEngine()
+    texts = ["Page 1 hello world", "", "p. 3", "Page 4 hello world", ""]
+    result = _hybrid_extractor(engine).extract(pdf_file(5, texts=texts), options=_HYBRID_OPTIONS)
+
+    assert result["metadata"]["ocr_pages"] == [2, 3, 5]
+    assert result["metadata"]["ocr"]["engine"] == "stub"
+    assert result["metadata"]["ocr"]["pages"] == 3
+    # OCR'd text takes the place of each scanned page, in page order
+    assert [page.strip() for page in result["pages"]] == [
+        "Page 1 hello world", "OCR 1", "OCR 2", "Page 4 hello world", "OCR 3"
+    ]
+    assert result["page_count"] == 5
+    assert result["content"].split("\n\n")[1:3] == ["OCR 1", "OCR 2"]
+
+
+def test_hybrid_ocr_pages_are_numbered_within_the_document(pdf_file):
+    engine = _StubOcrEngine()
+    texts = ["", "Page 2 hello world", "", "Page 4 hello world"]
+    options = dict(_HYBRID_OPTIONS, pages="2-4")
+    result = _hybrid_extractor(engine).extract(pdf_file(4, texts=texts), options=options)
+
+    assert result["metadata"]["ocr_pages"] == [3]
+    assert [page.strip() for page in result["pages"]] == ["Page 2 hello world", "OCR 1", "Page 4 hello world"]
+
+
+def test_hybrid_mode_leaves_text_documents_to_the_text_layer(pdf_file):
+    engine = _StubOcrEngine()
+    result = _hybrid_extractor(engine).extract(pdf_file(3), options=_HYBRID_OPTIONS)
+
+    assert result["metadata"]["ocr_pages"] == []
+    assert "ocr" not in result["metadata"]
+    assert engine.calls == 0
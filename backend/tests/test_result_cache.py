@@ -0,0 +1,40 @@
+import json
+
+from extractor.backend.core.result_cache import (
+    DISK_EVICT_TO_FRACTION, DiskResultCache, ResultCache, estimate_size, make_cache_key
+)
+
+
+def test_cache_key_ignores_execution_options():
+    base = make_cache_key("abc", "pdf", {"pages": "1-3"})
+    assert make_cache_key("abc", "pdf", {"pages": "1-3", "workers": 8}) == base
+    assert make_cache_key("abc", "pdf", {"pages": "1-4"}) != base
+    assert make_cache_key("abc", "pdf", {"workers": 2}) == make_cache_key("abc", "pdf")
+
+
+def test_memory_tier_is_sized_by_objects_not_json():
+    result = {"values": list(range(1000))}
+    # Each int is a separate object, far larger than its few JSON characters
+    assert estimate_size(result) > 5 * len(json.dumps(result))
+
+    cache = ResultCache(memory_bytes=estimate_size(result) - 1, disk_bytes=0)
+    cache.put("key", result)
+    assert cache.get("key") is None
+
+
+def test_disk_tier_evicts_to_low_water_mark(tmp_path, monkeypatch):
+    cache = DiskResultCache(str(tmp_path), max_bytes=4000)
+    scans = []
+    original = DiskResultCache._iter_entries
+    monkeypatch.setattr(DiskResultCache, "_iter_entries", lambda self: scans.append(1) or original(self))
+
+    for i in range(200):
+        cache.put(f"{i:064x}", json.dumps({"content": "x" * 50, "index": i}).encode())
+        assert cache.total_bytes <= cache.max_bytes
+
+    entry_size = cache.total_bytes / cache.entry_count
+    evicted_per_scan = cache.max_bytes * (1 - DISK_EVICT_TO_FRACTION) / entry_size
+    # Each scan frees room for several puts
+    assert 0 < len(scans) <= 200 / max(1, int(evicted_per_scan)) + 1
+    assert cache.get(f"{199:064x}") is not None
+    assert cache.get(f"{0:064x}") is None
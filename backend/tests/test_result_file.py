@@ -0,0 +1,88 @@
+import pytest
+
+from extractor.backend.core import result_file
+from extractor.backend.core.result_file import ResultFile, ResultFileError, write_result_file
+
+PAGES = ["Page one ünïcode", "", "Page three\nwith two lines", "4", "Page five — the end"]
+
+
+def _ranges(length: int):
+    for offset in range(0, length + 2):
+        for size in (0, 1, 2, 7, 19, length):
+            yield offset, size
+
+
+@pytest.mark.parametrize("separator", ["\n\n", "\n", ""])
+def test_content_joined_from_pages_is_sliced_out_of_them(tmp_path, separator):
+    content = separator.join(PAGES)
+    path = str(tmp_path / "result.bin")
+    summary = write_result_file(path, {"pages": PAGES, "content": content})
+    assert summary["page_count"] == len(PAGES)
+    assert summary["content_length"] == len(content)
+
+    with ResultFile(path) as f:
+        assert f._content is None
+        assert f.get_pages() == list(enumerate(PAGES))
+        for offset, size in _ranges(len(content)):
+            assert f.get_content(offset, size) == (content[offset:offset + size], len(content))
+        assert f.get_content() == (content, len(content))
+
+
+def test_other_content_is_stored_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_file, "CONTENT_BLOCK_CHARS", 8)
+    content = "A summary that isn't the pages joined, spanning blocks ü"
+    path = str(tmp_path / "result.bin")
+    write_result_file(path, {"pages": PAGES, "content": content})
+
+    with ResultFile(path) as f:
+        assert f._content is not None and f._content[0] == 7
+        for offset, size in _ranges(len(content)):
+            assert f.get_content(offset, size) == (content[offset:offset + size], len(content))
+        assert f.get_pages(3) == [(3, "4"), (4, PAGES[4])]
+
+
+def test_page_ranges_are_clamped(tmp_path):
+    path = str(tmp_path / "result.bin")
+    write_result_file(path, {"pages": PAGES, "content": "\n\n".join(PAGES)})
+    with ResultFile(path) as f:
+        assert f.page_count == 5
+        assert f.get_pages(1, 3) == [(1, ""), (2, PAGES[2])]
+        assert f.get_pages(-2, 1) == [(0, PAGES[0])]
+        assert f.get_pages(4, 100) == [(4, PAGES[4])]
+        assert f.get_pages(6) == []
+
+
+def test_sections_round_trip(tmp_path):
+    structured = {"sheets": [{"name": "Sheet1", "columns": ["a"], "data": {"a": [1, None]}}]}
+    path = str(tmp_path / "result.bin")
+    write_result_file(path, {"pages": ["x"], "content": "x", "structured_data": structured})
+    with ResultFile(path) as f:
+        assert f.get_section("structured_data") == structured
+        assert f.get_section("raw_data") is None
+
+
+def test_an_empty_result(tmp_path):
+    path = str(tmp_path / "result.bin")
+    write_result_file(path, {"pages": [], "content": ""})
+    with ResultFile(path) as f:
+        assert f.page_count == 0
+        assert f.get_pages() == []
+        assert f.get_content(0, 10) == ("", 0)
+
+
+def test_missing_and_corrupt_files(tmp_path):
+    with pytest.raises(ResultFileError, match="not found"):
+        ResultFile(str(tmp_path / "missing.bin"))
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a result file at all, just some bytes")
+    with pytest.raises(ResultFileError, match="Not a result file"):
+        ResultFile(str(other))
+
+    path = str(tmp_path / "result.bin")
+    write_result_file(path, {"pages": PAGES, "content": "".join(PAGES)})
+    data = (tmp_path / "result.bin").read_bytes()
+    (tmp_path / "result.bin").write_bytes(data[:-4])
+    with pytest.raises(ResultFileError, match="Truncated"):
+        ResultFile(path)
+    assert list(tmp_path.glob("*.tmp")) == []
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from extractor.backend.core.scheduler import ExtractionScheduler, SchedulerQueueFullError
+from extractor.backend.models.models import ExtractorType, JobPriority
+
+PDF, IMAGE, EXCEL = ExtractorType.PDF, ExtractorType.IMAGE, ExtractorType.EXCEL
+
+
+class Jobs:
+    """Jobs that record when they start and run until released"""
+
+    def __init__(self):
+        self.started = []
+        self._release = {}
+
+    def __call__(self, job_id: str):
+        async def run():
+            self.started.append(job_id)
+            self._release[job_id] = asyncio.Event()
+            await self._release[job_id].wait()
+            return job_id
+        return run
+
+    async def finish(self, job_id: str) -> None:
+        self._release[job_id].set()
+        # Let the job complete and the scheduler start the next ones
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_admission_limits_running_jobs_in_total_and_per_type():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=3, type_limits={IMAGE: 1})
+        jobs = Jobs()
+        futures = {name: scheduler.submit(name, kind, jobs(name)) for name, kind in [
+            ("image1", IMAGE), ("image2", IMAGE), ("pdf1", PDF), ("pdf2", PDF), ("pdf3", PDF),
+        ]}
+        await asyncio.sleep(0)
+        assert sorted(jobs.started) == ["image1", "pdf1", "pdf2"]
+        assert (scheduler.running, scheduler.queued) == (3, 2)
+
+        # A freed PDF slot can't go to the second image while the first still runs
+        await jobs.finish("pdf1")
+        assert jobs.started[-1] == "pdf3"
+        await jobs.finish("image1")
+        assert jobs.started[-1] == "image2"
+        assert await futures["pdf1"] == "pdf1"
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_interactive_jobs_go_before_bulk_jobs():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=1)
+        jobs = Jobs()
+        scheduler.submit("first", PDF, jobs("first"))
+        scheduler.submit("bulk", PDF, jobs("bulk"), JobPriority.BULK)
+        scheduler.submit("interactive", PDF, jobs("interactive"), JobPriority.INTERACTIVE)
+        await asyncio.sleep(0)
+        await jobs.finish("first")
+        await jobs.finish("interactive")
+        assert jobs.started == ["first", "interactive", "bulk"]
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_types_share_the_workers_fairly():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=2)
+        jobs = Jobs()
+        scheduler.submit("image0", IMAGE, jobs("image0"))
+        scheduler.submit("image1", IMAGE, jobs("image1"))
+        # A burst of PDFs queued ahead of a few spreadsheets
+        for i in range(6):
+            scheduler.submit(f"pdf{i}", PDF, jobs(f"pdf{i}"))
+        for i in range(2):
+            scheduler.submit(f"excel{i}", EXCEL, jobs(f"excel{i}"))
+        await asyncio.sleep(0)
+
+        for finished in ("image0", "image1", "pdf0", "excel0"):
+            await jobs.finish(finished)
+        # Each freed slot goes to the type with the fewest jobs running
+        assert jobs.started[2:] == ["pdf0", "excel0", "pdf1", "excel1"]
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_cancelling_a_queued_job():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=1)
+        jobs = Jobs()
+        scheduler.submit("running", PDF, jobs("running"))
+        queued = scheduler.submit("queued", PDF, jobs("queued"))
+        await asyncio.sleep(0)
+
+        assert scheduler.cancel("running") is False
+        assert scheduler.cancel("queued") is True
+        assert await queued is None
+        assert scheduler.queued == 0
+        assert scheduler.cancel("queued") is False
+
+        await jobs.finish("running")
+        assert jobs.started == ["running"]
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_job_errors_reach_the_caller():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=1)
+
+        async def fail():
+            raise ValueError("broken document")
+
+        with pytest.raises(ValueError, match="broken document"):
+            await scheduler.submit("job", PDF, fail)
+        assert scheduler.running == 0
+
+    _run(scenario())
+
+
+def test_a_full_queue_rejects_submissions_with_a_retry_delay():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=1, queue_size=2)
+        jobs = Jobs()
+        scheduler.submit("running", PDF, jobs("running"))
+        await asyncio.sleep(0)
+        scheduler.submit("queued1", PDF, jobs("queued1"))
+        scheduler.submit("queued2", PDF, jobs("queued2"))
+
+        with pytest.raises(SchedulerQueueFullError) as raised:
+            scheduler.submit("rejected", PDF, jobs("rejected"))
+        assert raised.value.retry_after >= 1
+        assert scheduler.rejected == 1
+        with pytest.raises(SchedulerQueueFullError):
+            scheduler.check_capacity()
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_run_waits_for_room_instead_of_failing():
+    async def scenario():
+        scheduler = ExtractionScheduler(max_running=1, queue_size=1)
+        jobs = Jobs()
+        scheduler.submit("running", PDF, jobs("running"))
+        await asyncio.sleep(0)
+        scheduler.submit("queued", PDF, jobs("queued"))
+
+        waiting = asyncio.ensure_future(scheduler.run("waiting", PDF, jobs("waiting")))
+        await asyncio.sleep(0.01)
+        assert not waiting.done() and scheduler.rejected == 0
+
+        await jobs.finish("running")
+        await jobs.finish("queued")
+        await asyncio.sleep(0.01)
+        await jobs.finish("waiting")
+        assert await waiting == "waiting"
+        await scheduler.shutdown()
+
+    _run(scenario())
+
+
+def test_the_api_answers_a_full_queue_with_429_and_retry_after(api, client, monkeypatch):
+    monkeypatch.setattr(api.scheduler, "queue_size", 0)
+    response = client.post("/upload", files={"file": ("data.csv", b"x,y\n1,2\n")})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "queue is full" in response.json()["detail"]
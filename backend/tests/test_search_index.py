@@ -0,0 +1,63 @@
+import pytest
+
+from extractor.backend.core.search_index import SearchIndex, SearchQueryError, fts5_available
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite was built without FTS5")
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    yield index
+    index.close()
+
+
+def _page_tasks(found):
+    return [result["task_id"] for result in found["results"]]
+
+
+def test_a_task_with_many_matching_pages_takes_one_slot(index):
+    index.add("A", "a.pdf", ["invoice total due"] * 200)
+    for i in range(5):
+        index.add(f"B{i}", f"b{i}.pdf", ["cover page", f"invoice number {i} and more words here"])
+
+    first = index.search("invoice", limit=3, hits_per_task=2)
+    assert len(first["results"]) == 3
+    assert first["has_more"] is True
+    assert len(set(_page_tasks(first))) == 3
+
+    rest = index.search("invoice", limit=3, offset=3, hits_per_task=2)
+    assert len(rest["results"]) == 3
+    assert rest["has_more"] is False
+    assert sorted(_page_tasks(first) + _page_tasks(rest)) == ["A", "B0", "B1", "B2", "B3", "B4"]
+
+    results = {result["task_id"]: result for result in first["results"] + rest["results"]}
+    assert len(results["A"]["hits"]) == 2
+    assert [hit["page"] for hit in results["B0"]["hits"]] == [2]
+    assert "[invoice]" in results["B0"]["hits"][0]["snippet"]
+
+
+def test_results_are_ordered_by_best_page(index):
+    index.add("weak", "weak.pdf", ["one mention of apples among many many other unrelated words in a long page"])
+    index.add("strong", "strong.pdf", ["intro", "apples apples apples"])
+    found = index.search("apples")
+    assert _page_tasks(found) == ["strong", "weak"]
+    assert found["results"][0]["score"] >= found["results"][1]["score"]
+    assert found["results"][0]["hits"][0]["page"] == 2
+
+
+def test_offset_past_the_end(index):
+    index.add("A", "a.pdf", ["hello world"])
+    assert index.search("hello", offset=1) == {"results": [], "has_more": False}
+
+
+def test_removed_tasks_are_not_found(index):
+    index.add("A", "a.pdf", ["hello world"])
+    assert index.remove("A") is True
+    assert index.search("hello")["results"] == []
+    assert index.remove("A") is False
+
+
+def test_invalid_fts_query(index):
+    with pytest.raises(SearchQueryError):
+        index.search('"unbalanced', mode="fts")
@@ -0,0 +1,99 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from extractor.backend.utils.sniffing import (
+    BMP, CSV, PDF, PNG, XLS, XLSX, UnsupportedContentError, sniff_archive, sniff_csv_delimiter, sniff_format,
+    stored_filename
+)
+
+
+@pytest.mark.parametrize("head, expected", [
+    (b"%PDF-1.7\n...", PDF),
+    (b"\r\n%PDF-1.4\n", PDF),
+    (b"\x89PNG\r\n\x1a\n\x00\x00", PNG),
+    (b"BM" + bytes(12) + b"\x28\x00\x00\x00", BMP),
+    (b"PK\x03\x04" + bytes(26) + b"[Content_Types].xml...xl/workbook.xml", XLSX),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(8), XLS),
+    (b"a,b\n1,2\n3,4\n", CSV),
+])
+def test_formats_are_recognized_by_content(head, expected):
+    assert sniff_format(head, complete=True) is expected
+
+
+@pytest.mark.parametrize("text, delimiter", [
+    ("a,b,c\n1,2,3\n", ","),
+    ("a;b;c\n1;2,5;3\n", ";"),
+    ("a\tb\n1\t2\n", "\t"),
+    ("a|b\n1|2\n", "|"),
+    ('name,note\nx,"one, two"\n', ","),
+    ("﻿a;b\n1;2\n", ";"),
+])
+def test_csv_delimiters(write_file, text, delimiter):
+    path = write_file("data.csv", text.encode("utf-8"))
+    assert sniff_format(text.encode("utf-8"), complete=True) is CSV
+    assert sniff_csv_delimiter(path) == delimiter
+
+
+def test_single_column_text_needs_a_csv_name(write_file):
+    assert sniff_format(b"value\n1\n2\n", "values.csv", complete=True) is CSV
+    assert sniff_csv_delimiter(write_file("values.csv", b"value\n1\n2\n")) == ","
+    with pytest.raises(UnsupportedContentError):
+        sniff_format(b"just some notes\nwith no columns\n", "notes.txt", complete=True)
+
+
+def test_a_cut_off_last_line_is_ignored():
+    # Only complete lines within the sniff window count
+    assert sniff_format(b"a,b\n1,2\n3,4,5", complete=False) is CSV
+    with pytest.raises(UnsupportedContentError):
+        sniff_format(b"a,b\n1,2\n3,4,5", complete=True)
+
+
+@pytest.mark.parametrize("head, message", [
+    (b"", "empty"),
+    (b"PK\x03\x04" + bytes(26) + b"word/document.xml", "Word"),
+    (b"PK\x03\x04" + bytes(26) + b"foo.txt", "batch"),
+    (b"\x00\x01\x02binary", "not a PDF"),
+])
+def test_unsupported_content(head, message):
+    with pytest.raises(UnsupportedContentError, match=message):
+        sniff_format(head)
+
+
+def test_stored_filename_gets_the_detected_extension():
+    assert stored_filename("report.csv", CSV) == "report.csv"
+    assert stored_filename("report.xls", CSV) == "report.xls.csv"
+    assert stored_filename("scan.JPEG", PDF) == "scan.JPEG.pdf"
+
+
+def _archive(kind: str) -> bytes:
+    buffer = io.BytesIO()
+    if kind == "zip":
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("a.csv", "a,b\n1,2\n")
+    else:
+        with tarfile.open(fileobj=buffer, mode=f"w:{kind}") as archive:
+            info = tarfile.TarInfo("a.csv")
+            info.size = 8
+            archive.addfile(info, io.BytesIO(b"a,b\n1,2\n"))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("kind, expected", [
+    ("zip", "zip"), ("", "tar"), ("gz", "tar"), ("bz2", "tar"), ("xz", "tar")
+])
+def test_archives_are_recognized_by_content(kind, expected):
+    assert sniff_archive(_archive(kind)) == expected
+
+
+@pytest.mark.parametrize("head", [
+    b"PK\x03\x04" + bytes(26) + b"[Content_Types].xml...xl/workbook.xml",
+    b"PK\x03\x04" + bytes(26) + b"word/document.xml",
+    b"%PDF-1.7\n...",
+    b"a,b\n1,2\n",
+    b"",
+])
+def test_documents_are_not_archives(head):
+    assert sniff_archive(head) is None
@@ -0,0 +1,55 @@
+import io
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from extractor.backend.utils.tables import TABLE_MEDIA_TYPES, columnar_to_bytes
+
+SHEET = {
+    "columns": ["n", "x", "when", "label"],
+    "types": ["integer", "float", "datetime", "string"],
+    "values": [[1, 2], [0.5, None], ["2024-01-01T00:00:00", None], ["a", 3]],
+}
+
+
+def test_api_process_does_not_import_pyarrow_or_numpy(tmp_path):
+    checkout = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    script = textwrap.dedent(f"""
+        import sys, types
+        package = types.ModuleType("extractor")
+        package.__path__ = [{checkout!r}]
+        sys.modules["extractor"] = package
+        import extractor.backend.main
+        print(",".join(name for name in ("pyarrow", "numpy", "pandas") if name in sys.modules))
+    """)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == ""
+
+
+@pytest.mark.parametrize("table_format", sorted(TABLE_MEDIA_TYPES))
+def test_columnar_round_trip(table_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    data = columnar_to_bytes(SHEET, table_format)
+    if table_format == "arrow":
+        table = pa.ipc.open_stream(data).read_all()
+    else:
+        table = pa.parquet.read_table(io.BytesIO(data))
+
+    assert table.column_names == SHEET["columns"]
+    assert table.column("x").to_pylist() == [0.5, None]
+    assert table.column("label").to_pylist() == ["a", "3"]
+    assert str(table.schema.field("when").type) == "timestamp[us]"
+
+
+def test_unknown_table_format():
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError):
+        columnar_to_bytes(SHEET, "csv")
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from extractor.backend.core.task_store import (
+    InMemoryTaskStore, SQLiteTaskStore, _process_start, owner_alive, process_owner
+)
+from extractor.backend.models.models import ProcessingStatus
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = InMemoryTaskStore() if request.param == "memory" else SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+
+def _create(store, task_id, status, **fields):
+    store.create(task_id, {"status": status, "file_path": f"/uploads/{task_id}", "result": None, **fields})
+
+
+@pytest.fixture(scope="module")
+def dead_owner():
+    """The owner id of a process that has exited"""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        started = _process_start(process.pid)
+    finally:
+        process.kill()
+        process.wait()
+    return f"{process.pid}:{started or ''}"
+
+
+def test_fail_orphaned_fails_only_tasks_of_dead_owners(store, dead_owner):
+    _create(store, "queued", ProcessingStatus.PENDING, owner=dead_owner)
+    _create(store, "running", ProcessingStatus.PROCESSING, owner=dead_owner)
+    _create(store, "legacy", ProcessingStatus.PROCESSING)
+    _create(store, "mine", ProcessingStatus.PROCESSING, owner=process_owner())
+    _create(store, "done", ProcessingStatus.COMPLETED, owner=dead_owner)
+
+    assert sorted(store.fail_orphaned("Interrupted")) == ["legacy", "queued", "running"]
+    assert store.get("queued")["status"] == ProcessingStatus.FAILED
+    assert store.get("running")["error"] == "Interrupted"
+    assert store.get("mine")["status"] == ProcessingStatus.PROCESSING
+    assert store.get("done")["status"] == ProcessingStatus.COMPLETED
+    assert store.fail_orphaned("Interrupted") == []
+
+
+@pytest.mark.skipif(_process_start(os.getpid()) is None, reason="needs /proc")
+def test_a_reused_pid_is_not_taken_for_the_owner():
+    pid, _, started = process_owner().partition(":")
+    assert owner_alive(process_owner())
+    assert not owner_alive(f"{pid}:{int(started) - 1}")
+
+
+def test_workers_sharing_a_database_keep_each_others_tasks(tmp_path, dead_owner):
+    # Two API workers on one database; the second one (re)starts while the first runs a task
+    path = str(tmp_path / "tasks.db")
+    first, second = SQLiteTaskStore(path), SQLiteTaskStore(path)
+    try:
+        _create(first, "live", ProcessingStatus.PROCESSING, owner=process_owner())
+        _create(first, "crashed", ProcessingStatus.PENDING, owner=dead_owner)
+
+        assert second.fail_orphaned("Interrupted by a server restart") == ["crashed"]
+        assert first.get("live")["status"] == ProcessingStatus.PROCESSING
+        assert first.get("crashed")["status"] == ProcessingStatus.FAILED
+    finally:
+        first.close()
+        second.close()
+
+
+def test_expire_keeps_active_tasks_without_active_ttl(store):
+    _create(store, "queued", ProcessingStatus.PENDING)
+    _create(store, "done", ProcessingStatus.COMPLETED)
+    time.sleep(0.01)
+
+    expired = store.expire(0)
+    assert [task["task_id"] for task in expired] == ["done"]
+    assert expired[0]["file_path"] == "/uploads/done"
+    assert store.get("queued") is not None
+
+
+def test_expire_reclaims_stale_active_tasks(store):
+    _create(store, "stale", ProcessingStatus.PROCESSING)
+    time.sleep(0.2)
+    _create(store, "fresh", ProcessingStatus.PENDING)
+
+    expired = store.expire(3600, active_ttl_seconds=0.1)
+    assert [task["task_id"] for task in expired] == ["stale"]
+    assert expired[0]["file_path"] == "/uploads/stale"
+    assert store.get("stale") is None
+    assert store.get("fresh") is not None
+
+
+def test_pages_and_content_round_trip(store):
+    _create(store, "task", ProcessingStatus.PROCESSING)
+    store.add_page("task", 1, "second", 3)
+    store.add_page("task", 0, "first", 3)
+    assert store.get_pages("task") == [(0, "first"), (1, "second")]
+    assert store.get_pages("task", start=1, end=2) == [(1, "second")]
+    assert store.get("task")["pages_done"] == 2
@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+
+pytest.importorskip("aiofiles")
+
+from extractor.backend.utils.helpers import get_file_hash
+from extractor.backend.utils.uploads import (
+    CONTENT_HASH_ALGORITHM, UploadTooLargeError, save_stream, save_upload
+)
+
+DATA = bytes(range(256)) * 40
+
+
+class _Upload:
+    """An UploadFile stand-in whose stream position shows how much of the body was read"""
+
+    def __init__(self, data: bytes, size=None):
+        self.stream = io.BytesIO(data)
+        self.size = size
+
+    async def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+
+def test_the_content_hash_matches_the_saved_file(tmp_path):
+    path = str(tmp_path / "upload.bin")
+    upload = _Upload(DATA[100:])
+    size, content_hash = asyncio.run(save_upload(upload, path, chunk_size=1000, head=DATA[:100]))
+
+    assert size == len(DATA)
+    assert content_hash == hashlib.sha256(DATA).hexdigest()
+    assert content_hash == get_file_hash(path, CONTENT_HASH_ALGORITHM)
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_an_upload_over_the_limit_stops_mid_stream(tmp_path):
+    path = str(tmp_path / "upload.bin")
+    upload = _Upload(DATA)
+    with pytest.raises(UploadTooLargeError) as error:
+        asyncio.run(save_upload(upload, path, max_bytes=2500, chunk_size=1000))
+
+    assert error.value.limit == 2500
+    # The chunk that crossed the limit was the last one read, and no partial file is left
+    assert upload.stream.tell() == 3000
+    assert not os.path.exists(path)
+
+
+def test_an_upload_of_known_size_is_rejected_before_reading(tmp_path):
+    path = str(tmp_path / "upload.bin")
+    upload = _Upload(DATA, size=len(DATA))
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload(upload, path, max_bytes=len(DATA) - 1))
+
+    assert upload.stream.tell() == 0
+    assert not os.path.exists(path)
+
+
+def test_an_upload_at_the_limit_is_saved(tmp_path):
+    size, _ = asyncio.run(save_upload(_Upload(DATA), str(tmp_path / "upload.bin"), max_bytes=len(DATA)))
+    assert size == len(DATA)
+
+
+def test_streams_are_saved_like_uploads(tmp_path):
+    path = str(tmp_path / "member.bin")
+    size, content_hash = save_stream(io.BytesIO(DATA[10:]), path, chunk_size=777, head=DATA[:10])
+    assert (size, content_hash) == (len(DATA), hashlib.sha256(DATA).hexdigest())
+
+    with pytest.raises(UploadTooLargeError):
+        save_stream(io.BytesIO(DATA), path, max_bytes=len(DATA) - 1, chunk_size=777)
+    assert not os.path.exists(path)
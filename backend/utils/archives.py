@@ -0,0 +1,84 @@
+import os
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised when an archive's members add up to more than the unpacked size limit"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"Archive unpacks to more than {limit} bytes")
+
+
+class _MemberReader:
+    """Reads an archive member while counting bytes against the archive's budget"""
+
+    def __init__(self, stream: BinaryIO, budget: dict):
+        self.stream = stream
+        self.budget = budget
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.budget["used"] += len(data)
+        if self.budget["limit"] is not None and self.budget["used"] > self.budget["limit"]:
+            raise ArchiveTooLargeError(self.budget["limit"])
+        return data
+
+
+def _is_metadata_entry(name: str) -> bool:
+    """macOS resource forks and similar entries that are never documents"""
+    return name.startswith("__MACOSX/") or os.path.basename(name).startswith("._")
+
+
+def iter_archive_members(
+    fileobj: BinaryIO,
+    archive_format: str,
+    max_unpacked_bytes: Optional[int] = None
+) -> Iterator[Tuple[str, int, BinaryIO]]:
+    """
+    Iterate over the regular files in a ZIP or TAR archive without extracting it
+
+    TAR archives are read as a stream; ZIP archives need a seekable file for their
+    central directory, but members are still decompressed chunk by chunk. Each
+    member's declared size is checked against the remaining budget before it is
+    opened, and the bytes actually read are counted as well, so a member whose
+    header understates its size can't get past the limit either.
+
+    Args:
+        fileobj: The archive, opened in binary mode
+        archive_format: "zip" or "tar" (plain or compressed), as recognized
+            by sniffing.sniff_archive
+        max_unpacked_bytes: Most bytes all members may decompress to together
+
+    Yields:
+        Tuples of (member name, declared size, readable stream); each stream
+        must be consumed (or abandoned) before advancing to the next member
+
+    Raises:
+        ArchiveTooLargeError: The members exceed max_unpacked_bytes
+    """
+    budget = {"used": 0, "limit": max_unpacked_bytes}
+
+    def check_declared(size: int) -> None:
+        if max_unpacked_bytes is not None and budget["used"] + size > max_unpacked_bytes:
+            raise ArchiveTooLargeError(max_unpacked_bytes)
+
+    if archive_format == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or _is_metadata_entry(info.filename):
+                    continue
+                check_declared(info.file_size)
+                with archive.open(info) as member:
+                    yield info.filename, info.file_size, _MemberReader(member, budget)
+    else:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for info in archive:
+                if not info.isfile() or _is_metadata_entry(info.name):
+                    continue
+                check_declared(info.size)
+                member = archive.extractfile(info)
+                if member is not None:
+                    yield info.name, info.size, _MemberReader(member, budget)
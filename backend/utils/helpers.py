@@ -2,7 +2,7 @@ import os
 import re
 import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple, Union, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -19,23 +19,25 @@ def get_file_extension(filename: str) -> str:
     _, ext = os.path.splitext(filename)
     return ext.lower().lstrip('.')
 
-def get_file_hash(file_path: str) -> str:
+def get_file_hash(file_path: str, algorithm: str = "md5", chunk_size: int = 1024 * 1024) -> str:
     """
-    Generate an MD5 hash of a file
+    Generate a hash of a file
     
     Args:
         file_path: Path to the file
+        algorithm: Name of a hashlib algorithm (MD5 by default)
+        chunk_size: Number of bytes read per iteration
         
     Returns:
-        The MD5 hash of the file
+        The hex digest of the file
     """
-    hash_md5 = hashlib.md5()
+    file_hash = hashlib.new(algorithm)
     
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
     except Exception as e:
         logger.error(f"Failed to generate file hash: {str(e)}")
         return ""
@@ -80,6 +82,194 @@ def extract_text_metadata(text: str) -> Dict[str, Any]:
         "char_count": len(text)
     }
 
+# Rough token count for chunk budgets: words and punctuation marks, as most
+# subword tokenizers produce at least one token for each
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+CHUNK_UNITS = ("chars", "tokens")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of tokens in text"""
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+
+def _iter_split(text: str, separator: str) -> Iterator[str]:
+    """Lazy str.split for a single separator"""
+    start = 0
+    while True:
+        end = text.find(separator, start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + len(separator)
+
+
+def iter_chunks(
+    text: Union[str, Iterable[str]],
+    chunk_size: int = 1000,
+    overlap: int = 0,
+    unit: str = "chars",
+    length_function: Optional[Callable[[str], int]] = None
+) -> Iterator[str]:
+    """
+    Divide text into chunks of at most chunk_size, yielding each chunk as soon as it is complete
+
+    Paragraphs (separated by blank lines) are kept together where they fit;
+    longer paragraphs are split between words (their whitespace collapsed to
+    single spaces), and in "chars" mode words longer than a chunk are split as
+    well. Runs in time linear in the text length.
+
+    Args:
+        text: The text, or an iterable of text blocks (e.g. pages) read lazily
+            and treated as consecutive paragraphs
+        chunk_size: Budget of each chunk, in characters or tokens
+        overlap: Budget of trailing text repeated at the start of the next chunk
+        unit: "chars" or "tokens" (approximated by count_tokens unless
+            length_function is given)
+        length_function: Measures the size of a piece of text in the chosen unit
+
+    Yields:
+        Text chunks
+    """
+    if unit not in CHUNK_UNITS:
+        raise ValueError(f"Unsupported chunk unit: {unit}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError("overlap must be non-negative and smaller than chunk_size")
+
+    by_chars = unit == "chars" and length_function is None
+    measure = length_function or (len if unit == "chars" else count_tokens)
+    # Separators only count towards character budgets
+    paragraph_gap = 2 if by_chars else 0
+    word_gap = 1 if by_chars else 0
+
+    # The chunk being built: (separator before the piece, piece, size of the piece)
+    pieces: List[Tuple[str, str, int]] = []
+    size = 0
+    # Whether pieces only hold the overlap of the previous chunk
+    only_overlap = False
+
+    def gap(separator: str) -> int:
+        return paragraph_gap if separator == "\n\n" else word_gap
+
+    def overlap_tail() -> List[Tuple[str, str, int]]:
+        """Trailing pieces of the chunk (or words of its last piece) that fit in the overlap budget"""
+        tail: List[Tuple[str, str, int]] = []
+        budget = overlap
+        for separator, piece, piece_size in reversed(pieces):
+            cost = piece_size + (gap(tail[-1][0]) if tail else 0)
+            if cost > budget:
+                break
+            budget -= cost
+            tail.append((separator, piece, piece_size))
+
+        if not tail and pieces:
+            separator, piece, _ = pieces[-1]
+            words: List[str] = []
+            for word in reversed(piece.split()):
+                cost = measure(word) + (word_gap if words else 0)
+                if cost > budget:
+                    break
+                budget -= cost
+                words.append(word)
+            if words:
+                joined = " ".join(reversed(words))
+                tail.append((separator, joined, measure(joined)))
+
+        tail.reverse()
+        return tail
+
+    def flush() -> str:
+        """Finish the current chunk and start the next one with its overlap"""
+        nonlocal pieces, size, only_overlap
+        chunk = pieces[0][1] + "".join(separator + piece for separator, piece, _ in pieces[1:])
+        pieces = overlap_tail() if overlap else []
+        size = sum(piece_size for _, _, piece_size in pieces) + sum(gap(separator) for separator, _, _ in pieces[1:])
+        only_overlap = bool(pieces)
+        return chunk
+
+    def room(separator: str) -> int:
+        return chunk_size - size - (gap(separator) if pieces else 0)
+
+    def append(separator: str, piece: str, piece_size: int) -> None:
+        nonlocal size, only_overlap
+        size += piece_size + (gap(separator) if pieces else 0)
+        pieces.append((separator, piece, piece_size))
+        only_overlap = False
+
+    def fit(separator: str, piece_size: int) -> Optional[str]:
+        """Make room for a piece, returning the chunk finished to do so"""
+        nonlocal pieces, size
+        if not pieces or piece_size <= room(separator):
+            return None
+        chunk = flush()
+        if pieces and piece_size > room(separator):
+            # The overlap leaves no room for this piece
+            pieces, size = [], 0
+        return chunk
+
+    blocks = [text] if isinstance(text, str) else text
+    for block in blocks:
+        for paragraph in _iter_split(block, "\n\n"):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+
+            paragraph_size = measure(paragraph)
+            if paragraph_size <= chunk_size:
+                chunk = fit("\n\n", paragraph_size)
+                if chunk is not None:
+                    yield chunk
+                append("\n\n", paragraph, paragraph_size)
+                continue
+
+            separator = "\n\n"
+            if not by_chars:
+                # Token budgets: continue word by word
+                for word in paragraph.split():
+                    word_size = measure(word)
+                    chunk = fit(separator, word_size)
+                    if chunk is not None:
+                        yield chunk
+                    append(separator, word, word_size)
+                    separator = " "
+                continue
+
+            # Character budgets: cut the paragraph at the last space that fits
+            flat = " ".join(paragraph.split())
+            position, length = 0, len(flat)
+            while position < length:
+                available = room(separator)
+                end = position + available
+                if end >= length:
+                    cut, next_position = length, length
+                else:
+                    cut = flat.rfind(" ", position, end + 1) if available > 0 else -1
+                    next_position = cut + 1
+                    if cut <= position:
+                        if pieces:
+                            # Not even the next word fits: finish the chunk (or drop
+                            # an overlap that leaves no room) and try again
+                            if only_overlap:
+                                pieces, size = [], 0
+                            else:
+                                yield flush()
+                            continue
+                        # A single word longer than a chunk
+                        cut, next_position = end, end
+
+                if cut > position:
+                    append(separator, flat[position:cut], cut - position)
+                    separator = " "
+                position = next_position
+
+    if pieces and not only_overlap:
+        yield flush()
+
+
 def chunk_text(text: str, chunk_size: int = 1000) -> List[str]:
     """
     Divide text into smaller chunks
@@ -89,38 +279,6 @@ def chunk_text(text: str, chunk_size: int = 1000) -> List[str]:
         chunk_size: Maximum size of each chunk
         
     Returns:
-        List of text chunks
+        List of text chunks (see iter_chunks to consume them as they are produced)
     """
-    # Split by paragraphs first
-    paragraphs = text.split('\n\n')
-    chunks = []
-    current_chunk = ""
-    
-    for para in paragraphs:
-        if len(current_chunk) + len(para) < chunk_size:
-            current_chunk += para + "\n\n"
-        else:
-            # If current chunk is not empty, add it to chunks
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            
-            # Start a new chunk
-            if len(para) > chunk_size:
-                # If paragraph is too large, split it further
-                words = para.split()
-                current_chunk = ""
-                
-                for word in words:
-                    if len(current_chunk) + len(word) < chunk_size:
-                        current_chunk += word + " "
-                    else:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = word + " "
-            else:
-                current_chunk = para + "\n\n"
-    
-    # Add the last chunk if not empty
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-        
-    return chunks
\ No newline at end of file
+    return list(iter_chunks(text, chunk_size=chunk_size))
@@ -0,0 +1,211 @@
+import codecs
+import csv
+import os
+import struct
+from typing import Optional, Tuple
+
+# Bytes read from the start of a file to decide its format; OOXML member
+# names and enough CSV rows to compare fit well within this
+SNIFF_BYTES = 64 * 1024
+
+# Lines of text compared when deciding whether a file is CSV
+CSV_SNIFF_LINES = 20
+CSV_DELIMITERS = ",;\t|"
+
+# Sizes of the BMP info headers PIL understands (BITMAPCOREHEADER .. BITMAPV5HEADER)
+_BMP_HEADER_SIZES = (12, 40, 52, 56, 64, 108, 124)
+
+
+class UnsupportedContentError(ValueError):
+    """Raised when a file's leading bytes don't match a supported document format"""
+
+
+class ContentFormat:
+    """A document format recognized from its leading bytes"""
+
+    def __init__(self, name: str, extensions: Tuple[str, ...]):
+        """
+        Args:
+            name: Display name, e.g. "PDF"
+            extensions: File extensions of the format, canonical one first
+        """
+        self.name = name
+        self.extensions = extensions
+
+    @property
+    def extension(self) -> str:
+        return self.extensions[0]
+
+    def __repr__(self) -> str:
+        return f"ContentFormat({self.name!r})"
+
+
+PDF = ContentFormat("PDF", (".pdf",))
+PNG = ContentFormat("PNG", (".png",))
+JPEG = ContentFormat("JPEG", (".jpg", ".jpeg"))
+TIFF = ContentFormat("TIFF", (".tiff", ".tif"))
+BMP = ContentFormat("BMP", (".bmp",))
+XLSX = ContentFormat("XLSX", (".xlsx",))
+XLS = ContentFormat("XLS", (".xls",))
+CSV = ContentFormat("CSV", (".csv",))
+
+
+def _is_bmp(head: bytes) -> bool:
+    # "BM" alone is too weak (a CSV can start with it), so check the info header size too
+    if len(head) < 18 or not head.startswith(b"BM"):
+        return False
+    return struct.unpack_from("<I", head, 14)[0] in _BMP_HEADER_SIZES
+
+
+def _is_ooxml(head: bytes) -> bool:
+    """Whether the member names in a ZIP file's local headers are those of an OOXML package"""
+    return any(marker in head for marker in (b"xl/", b"word/", b"ppt/", b"[Content_Types].xml"))
+
+
+def _zip_format(head: bytes) -> ContentFormat:
+    """
+    Tell a workbook from other ZIP files by the member names in its local headers
+
+    OOXML packages store [Content_Types].xml and small parts like docProps/
+    near the start, so the first member names of a workbook include "xl/".
+    """
+    if b"xl/" in head:
+        return XLSX
+    if b"word/" in head or b"ppt/" in head:
+        raise UnsupportedContentError("Word and PowerPoint documents are not supported")
+    if _is_ooxml(head):
+        # An OOXML package whose workbook parts start further in
+        return XLSX
+    raise UnsupportedContentError("ZIP archives are only accepted as batch uploads")
+
+
+def sniff_archive(head: bytes) -> Optional[str]:
+    """
+    Recognize a batch archive from the first bytes of a file
+
+    ZIP files that are OOXML documents are documents, not archives. gzip,
+    bzip2 and xz streams are taken to be compressed TARs, the only compressed
+    files batch uploads accept.
+
+    Args:
+        head: Leading bytes of the file, ideally SNIFF_BYTES of them
+
+    Returns:
+        "zip" or "tar", or None if the content isn't an archive
+    """
+    if head.startswith(b"PK\x03\x04"):
+        return None if _is_ooxml(head) else "zip"
+    if head[257:262] == b"ustar":
+        return "tar"
+    if head.startswith((b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")):
+        return "tar"
+    return None
+
+
+def _text_lines(head: bytes, complete: bool) -> Optional[list]:
+    """The first lines of UTF-8 text, or None if the bytes aren't text"""
+    if b"\x00" in head:
+        return None
+    try:
+        text = codecs.getincrementaldecoder("utf-8-sig")().decode(head, final=complete)
+    except UnicodeDecodeError:
+        return None
+    lines = text.splitlines()
+    if not complete and len(lines) > 1:
+        # The last line was probably cut off by the sniff window
+        lines = lines[:-1]
+    lines = [line for line in lines[:CSV_SNIFF_LINES] if line.strip()]
+    if any(char < " " and char not in "\t\r\n" for line in lines for char in line):
+        return None
+    return lines
+
+
+def _csv_delimiter(lines: list) -> Optional[str]:
+    """
+    The delimiter every line splits on into the same number (more than one) of
+    fields, or None if there is none; earlier CSV_DELIMITERS win ties
+    """
+    for delimiter in CSV_DELIMITERS:
+        widths = {len(row) for row in csv.reader(lines, delimiter=delimiter)}
+        if len(widths) == 1 and widths.pop() > 1:
+            return delimiter
+    return None
+
+
+def sniff_format(head: bytes, filename: Optional[str] = None, complete: bool = False) -> ContentFormat:
+    """
+    Recognize a document format from the first bytes of a file
+
+    Binary formats are matched by their signatures; anything else must be
+    UTF-8 text whose lines split into a consistent number of fields to pass
+    as CSV. Text named .csv is accepted as a one-column CSV as well. OLE2
+    compound files are taken to be legacy Excel workbooks, since telling
+    them from .doc files would need their directory, near the end of the file.
+
+    Args:
+        head: Leading bytes of the file, ideally SNIFF_BYTES of them
+        filename: The file's name, only consulted for single-column CSV
+        complete: head is the whole file (so its last line isn't cut off)
+
+    Returns:
+        The detected format
+
+    Raises:
+        UnsupportedContentError: The content isn't a supported document format
+    """
+    if not head:
+        raise UnsupportedContentError("The file is empty")
+    # Readers tolerate a little junk before the PDF header, so search for it
+    if b"%PDF-" in head[:1024]:
+        return PDF
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return PNG
+    if head.startswith(b"\xff\xd8\xff"):
+        return JPEG
+    if head[:4] in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+        return TIFF
+    if _is_bmp(head):
+        return BMP
+    if head.startswith(b"PK\x03\x04"):
+        return _zip_format(head)
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return XLS
+
+    lines = _text_lines(head, complete)
+    if lines is None:
+        raise UnsupportedContentError("The content is not a PDF, image, Excel workbook or CSV file")
+    if _csv_delimiter(lines) is not None or (filename or "").lower().endswith(".csv"):
+        return CSV
+    raise UnsupportedContentError("Text content is only supported as CSV")
+
+
+def sniff_file(file_path: str) -> ContentFormat:
+    """Recognize the format of a file on disk from its first SNIFF_BYTES"""
+    with open(file_path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    return sniff_format(head, os.path.basename(file_path), complete=len(head) < SNIFF_BYTES)
+
+
+def sniff_csv_delimiter(file_path: str) -> str:
+    """
+    The delimiter of a CSV file on disk, as recognized by sniff_format
+
+    Files sniffed as CSV may use any of CSV_DELIMITERS; single-column files
+    (and anything unrecognized) get the default comma.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    lines = _text_lines(head, complete=len(head) < SNIFF_BYTES)
+    return (_csv_delimiter(lines) if lines else None) or ","
+
+
+def stored_filename(filename: str, content_format: ContentFormat) -> str:
+    """
+    A filename whose extension matches the detected format
+
+    Extractors pick readers by extension (CSV vs. workbook), so a mislabeled
+    file gets the format's extension appended, e.g. "report.xls.csv".
+    """
+    if os.path.splitext(filename)[1].lower() in content_format.extensions:
+        return filename
+    return filename + content_format.extension
@@ -0,0 +1,99 @@
+import importlib
+import importlib.util
+import io
+import logging
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMATS = ("json", "arrow", "parquet")
+
+# Content types of the binary table downloads
+TABLE_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Tables of an image task's layout (see extractors.layout); named here so the
+# API can validate requests without importing numpy
+LAYOUT_TABLES = ("words", "lines", "paragraphs")
+
+# pyarrow is optional and only needed for Arrow IPC/Parquet downloads; it is
+# imported on the first conversion so the API process doesn't load it at startup
+_pyarrow = None
+
+
+def arrow_available() -> bool:
+    """Whether Arrow IPC/Parquet conversion is available (without importing pyarrow)"""
+    return _pyarrow is not None or importlib.util.find_spec("pyarrow") is not None
+
+
+def _load_pyarrow():
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            pa = importlib.import_module("pyarrow")
+            importlib.import_module("pyarrow.ipc")
+            importlib.import_module("pyarrow.parquet")
+        except ImportError:
+            raise RuntimeError("pyarrow is not installed")
+        _pyarrow = pa
+    return _pyarrow
+
+
+def columnar_to_arrow(sheet: Dict[str, Any]) -> "pa.Table":
+    """
+    Convert a columnar sheet (as produced by ExcelExtractor) to an Arrow table
+
+    Args:
+        sheet: Dict with "columns", "types" and "values"
+
+    Returns:
+        A pyarrow Table
+    """
+    pa = _load_pyarrow()
+    arrow_types = {
+        "integer": pa.int64(),
+        "float": pa.float64(),
+        "boolean": pa.bool_(),
+        "datetime": pa.timestamp("us"),
+        "string": pa.string(),
+    }
+
+    arrays = []
+    for column_type, column_values in zip(sheet["types"], sheet["values"]):
+        if column_type == "datetime":
+            arrays.append(pa.array(column_values, type=pa.string()).cast(arrow_types[column_type]))
+        elif column_type == "string":
+            # Mixed columns may hold numbers next to text, Arrow needs a single type
+            arrays.append(pa.array([None if value is None else str(value) for value in column_values]))
+        else:
+            arrays.append(pa.array(column_values, type=arrow_types.get(column_type)))
+
+    return pa.Table.from_arrays(arrays, names=sheet["columns"])
+
+
+def columnar_to_bytes(sheet: Dict[str, Any], table_format: str) -> bytes:
+    """
+    Serialize a columnar sheet as an Arrow IPC stream or a Parquet file
+
+    Args:
+        sheet: Dict with "columns", "types" and "values"
+        table_format: "arrow" or "parquet"
+
+    Returns:
+        The serialized table
+    """
+    pa = _load_pyarrow()
+    table = columnar_to_arrow(sheet)
+    sink = io.BytesIO()
+
+    if table_format == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif table_format == "parquet":
+        pa.parquet.write_table(table, sink)
+    else:
+        raise ValueError(f"Unsupported table format: {table_format}")
+
+    return sink.getvalue()
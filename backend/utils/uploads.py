@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import os
+from typing import BinaryIO, Optional, Tuple
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+# Hash used to identify upload contents (shared with get_file_hash callers)
+CONTENT_HASH_ALGORITHM = "sha256"
+
+# Size of each chunk read from the upload and written to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds its size limit"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"File exceeds the maximum upload size of {limit} bytes")
+
+
+async def save_upload(
+    upload,
+    dest_path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    head: bytes = b""
+) -> Tuple[int, str]:
+    """
+    Stream an uploaded file to disk, hashing it in the same pass
+
+    Args:
+        upload: A starlette/FastAPI UploadFile
+        dest_path: Where to write the file
+        max_bytes: Abort once more than this many bytes have been received
+        chunk_size: Number of bytes read and written per iteration
+        head: Bytes already read from the upload (e.g. to sniff its format),
+            written before the rest of it
+
+    Returns:
+        Tuple of (size in bytes, hex content hash)
+    """
+    # Reject early when the multipart parser already knows the size
+    known_size = getattr(upload, "size", None)
+    if max_bytes is not None and known_size is not None and known_size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    content_hash = hashlib.new(CONTENT_HASH_ALGORITHM)
+    size = 0
+
+    try:
+        async with aiofiles.open(dest_path, "wb") as buffer:
+            while True:
+                chunk = head or await upload.read(chunk_size)
+                head = b""
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+
+                content_hash.update(chunk)
+                await buffer.write(chunk)
+    except Exception:
+        # Never leave a partial file behind
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    logger.info(f"Saved upload to {dest_path} ({size} bytes)")
+    return size, content_hash.hexdigest()
+
+
+def save_stream(
+    stream: BinaryIO,
+    dest_path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    head: bytes = b""
+) -> Tuple[int, str]:
+    """
+    Blocking counterpart of save_upload for plain file objects, e.g. archive members
+
+    Args:
+        stream: Readable binary stream
+        dest_path: Where to write the file
+        max_bytes: Abort once more than this many bytes have been read
+        chunk_size: Number of bytes read and written per iteration
+        head: Bytes already read from the stream, written before the rest of it
+
+    Returns:
+        Tuple of (size in bytes, hex content hash)
+    """
+    content_hash = hashlib.new(CONTENT_HASH_ALGORITHM)
+    size = 0
+
+    try:
+        with open(dest_path, "wb") as buffer:
+            while True:
+                chunk = head or stream.read(chunk_size)
+                head = b""
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+
+                content_hash.update(chunk)
+                buffer.write(chunk)
+    except Exception:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    return size, content_hash.hexdigest()
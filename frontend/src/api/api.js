@@ -38,10 +38,59 @@ class ApiService {
     }
     
     /**
-     * Get extraction status and results for a task
+     * Upload several documents, or a single ZIP/TAR archive of documents, as one batch
+     *
+     * @param {File[]} files - The files (or one archive) to upload
+     * @returns {Promise} - API response with the batch ID and its task IDs
+     */
+    static async uploadBatch(files) {
+        const formData = new FormData();
+        files.forEach((file) => formData.append('files', file));
+
+        try {
+            const response = await api.post('/upload/batch', formData, {
+                headers: {
+                    'Content-Type': 'multipart/form-data',
+                },
+            });
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+
+    /**
+     * Get status and aggregate progress of a batch
+     *
+     * @param {string} batchId - The batch ID
+     * @returns {Promise} - API response with document counts by status
+     */
+    static async getBatchStatus(batchId) {
+        try {
+            const response = await api.get(`/batches/${batchId}`);
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+
+    /**
+     * URL of a batch's JSONL results download (one document per line)
+     *
+     * @param {string} batchId - The batch ID
+     * @returns {string} - Download URL
+     */
+    static getBatchResultsUrl(batchId) {
+        return `${API_URL}/batches/${batchId}/results`;
+    }
+
+    /**
+     * Get extraction status, progress and document sizes for a task
      * 
      * @param {string} taskId - The task ID
-     * @returns {Promise} - API response with status and results
+     * @returns {Promise} - API response with status and summary (content is fetched with getPage/getContent)
      */
     static async getExtractionStatus(taskId) {
         try {
@@ -53,6 +102,102 @@ class ApiService {
         }
     }
     
+    /**
+     * Get a single extracted page; pages are available while extraction is still running
+     * 
+     * @param {string} taskId - The task ID
+     * @param {number} pageNumber - The page number (1-based)
+     * @returns {Promise} - Document info with the page content
+     */
+    static async getPage(taskId, pageNumber) {
+        try {
+            const response = await api.get(`/tasks/${taskId}/pages/${pageNumber}`);
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+    
+    /**
+     * Get a character range of a completed task's content
+     * 
+     * @param {string} taskId - The task ID
+     * @param {number} offset - Offset of the first character
+     * @param {number} length - Maximum number of characters to return
+     * @returns {Promise} - The content slice and the total content length
+     */
+    static async getContent(taskId, offset = 0, length = 1024 * 1024) {
+        try {
+            const response = await api.get(`/tasks/${taskId}/content`, {
+                params: { offset, length },
+            });
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+    
+    /**
+     * URL streaming a completed task's content as NDJSON chunks
+     *
+     * @param {string} taskId - The task ID
+     * @param {Object} options - size, overlap, unit ('chars' or 'tokens') and per_page
+     * @returns {string} - Stream URL
+     */
+    static getChunksUrl(taskId, options = {}) {
+        const params = new URLSearchParams(options).toString();
+        return `${API_URL}/tasks/${taskId}/chunks${params ? `?${params}` : ''}`;
+    }
+
+    /**
+     * URL of an image task's layout (uploaded with the "layout" option)
+     *
+     * @param {string} taskId - The task ID
+     * @param {Object} options - table ('words', 'lines' or 'paragraphs') and format ('json', 'arrow' or 'parquet')
+     * @returns {string} - Layout URL
+     */
+    static getLayoutUrl(taskId, options = {}) {
+        const params = new URLSearchParams(options).toString();
+        return `${API_URL}/tasks/${taskId}/layout${params ? `?${params}` : ''}`;
+    }
+
+    /**
+     * Search the content of completed tasks
+     *
+     * @param {string} query - Search terms; every term must occur
+     * @param {Object} options - limit, offset, hits (pages per task) and mode ('terms' or 'fts')
+     * @returns {Promise} - Ranked tasks with their best-matching pages and snippets
+     */
+    static async searchDocuments(query, options = {}) {
+        try {
+            const response = await api.get('/search', {
+                params: { q: query, ...options },
+            });
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+
+    /**
+     * Cancel a queued or running extraction; the task is kept with status 'cancelled'
+     *
+     * @param {string} taskId - The task ID
+     * @returns {Promise} - API response with the new status
+     */
+    static async cancelTask(taskId) {
+        try {
+            const response = await api.post(`/tasks/${taskId}/cancel`);
+            return response.data;
+        } catch (error) {
+            this.handleError(error);
+            throw error;
+        }
+    }
+
     /**
      * Delete a task and its associated files
      * 